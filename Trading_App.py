@@ -1,3 +1,5 @@
+import os
+
 import streamlit as st
 
 # ────────────────────────────────────────────────
@@ -10,6 +12,20 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Optional warm-up of heavy imports for this server process (STOCKVISION_PRELOAD)
+from pages.utils.preload import start_from_env
+
+start_from_env()
+
+# Optional in-process JSON API sharing this server's caches (see pages/utils/api.py)
+if os.environ.get("STOCKVISION_API_PORT"):
+    from pages.utils.api import serve_in_background
+
+    try:
+        serve_in_background(int(os.environ["STOCKVISION_API_PORT"]))
+    except OSError as e:
+        st.warning(f"JSON API not started on port {os.environ['STOCKVISION_API_PORT']}: {e}")
+
 # ────────────────────────────────────────────────
 # Modern Fintech + Glassmorphism Styling
 # ────────────────────────────────────────────────
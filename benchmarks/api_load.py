@@ -0,0 +1,149 @@
+"""Load test for the JSON API with the offline fake data backend.
+
+    python -m benchmarks.api_load --concurrency 32 --duration 10
+
+Starts the API in-process on an ephemeral port (or targets ``--url``),
+warms every distinct request once (cold: downloads + fits), then drives a
+mix of /ohlcv, /metrics and /forecast requests over keep-alive connections
+for ``--duration`` seconds and reports requests/sec and latency percentiles.
+``--conditional`` replays each response's ETag so repeats come back as 304.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+
+def request_paths(n_tickers, steps=10):
+    paths = []
+    for i in range(n_tickers):
+        ticker = f"FAKE{i}"
+        paths += [
+            f"/ohlcv?ticker={ticker}&start=2023-01-02",
+            f"/metrics?ticker={ticker}&start=2023-01-02&indicators={quote('SMA 20,RSI 14')}",
+            f"/forecast?ticker={ticker}&start=2023-01-02&steps={steps}",
+        ]
+    return paths
+
+
+async def fetch(reader, writer, host, path, etag=None):
+    lines = [f"GET {path} HTTP/1.1", f"Host: {host}"]
+    if etag:
+        lines.append(f"If-None-Match: {etag}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length, tag = 0, None
+    while True:
+        raw = await reader.readline()
+        if raw in (b"\r\n", b""):
+            break
+        name, _, value = raw.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "etag":
+            tag = value.strip()
+    body = await reader.readexactly(length)
+    return status, tag, len(body)
+
+
+async def worker(host, port, paths, deadline, conditional, etags, latencies, statuses, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            path = rng.choice(paths)
+            started = time.perf_counter()
+            status, tag, _ = await fetch(
+                reader, writer, host, path, etags.get(path) if conditional else None,
+            )
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+            if tag:
+                etags[path] = tag
+    finally:
+        writer.close()
+
+
+async def run(host, port, paths, concurrency, duration, conditional):
+    # Cold pass: every distinct request once, sequentially
+    etags = {}
+    reader, writer = await asyncio.open_connection(host, port)
+    started = time.perf_counter()
+    cold = Counter()
+    for path in paths:
+        status, tag, _ = await fetch(reader, writer, host, path)
+        cold[status] += 1
+        etags[path] = tag
+    cold_seconds = time.perf_counter() - started
+    writer.close()
+
+    latencies, statuses = [], Counter()
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        worker(host, port, paths, deadline, conditional, etags, latencies, statuses, seed)
+        for seed in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+
+    lat = np.array(latencies) * 1000
+    return {
+        "distinct_requests": len(paths),
+        "cold_seconds": round(cold_seconds, 3),
+        "cold_statuses": dict(cold),
+        "concurrency": concurrency,
+        "conditional": conditional,
+        "requests": len(latencies),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "latency_ms_p50": round(float(np.percentile(lat, 50)), 3) if len(lat) else None,
+        "latency_ms_p99": round(float(np.percentile(lat, 99)), 3) if len(lat) else None,
+        "statuses": dict(statuses),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Requests/sec against the JSON API.")
+    parser.add_argument("--url", help="Target a running server instead of an in-process one")
+    parser.add_argument("--tickers", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--conditional", action="store_true", help="Send If-None-Match")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        # Must be set before the provider singleton is created
+        os.environ.setdefault("STOCKVISION_DATA_BACKEND", "fake")
+        os.environ.setdefault("STOCKVISION_CACHE_DIR", tempfile.mkdtemp(prefix="stockvision-bench-"))
+        from pages.utils.api import ApiServer
+
+        server = ApiServer(port=0)
+        server.start_in_thread()
+        host, port = server.host, server.port
+
+    result = asyncio.run(run(
+        host, port, request_paths(args.tickers), args.concurrency, args.duration, args.conditional,
+    ))
+    print(json.dumps(result, indent=2))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(result, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
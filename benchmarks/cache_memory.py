@@ -0,0 +1,97 @@
+"""Bytes per cached ticker-year, before and after the compact price cache.
+
+    python -m benchmarks.cache_memory --tickers 50 --json cache_memory.json
+
+Three ways of holding the same daily bars, measured with tracemalloc while
+``--tickers`` of them are cached:
+
+    yfinance   the raw ``yf.download`` frame the pages used to keep in
+               ``st.cache_data`` ((Price, Ticker) columns, float64), plus the
+               pickled copy every cache hit used to deserialize
+    frame      a normalized float64 ``Date``-indexed frame (the ``TTLCache``
+               entry before ``CompactFrame``)
+    compact    ``pages.utils.compact.CompactFrame``
+
+and the time to hand one cached entry to a page (``to_frame`` for compact,
+``.copy()`` / unpickling for the others).
+"""
+import argparse
+import json
+import pickle
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.data import DAILY_SIZES, SIZES, ohlcv, yfinance_raw
+from pages.utils.compact import CompactFrame
+from pages.utils.price_store import normalize_ohlcv
+
+BARS_PER_YEAR = SIZES["1y"]
+
+
+def _retained(build, n):
+    """Bytes still allocated after building ``n`` cache entries."""
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        entries = [build(seed) for seed in range(n)]
+        used = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+    del entries
+    return used / n
+
+
+def _timed(fn, repeat=50):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def measure(sizes=DAILY_SIZES, tickers=50):
+    report = {}
+    for size in sizes:
+        years = SIZES[size] / BARS_PER_YEAR
+        raw = {seed: yfinance_raw(size, seed=seed) for seed in range(tickers)}
+        frames = {seed: ohlcv(size, seed=seed) for seed in range(tickers)}
+        pickled = pickle.dumps(raw[0])
+        builders = {
+            # st.cache_data kept the frame and a pickle of it
+            "yfinance": (lambda seed: (raw[seed].copy(), pickle.dumps(raw[seed])),
+                         lambda: pickle.loads(pickled)),
+            # Each entry owns its index, as frames read from the price store do
+            "frame": (lambda seed: normalize_ohlcv(raw[seed]), lambda: frames[0].copy()),
+            "compact": (lambda seed: CompactFrame.from_frame(frames[seed]),
+                        CompactFrame.from_frame(frames[0]).to_frame),
+        }
+        for name, (build, hit) in builders.items():
+            report[f"{name}[{size}]"] = {
+                "bytes_per_ticker_year": _retained(build, tickers) / years,
+                "hit_us": _timed(hit) * 1e6,
+            }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory per cached ticker-year by representation.")
+    parser.add_argument("--sizes", default=",".join(DAILY_SIZES), help="Comma-separated daily sizes")
+    parser.add_argument("--tickers", type=int, default=50, help="Entries cached per measurement")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = measure(args.sizes.split(","), args.tickers)
+    print(f"{'representation':<18} {'bytes/ticker-yr':>16} {'hit us':>9}")
+    for key, row in report.items():
+        print(f"{key:<18} {row['bytes_per_ticker_year']:>16,.0f} {row['hit_us']:>9.1f}")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
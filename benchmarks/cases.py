@@ -0,0 +1,148 @@
+"""Benchmark cases for the app's hot paths.
+
+Each case is registered with ``@case`` and called once per dataset size; it
+does its setup and returns the zero-argument callable that gets timed.
+"""
+from collections import namedtuple
+
+from benchmarks.data import DAILY_SIZES, SIZES, ohlcv, yfinance_raw
+
+Case = namedtuple("Case", ["name", "sizes", "make"])
+
+CASES = {}
+
+
+def case(name, sizes=tuple(SIZES)):
+    def register(make):
+        CASES[name] = Case(name, tuple(sizes), make)
+        return make
+    return register
+
+
+# --------------------------------------------------
+# Data load
+# --------------------------------------------------
+@case("close_extraction")
+def close_extraction(size):
+    """Provider frame -> normalized schema -> Close series, as the analysis page does."""
+    from pages.utils.price_store import normalize_ohlcv
+
+    raw = yfinance_raw(size)
+
+    def run():
+        data = normalize_ohlcv(raw, "BENCH")
+        data.reset_index(inplace=True)
+        return data["Close"]
+    return run
+
+
+# --------------------------------------------------
+# Indicators
+# --------------------------------------------------
+@case("moving_averages")
+def moving_averages(size):
+    """MA20 / MA50 / pct_change with pandas rolling windows."""
+    close = ohlcv(size)["Close"]
+
+    def run():
+        return close.rolling(20).mean(), close.rolling(50).mean(), close.pct_change() * 100
+    return run
+
+
+@case("indicators_all")
+def indicators_all(size):
+    """Every registered indicator through the vectorized batch engine."""
+    from pages.utils.indicators import INDICATORS, compute
+
+    frame = ohlcv(size)
+    names = list(INDICATORS)
+    return lambda: compute(frame, names)
+
+
+# --------------------------------------------------
+# Forecasting
+# --------------------------------------------------
+@case("arima_fit_forecast", sizes=DAILY_SIZES)
+def arima_fit_forecast(size):
+    """ARIMA(5,1,0) fit plus a 30-step forecast, as the prediction page does cold."""
+    from pages.utils.model_train import fit_arima, init_fit_worker
+
+    init_fit_worker()
+    values = ohlcv(size)["Close"].to_numpy()
+    return lambda: fit_arima(values, (5, 1, 0)).forecast(30)
+
+
+for _name in ("arima", "ets", "ridge_ar", "naive"):
+    def _forecaster_case(size, name=_name):
+        """Cold fit plus a 30-step forecast with interval through the common interface."""
+        from pages.utils.forecasters import make_forecaster
+        from pages.utils.model_train import init_fit_worker
+
+        init_fit_worker()
+        values = ohlcv(size)["Close"].to_numpy()
+        return lambda: make_forecaster(name).fit(values).forecast_interval(30)
+
+    case(f"forecaster_{_name}", sizes=DAILY_SIZES)(_forecaster_case)
+
+
+@case("forecaster_ensemble", sizes=DAILY_SIZES)
+def forecaster_ensemble(size):
+    """All backends fitted concurrently on shared features; compare with ``forecaster_arima``."""
+    from pages.utils.forecasters import make_forecaster
+    from pages.utils.model_train import init_fit_worker
+
+    init_fit_worker()
+    values = ohlcv(size)["Close"].to_numpy()
+    return lambda: make_forecaster("ensemble").fit(values).forecast_interval(30)
+
+
+@case("simulation_gbm", sizes=DAILY_SIZES)
+def simulation_gbm(size):
+    """100k GBM paths over 30 steps, as the prediction page's simulation does."""
+    from pages.utils.simulation import simulate
+
+    values = ohlcv(size)["Close"].to_numpy()
+    return lambda: simulate(values, 30, 100_000, "gbm").percentiles()
+
+
+# --------------------------------------------------
+# Charts (construction plus the JSON Streamlit ships to the browser)
+# --------------------------------------------------
+def _price_figure(frame):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=frame.index, y=frame["Close"], mode="lines", name="Close Price"))
+    for window in (20, 50):
+        fig.add_trace(go.Scatter(
+            x=frame.index, y=frame["Close"].rolling(window).mean(), mode="lines", name=f"MA{window}",
+        ))
+    fig.update_layout(template="plotly_dark", height=580, hovermode="x unified")
+    return fig.to_json()
+
+
+@case("price_figure")
+def price_figure(size):
+    frame = ohlcv(size)
+    return lambda: _price_figure(frame)
+
+
+@case("price_figure_lttb")
+def price_figure_lttb(size):
+    """Same chart after LTTB downsampling to a 1600 px width."""
+    from pages.utils.downsample import downsample_indices
+
+    frame = ohlcv(size)
+
+    def run():
+        idx = downsample_indices(frame.index.to_numpy(), frame["Close"].to_numpy(), 1600)
+        return _price_figure(frame.iloc[idx])
+    return run
+
+
+@case("plotly_table", sizes=DAILY_SIZES)
+def plotly_table_case(size):
+    from pages.utils.plotly_figure import plotly_table
+
+    table = ohlcv(size).reset_index().round(2)
+    return lambda: plotly_table(table).to_json()
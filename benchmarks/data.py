@@ -0,0 +1,49 @@
+"""Deterministic synthetic OHLCV for offline benchmarks."""
+import numpy as np
+import pandas as pd
+
+# Bars per dataset; "1m" is a month of regular-session minute bars
+SIZES = {
+    "1y": 252,
+    "5y": 252 * 5,
+    "20y": 252 * 20,
+    "1m": 21 * 390,
+}
+
+DAILY_SIZES = ("1y", "5y", "20y")
+
+
+def index_for(size):
+    n = SIZES[size]
+    if size == "1m":
+        days = pd.bdate_range("2024-01-02", periods=21)
+        minutes = pd.timedelta_range("9h30min", periods=390, freq="1min")
+        return pd.DatetimeIndex(np.concatenate([day + minutes for day in days]), name="Date")
+    return pd.bdate_range("2000-01-03", periods=n, name="Date")
+
+
+def ohlcv(size, seed=0):
+    """Normalized OHLCV frame (the schema ``MarketData`` returns)."""
+    index = index_for(size)
+    n = len(index)
+    rng = np.random.default_rng(seed)
+    scale = 0.0008 if size == "1m" else 0.015
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, scale, n)))
+    spread = np.abs(rng.normal(0, scale / 2, n)) * close
+    return pd.DataFrame(
+        {
+            "Open": np.roll(close, 1),
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(1_000, 5_000_000, n).astype("float64"),
+        },
+        index=index,
+    )
+
+
+def yfinance_raw(size, ticker="BENCH", seed=0):
+    """The same bars shaped like ``yf.download`` output: (Price, Ticker) columns."""
+    frame = ohlcv(size, seed)
+    frame.columns = pd.MultiIndex.from_product([frame.columns, [ticker]], names=["Price", "Ticker"])
+    return frame
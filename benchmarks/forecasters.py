@@ -0,0 +1,82 @@
+"""Forecasting backends head to head on the same series.
+
+    python -m benchmarks.forecasters --sizes 1y,5y --steps 30 --json forecasters.json
+
+For each dataset size and backend: cold fit time (median of ``--repeat``),
+peak traced memory of one fit, the time to ``update`` by one bar and to
+forecast, and the out-of-sample error of a forecast made ``--steps`` bars
+before the end of the series. The fit times are what the cost priors in
+``pages.utils.forecasters.BACKENDS`` are based on.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from benchmarks.data import DAILY_SIZES, ohlcv
+from pages.utils.forecasters import BACKENDS, make_forecaster
+
+
+def _timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def compare(sizes=DAILY_SIZES, steps=30, repeat=3):
+    warnings.simplefilter("ignore")
+    report = {}
+    for size in sizes:
+        values = ohlcv(size)["Close"].to_numpy()
+        train, test = values[:-steps], values[-steps:]
+        for name in BACKENDS:
+            make_forecaster(name).fit(train)  # warm-up: imports, first-call setup
+            fit = _timed(lambda: make_forecaster(name).fit(train), repeat)
+            model = make_forecaster(name).fit(train, trace_memory=True)
+            peak = model.peak_bytes
+            forecast = _timed(lambda: model.forecast(steps), repeat)
+            mean = model.forecast(steps)
+            lower, upper = model.forecast_interval(steps, 0.95)
+            report[f"{name}[{size}]"] = {
+                "n_obs": len(train),
+                "fit_ms": fit * 1000,
+                "seconds_per_1k": fit * 1000 / len(train),
+                "peak_kib": peak / 1024 if peak else None,
+                "forecast_ms": forecast * 1000,
+                "update_ms": _timed(lambda: model.update(test[:1]), 1) * 1000,
+                "mae": float(np.abs(mean - test).mean()),
+                "coverage_95": float(((test >= lower) & (test <= upper)).mean()),
+            }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare forecasting backends on the same data.")
+    parser.add_argument("--sizes", default=",".join(DAILY_SIZES), help="Comma-separated daily sizes")
+    parser.add_argument("--steps", type=int, default=30, help="Holdout / forecast horizon")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = compare(args.sizes.split(","), args.steps, args.repeat)
+    print(f"{'backend':<18} {'fit ms':>10} {'s/1k obs':>9} {'peak KiB':>9} "
+          f"{'update ms':>10} {'MAE':>8} {'cov95':>6}")
+    for key, row in report.items():
+        peak = f"{row['peak_kib']:.0f}" if row["peak_kib"] else "-"
+        print(f"{key:<18} {row['fit_ms']:>10.2f} {row['seconds_per_1k']:>9.4f} {peak:>9} "
+              f"{row['update_ms']:>10.3f} {row['mae']:>8.2f} {row['coverage_95']:>6.2f}")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Import-time and first-request cold-start report.
+
+    python -m benchmarks.import_time --repeat 5 --json import_time.json
+
+Every measurement runs in a fresh interpreter. Import targets run under
+``-X importtime``; the report gives the median total and the packages that
+contributed the most self time. ``page:*`` targets execute only a page's
+top-level import statements, i.e. what a fresh worker pays before any
+section of the page runs.
+
+The ``first_request`` scenarios then time the first forecast, indicator
+compute and chart build in a fresh process (fake data backend), once cold
+and once after ``pages.utils.preload`` has run, which is what
+``STOCKVISION_PRELOAD`` does at server start.
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULE_TARGETS = {
+    "streamlit": "import streamlit",
+    "pandas": "import pandas",
+    "plotly": "import plotly.graph_objects",
+    "scipy.signal": "import scipy.signal",
+    "statsmodels.arima": "import statsmodels.tsa.arima.model",
+    "yfinance": "import yfinance",
+    "pages.utils.analytics": "import pages.utils.analytics",
+    "pages.utils.api": "import pages.utils.api",
+}
+
+PAGES = {
+    "page:Trading_App": "Trading_App.py",
+    "page:Stock_Analysis": "pages/Stock_Analysis.py",
+    "page:Stock_Prediction": "pages/Stock_Prediction.py",
+    "page:Portfolio_Analysis": "pages/Portfolio_Analysis.py",
+}
+
+FIRST_REQUEST = """
+import json, os, time
+results = {}
+t = time.perf_counter()
+from pages.utils import analytics
+from pages.utils.indicators import INDICATORS
+if PRELOAD:
+    from pages.utils.preload import preload
+    preload()
+results["startup_ms"] = (time.perf_counter() - t) * 1000
+
+t = time.perf_counter()
+analytics.forecast("BENCH", "2023-01-02", 30)
+results["first_forecast_ms"] = (time.perf_counter() - t) * 1000
+
+bars = analytics.get_market_data().history("BENCH", "2023-01-02")
+t = time.perf_counter()
+analytics.indicators(bars, list(INDICATORS))
+results["first_indicators_ms"] = (time.perf_counter() - t) * 1000
+
+t = time.perf_counter()
+import plotly.graph_objects as go
+fig = go.Figure(go.Scatter(x=bars.index, y=bars["Close"]))
+fig.update_layout(template="plotly_dark")
+fig.to_json()
+results["first_chart_ms"] = (time.perf_counter() - t) * 1000
+print(json.dumps(results))
+"""
+
+
+def page_imports(path):
+    """The top-level import statements of a page script, as source."""
+    with open(os.path.join(ROOT, path)) as fh:
+        tree = ast.parse(fh.read())
+    return "\n".join(
+        ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def _run(args, env=None):
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": ROOT, **(env or {})},
+    )
+
+
+def importtime(code):
+    """(total ms, {package: self ms}) for ``code`` in a fresh interpreter."""
+    proc = _run(["-X", "importtime", "-c", code])
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    total, packages = 0, Counter()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us) / 1000
+        if not name.startswith("  "):  # top-level import: its cumulative covers its children
+            total += int(cumulative_us) / 1000
+    return total, packages
+
+
+def import_report(targets, repeat):
+    report = {}
+    for name, code in targets.items():
+        try:
+            runs = [importtime(code) for _ in range(repeat)]
+        except RuntimeError as exc:
+            report[name] = {"error": str(exc)}
+            continue
+        totals = [total for total, _ in runs]
+        packages = runs[-1][1]
+        report[name] = {
+            "total_ms": round(statistics.median(totals), 1),
+            "top_packages_ms": {k: round(v, 1) for k, v in packages.most_common(8)},
+        }
+    return report
+
+
+def first_request(repeat):
+    report = {}
+    for label, preload in (("cold", False), ("preloaded", True)):
+        runs = []
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as cache_dir:
+                proc = _run(
+                    ["-c", f"PRELOAD = {preload}\n{FIRST_REQUEST}"],
+                    env={"STOCKVISION_DATA_BACKEND": "fake", "STOCKVISION_CACHE_DIR": cache_dir},
+                )
+            if proc.returncode:
+                raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+            runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        report[label] = {
+            key: round(statistics.median(run[key] for run in runs), 1) for key in runs[0]
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time and cold-start report.")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per target")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    targets = {**MODULE_TARGETS, **{name: page_imports(path) for name, path in PAGES.items()}}
+    report = {
+        "imports": import_report(targets, args.repeat),
+        "first_request": first_request(args.repeat),
+    }
+
+    print(f"{'target':<26} {'import ms':>10}  heaviest packages (self ms)")
+    for name, entry in report["imports"].items():
+        if "error" in entry:
+            print(f"{name:<26} {'error':>10}  {entry['error']}")
+            continue
+        top = ", ".join(f"{k} {v:.0f}" for k, v in list(entry["top_packages_ms"].items())[:4])
+        print(f"{name:<26} {entry['total_ms']:>10.1f}  {top}")
+    print()
+    for label, timings in report["first_request"].items():
+        print(f"first request ({label}): " + ", ".join(f"{k} {v:.0f}" for k, v in timings.items()))
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
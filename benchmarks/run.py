@@ -0,0 +1,150 @@
+"""Run the benchmark suite offline and compare result files.
+
+    python -m benchmarks.run                       # all cases -> benchmarks/results/<commit>.json
+    python -m benchmarks.run -k arima --sizes 1y,5y
+    python -m benchmarks.run compare base.json new.json --threshold 1.10
+
+Each (case, size) is warmed up once, then timed until it has run at least
+``--min-repeat`` times and ``--min-time`` seconds. The median is the headline
+number; ``compare`` flags cases whose median grew by more than the threshold
+and exits non-zero if any did, so it can gate CI.
+"""
+import argparse
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.cases import CASES
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def measure(fn, min_time=0.2, min_repeat=3, max_repeat=100):
+    fn()  # warm-up: imports, caches, allocator
+    times = []
+    started = time.perf_counter()
+    while len(times) < max_repeat and (
+        len(times) < min_repeat or time.perf_counter() - started < min_time
+    ):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "repeat": len(times),
+    }
+
+
+def environment():
+    def version(module):
+        try:
+            return __import__(module).__version__
+        except ImportError:
+            return None
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True,
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = "unknown", False
+
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": {m: version(m) for m in ("numpy", "pandas", "scipy", "statsmodels", "plotly")},
+    }
+
+
+def run(patterns=None, sizes=None, min_time=0.2, min_repeat=3, out=sys.stdout):
+    results = {}
+    for spec in CASES.values():
+        if patterns and not any(fnmatch.fnmatch(spec.name, f"*{p}*") for p in patterns):
+            continue
+        for size in spec.sizes:
+            if sizes and size not in sizes:
+                continue
+            key = f"{spec.name}[{size}]"
+            results[key] = measure(spec.make(size), min_time, min_repeat)
+            print(f"{key:<36} {results[key]['median'] * 1000:>12.3f} ms", file=out, flush=True)
+    return {"meta": environment(), "results": results}
+
+
+def compare(base, new, threshold=1.10, out=sys.stdout):
+    """Print median ratios new/base; returns the keys that regressed."""
+    regressions = []
+    print(f"{'benchmark':<36} {'base ms':>12} {'new ms':>12} {'ratio':>7}", file=out)
+    for key in sorted(set(base["results"]) | set(new["results"])):
+        a, b = base["results"].get(key), new["results"].get(key)
+        if a is None or b is None:
+            cells = ["-" if r is None else f"{r['median'] * 1000:.3f}" for r in (a, b)]
+            print(f"{key:<36} {cells[0]:>12} {cells[1]:>12}", file=out)
+            continue
+        ratio = b["median"] / a["median"] if a["median"] else float("inf")
+        flag = "  REGRESSED" if ratio > threshold else ("  improved" if ratio < 1 / threshold else "")
+        if ratio > threshold:
+            regressions.append(key)
+        print(f"{key:<36} {a['median'] * 1000:>12.3f} {b['median'] * 1000:>12.3f} "
+              f"{ratio:>7.2f}{flag}", file=out)
+    return regressions
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv[:1] == ["compare"]:
+        parser = argparse.ArgumentParser(prog="benchmarks.run compare")
+        parser.add_argument("base")
+        parser.add_argument("new")
+        parser.add_argument("--threshold", type=float, default=1.10,
+                            help="Median ratio above which a case counts as regressed")
+        args = parser.parse_args(argv[1:])
+        with open(args.base) as fh:
+            base = json.load(fh)
+        with open(args.new) as fh:
+            new = json.load(fh)
+        return 1 if compare(base, new, args.threshold) else 0
+
+    parser = argparse.ArgumentParser(prog="benchmarks.run", description="Offline benchmark suite.")
+    parser.add_argument("-k", dest="patterns", action="append", help="Only cases matching (repeatable)")
+    parser.add_argument("--sizes", help="Comma-separated dataset sizes, e.g. 1y,5y,20y,1m")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds to time each case")
+    parser.add_argument("--min-repeat", type=int, default=3)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--list", action="store_true", help="List cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for spec in CASES.values():
+            print(f"{spec.name:<28} {', '.join(spec.sizes)}")
+        return 0
+
+    sizes = set(args.sizes.split(",")) if args.sizes else None
+    result = run(args.patterns, sizes, args.min_time, args.min_repeat)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{result['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as fh:
+        json.dump(result, fh, indent=1)
+    print(f"Wrote {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Monte Carlo throughput: simulated paths per second.
+
+    python -m benchmarks.simulation --paths 100000,1000000 --steps 30 --workers 1,4
+
+For each method, path count and worker count: wall time of ``simulate``
+(including process-pool startup when ``workers > 1``), paths per second and
+the peak traced memory of a single-process run, which stays at a few chunk
+blocks whatever the number of paths.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from benchmarks.data import ohlcv
+from pages.utils.simulation import DEFAULT_CHUNK, METHODS, simulate
+
+
+def measure(paths=(100_000, 1_000_000), steps=30, workers=(1,), chunk_size=DEFAULT_CHUNK):
+    values = ohlcv("5y")["Close"].to_numpy()
+    simulate(values, steps, chunk_size, chunk_size=chunk_size)  # warm-up
+    report = {}
+    for method in METHODS:
+        for n in paths:
+            for w in workers:
+                if w == 1:
+                    tracemalloc.start()
+                t0 = time.perf_counter()
+                sim = simulate(values, steps, n, method, chunk_size=chunk_size, workers=w)
+                seconds = time.perf_counter() - t0
+                peak = tracemalloc.get_traced_memory()[1] if w == 1 else None
+                if w == 1:
+                    tracemalloc.stop()
+                report[f"{method}[{n}x{steps}, {w}w]"] = {
+                    "seconds": seconds,
+                    "paths_per_second": sim.n_paths / seconds,
+                    "peak_mib": peak / 2**20 if peak is not None else None,
+                }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo paths per second.")
+    parser.add_argument("--paths", default="100000,1000000", help="Comma-separated path counts")
+    parser.add_argument("--steps", type=int, default=30, help="Steps per path")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}",
+                        help="Comma-separated worker counts")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = measure(
+        [int(x) for x in args.paths.split(",")],
+        args.steps,
+        sorted({int(x) for x in args.workers.split(",")}),
+        args.chunk_size,
+    )
+    print(f"{'case':<32} {'seconds':>9} {'paths/s':>12} {'peak MiB':>9}")
+    for key, row in report.items():
+        peak = f"{row['peak_mib']:.1f}" if row["peak_mib"] is not None else "-"
+        print(f"{key:<32} {row['seconds']:>9.3f} {row['paths_per_second']:>12,.0f} {peak:>9}")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
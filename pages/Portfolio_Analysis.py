@@ -0,0 +1,187 @@
+import streamlit as st
+import numpy as np
+import datetime
+
+from pages.utils.downsample import downsample_indices
+from pages.utils.instrumentation import Trace, render_panel
+from pages.utils.market_data import get_market_data
+from pages.utils.preload import start_from_env
+from pages.utils.risk import drawdown_series, heatmap_data, parse_portfolio, portfolio_risk
+from pages.utils.watchlist import close_matrix
+
+# --------------------------------------------------
+# Page Configuration
+# --------------------------------------------------
+st.set_page_config(
+    page_title="Portfolio Analysis",
+    page_icon="💼",
+    layout="wide",
+)
+
+# Warm heavy imports in the background when STOCKVISION_PRELOAD is set
+start_from_env()
+
+st.title("💼 Portfolio Risk Dashboard")
+
+# Stage timings for this rerun, shown in the Performance panel at the bottom
+perf = Trace("portfolio", profile=st.session_state.get("perf_profile_portfolio", False))
+
+# --------------------------------------------------
+# User Inputs
+# --------------------------------------------------
+today = datetime.date.today()
+
+col1, col2 = st.columns([2, 1])
+
+with col1:
+    holdings = st.text_area(
+        "Holdings (one per line or comma separated: TICKER WEIGHT; no weight = equal share)",
+        value="AAPL 20\nMSFT 20\nNVDA 15\nAMZN 15\nGOOGL 10\nMETA 10\nTSLA 10",
+        height=180,
+    )
+
+with col2:
+    start_date = st.date_input("Start Date", today - datetime.timedelta(days=365 * 2))
+    end_date = st.date_input("End Date", today)
+    benchmark = st.text_input("Benchmark (for beta)", value="SPY").upper().strip()
+
+rcol1, rcol2 = st.columns(2)
+with rcol1:
+    level = st.select_slider("VaR Confidence", options=[0.9, 0.95, 0.975, 0.99], value=0.95,
+                             format_func=lambda x: f"{x:.1%}")
+with rcol2:
+    risk_free = st.number_input("Risk-Free Rate (% per year)", min_value=0.0, max_value=20.0,
+                                value=0.0, step=0.25) / 100
+
+if start_date >= end_date:
+    st.error("End date must be after start date.")
+    st.stop()
+
+try:
+    weights = parse_portfolio(holdings)
+except ValueError as e:
+    st.error(f"Invalid holdings: {e}")
+    st.stop()
+
+if not weights:
+    st.info("Enter at least one holding.")
+    st.stop()
+
+market = get_market_data()
+
+# --------------------------------------------------
+# Load Data (one batched fetch for the whole book)
+# --------------------------------------------------
+symbols = list(weights) + ([benchmark] if benchmark and benchmark not in weights else [])
+with st.spinner(f"Loading {len(symbols)} tickers..."):
+    try:
+        with perf.stage("portfolio.load") as rec:
+            frames = market.history_many(symbols, start_date, end_date)
+            for frame in frames.values():
+                rec.payload(frame)
+    except Exception as e:
+        st.error(f"Error loading data: {str(e)}")
+        st.stop()
+
+with perf.stage("portfolio.matrix") as rec:
+    close = rec.payload(close_matrix(frames))
+
+missing = [t for t in weights if t not in close.columns]
+if missing:
+    st.warning(f"No data for: {', '.join(missing)} (excluded; remaining weights rescaled)")
+
+# --------------------------------------------------
+# Risk Metrics (batched over the aligned matrix)
+# --------------------------------------------------
+try:
+    with perf.stage("portfolio.risk"):
+        report = portfolio_risk(
+            close,
+            weights,
+            benchmark=close[benchmark] if benchmark in close.columns else None,
+            risk_free=risk_free,
+            level=level,
+        )
+except ValueError as e:
+    st.error(str(e))
+    render_panel(perf)
+    st.stop()
+
+st.caption(
+    f"{len(report.tickers)} holdings over {len(report.dates):,} common trading days "
+    f"({report.dates[0]:%Y-%m-%d} to {report.dates[-1]:%Y-%m-%d})"
+)
+
+st.markdown("## Portfolio")
+summary = report.portfolio
+kcols = st.columns(5)
+kcols[0].metric("Ann. Return", f"{summary['Ann. Return %']:.2f}%")
+kcols[1].metric("Volatility", f"{summary['Volatility %']:.2f}%")
+kcols[2].metric("Sharpe", f"{summary['Sharpe']:.2f}")
+kcols[3].metric("Beta", "N/A" if np.isnan(summary["Beta"]) else f"{summary['Beta']:.2f}")
+kcols[4].metric("Max Drawdown", f"{summary['Max Drawdown %']:.2f}%")
+
+kcols = st.columns(5)
+kcols[0].metric(f"1-Day VaR {level:.1%} (hist)", f"{summary['VaR Hist %']:.2f}%")
+kcols[1].metric(f"1-Day CVaR {level:.1%} (hist)", f"{summary['CVaR Hist %']:.2f}%")
+kcols[2].metric(f"1-Day VaR {level:.1%} (normal)", f"{summary['VaR Param %']:.2f}%")
+kcols[3].metric(f"1-Day CVaR {level:.1%} (normal)", f"{summary['CVaR Param %']:.2f}%")
+kcols[4].metric("Diversification", f"{summary['Diversification %']:.1f}%")
+
+# --------------------------------------------------
+# Charts
+# --------------------------------------------------
+# Plotly is only needed once there are results to chart
+import plotly.graph_objects as go
+
+with perf.stage("chart.performance"):
+    wealth = np.cumprod(1 + report.portfolio_returns)
+    drawdown = drawdown_series(report.portfolio_returns)
+    idx = downsample_indices(report.dates.to_numpy(), wealth, 1600)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=report.dates[idx], y=(wealth[idx] - 1) * 100, mode="lines", name="Cumulative Return %",
+    ))
+    fig.add_trace(go.Scatter(
+        x=report.dates[idx], y=drawdown[idx] * 100, mode="lines", name="Drawdown %",
+        fill="tozeroy", line=dict(color="#ef4444", width=1),
+    ))
+    fig.update_layout(template="plotly_dark", height=420, title="Portfolio Growth and Drawdown")
+    st.plotly_chart(fig, use_container_width=True)
+
+st.markdown("## Holdings")
+st.dataframe(
+    report.assets.sort_values("Risk Contribution %", ascending=False).round(2),
+    hide_index=True,
+    use_container_width=True,
+)
+
+st.markdown("## Correlation")
+max_cells = st.select_slider(
+    "Heatmap Resolution (cells per side)", options=[30, 60, 100, 150], value=60,
+    help="Larger books are clustered and block-averaged to this many rows and columns.",
+)
+with perf.stage("chart.correlation") as rec:
+    matrix, labels = heatmap_data(report.corr, report.tickers, max_cells)
+    rec.payload(matrix)
+    if len(labels) < len(report.tickers):
+        st.caption(
+            f"{len(report.tickers)} × {len(report.tickers)} matrix shown as "
+            f"{len(labels)} × {len(labels)} clustered blocks (mean correlation per block)"
+        )
+    heatmap = go.Figure(go.Heatmap(
+        z=matrix, x=labels, y=labels, zmin=-1, zmax=1, colorscale="RdBu_r",
+        hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>",
+    ))
+    heatmap.update_layout(
+        template="plotly_dark",
+        height=min(300 + 12 * len(labels), 1100),
+        yaxis=dict(autorange="reversed"),
+    )
+    st.plotly_chart(heatmap, use_container_width=True)
+
+with st.expander("Full correlation matrix"):
+    st.dataframe(report.corr_frame().round(3))
+
+render_panel(perf)
@@ -1,8 +1,20 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import yfinance as yf
-import plotly.graph_objects as go
 import datetime
+import os
+from concurrent.futures import as_completed
+
+from pages.utils import analytics
+from pages.utils.downsample import METHODS as DOWNSAMPLE_METHODS, downsample_indices, minmax
+from pages.utils.indicators import INDICATORS
+from pages.utils.instrumentation import Trace, render_panel
+from pages.utils.intervals import INTERVALS
+from pages.utils.market_data import get_market_data
+from pages.utils.plotly_figure import plotly_table
+from pages.utils.preload import start_from_env
+from pages.utils.prewarm import record as record_request
+from pages.utils.watchlist import close_matrix, parse_tickers, watchlist_summary
 
 # --------------------------------------------------
 # Page Configuration
@@ -33,17 +45,31 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Warm heavy imports in the background when STOCKVISION_PRELOAD is set
+start_from_env()
+
 st.title("📊 Stock Analysis Dashboard")
 
+# Stage timings for this rerun, shown in the Performance panel at the bottom
+perf = Trace("analysis", profile=st.session_state.get("perf_profile_analysis", False))
+
 # --------------------------------------------------
 # User Inputs
 # --------------------------------------------------
-col1, col2, col3 = st.columns(3)
+mode = st.radio("Mode", ["Single Ticker", "Watchlist", "Live"], horizontal=True)
+
+col1, col2, col3, col4 = st.columns(4)
 
 today = datetime.date.today()
 
 with col1:
-    ticker = st.text_input("Enter Stock Ticker", value="TSLA").upper().strip()
+    if mode == "Watchlist":
+        tickers = parse_tickers(st.text_area(
+            "Tickers (comma or space separated)",
+            value="AAPL, MSFT, NVDA, TSLA, AMZN, GOOGL, META",
+        ))
+    else:
+        ticker = st.text_input("Enter Stock Ticker", value="TSLA").upper().strip()
 
 with col2:
     start_date = st.date_input("Start Date", today - datetime.timedelta(days=365))
@@ -51,209 +77,488 @@ with col2:
 with col3:
     end_date = st.date_input("End Date", today)
 
+with col4:
+    # The watchlist summary is always built from daily bars
+    interval = st.selectbox(
+        "Interval", list(INTERVALS), index=list(INTERVALS).index("1d"),
+        disabled=mode == "Watchlist",
+    )
+
 if start_date >= end_date:
     st.error("End date must be after start date.")
     st.stop()
 
+lookback = INTERVALS[interval].lookback_days
+if mode != "Watchlist" and lookback and start_date < today - datetime.timedelta(days=lookback):
+    st.caption(f"{interval} bars only go back {lookback} days; older dates will be empty.")
+
+market = get_market_data()
+
 # --------------------------------------------------
-# Load Data (Cached)
+# Watchlist
 # --------------------------------------------------
-@st.cache_data(ttl=300)  # cache 5 minutes
-def load_data(ticker, start, end):
-    return yf.download(ticker, start=start, end=end, progress=False)
-
-try:
-    stock = yf.Ticker(ticker)
-    info = stock.info
-    data = load_data(ticker, start_date, end_date)
-except Exception as e:
-    st.error(f"Error loading data: {str(e)}")
-    st.stop()
-
-if data.empty:
-    st.warning("No data found for the selected ticker and date range.")
+if mode == "Watchlist":
+    if not tickers:
+        st.info("Enter at least one ticker.")
+        st.stop()
+
+    # Always load a full year so the 52-week range is meaningful
+    fetch_start = min(start_date, end_date - datetime.timedelta(days=365))
+    with st.spinner(f"Loading {len(tickers)} tickers..."):
+        try:
+            with perf.stage("watchlist.load") as rec:
+                frames = market.history_many(tickers, fetch_start, end_date)
+                for frame in frames.values():
+                    rec.payload(frame)
+        except Exception as e:
+            st.error(f"Error loading data: {str(e)}")
+            st.stop()
+
+    with perf.stage("watchlist.summary"):
+        summary = watchlist_summary(close_matrix(frames))
+    missing = [t for t in tickers if t not in set(summary["Ticker"])]
+    if missing:
+        st.warning(f"No data for: {', '.join(missing)}")
+
+    st.markdown("## Watchlist")
+    with perf.stage("watchlist.table"):
+        st.plotly_chart(
+            plotly_table(summary.round(2), height=min(120 + 28 * len(summary), 2400)),
+            use_container_width=True,
+        )
+    render_panel(perf)
     st.stop()
 
-# Reset index so Date is a column
-data.reset_index(inplace=True)
-
 # --------------------------------------------------
-# Safely get Close prices as Series
+# Chart Styles (live and single-ticker charts)
 # --------------------------------------------------
-close_prices = data["Close"]
+INDICATOR_STYLES = {
+    "SMA 20": dict(dash="dot", color='#10b981'),
+    "SMA 50": dict(dash="dash", color='#f59e0b'),
+    "EMA 20": dict(dash="dot", color='#38bdf8'),
+    "BB Lower": dict(width=1, color='#a78bfa'),
+    "BB Mid": dict(width=1, dash="dot", color='#a78bfa'),
+    "BB Upper": dict(width=1, color='#a78bfa'),
+    "VWAP": dict(dash="dashdot", color='#f472b6'),
+    "MACD Signal": dict(dash="dot"),
+}
 
-# Handle multi-index / single-ticker weirdness in recent yfinance
-if isinstance(close_prices, pd.DataFrame):
-    # Most common case: columns = MultiIndex with ticker name
-    if ticker in close_prices.columns:
-        close_prices = close_prices[ticker]
+# --------------------------------------------------
+# Live Mode
+# --------------------------------------------------
+LIVE_WINDOW = 390  # bars on the live chart: one regular session of 1m bars
+
+def live_feed(ticker, source_kind, setting, live_interval, names):
+    """This session's feed; a new one replaces it when the configuration changes."""
+    from pages.utils.live import LiveFeed, PollingSource, ReplaySource
+
+    config = (ticker, source_kind, *setting, live_interval, tuple(names))
+    current = st.session_state.get("live_feed")
+    if current is not None and current[0] == config and current[1].running:
+        return current[1]
+    if current is not None:
+        current[1].stop()
+    if source_kind == "Replay file":
+        path, rate = setting
+        source, poll_seconds = ReplaySource(path, bars_per_second=rate), min(1.0, 1 / rate)
     else:
-        # Fallback: take first column
-        close_prices = close_prices.iloc[:, 0]
+        source, poll_seconds = PollingSource(market, live_interval), setting[0]
+    feed = LiveFeed(source, ticker, names, capacity=4 * LIVE_WINDOW, poll_seconds=poll_seconds)
+    feed.prime()
+    st.session_state.live_feed = (config, feed.start())
+    st.session_state.live_view = {"feed": id(feed), "cursor": None, "fig": None}
+    return feed
+
+def push_live_points(feed):
+    """Extend the chart's traces with only the bars added since the last refresh."""
+    import plotly.graph_objects as go
+
+    view = st.session_state.live_view
+    rows, view["cursor"] = feed.since(view["cursor"])
+    overlays = [c for n in feed.indicator_names if not INDICATORS[n].panel for c in INDICATORS[n].columns]
+    if view["fig"] is None:
+        fig = go.Figure(go.Scatter(
+            x=[], y=[], mode="lines", name="Close", line=dict(width=2.2, color='#6366f1'),
+        ))
+        for column in overlays:
+            fig.add_trace(go.Scatter(
+                x=[], y=[], mode="lines", name=column, line=INDICATOR_STYLES.get(column, {}),
+            ))
+        fig.update_layout(
+            template="plotly_dark",
+            height=520,
+            margin=dict(l=10, r=10, t=30, b=10),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            uirevision="live",  # keep the user's zoom across refreshes
+        )
+        view["fig"] = fig
+    fig = view["fig"]
+    if len(rows):
+        with fig.batch_update():
+            for trace, column in zip(fig.data, ["Close", *overlays]):
+                x = np.asarray(trace.x, dtype="datetime64[ns]")
+                y = np.asarray(trace.y, dtype="float64")
+                trace.x = np.concatenate([x, rows.index.to_numpy()])[-LIVE_WINDOW:]
+                trace.y = np.concatenate([y, rows[column].to_numpy()])[-LIVE_WINDOW:]
+    return fig
+
+if mode == "Live":
+    live_interval = interval if INTERVALS[interval].intraday else "1m"
+    lcol1, lcol2, lcol3 = st.columns(3)
+    with lcol1:
+        source_kind = st.radio("Quote Source", ["Market data", "Replay file"], horizontal=True)
+        streaming = st.toggle("Stream", value=True)
+    with lcol2:
+        if source_kind == "Replay file":
+            live_setting = (
+                st.text_input("Recording (CSV or Parquet)", value=""),
+                st.number_input("Bars per second", min_value=0.1, max_value=100.0, value=2.0),
+            )
+        else:
+            live_setting = (st.number_input("Poll every (seconds)", min_value=1, max_value=300, value=15),)
+            st.caption(f"Polling {live_interval} bars through the shared cache")
+    with lcol3:
+        live_indicators = st.multiselect("Indicators", options=list(INDICATORS), default=["VWAP", "RSI 14"])
+
+    if source_kind == "Replay file" and not os.path.exists(live_setting[0]):
+        st.info("Enter the path of a recorded OHLCV file, e.g. from "
+                "`python -m pages.utils.live record TSLA --out tsla.csv`.")
+        render_panel(perf)
+        st.stop()
+
+    try:
+        with perf.stage("live.start"):
+            feed = live_feed(ticker, source_kind, live_setting, live_interval, live_indicators)
+    except Exception as e:
+        st.error(f"Error starting live feed: {str(e)}")
+        st.stop()
+    feed.paused = not streaming
+
+    @st.fragment(run_every=1 if streaming else None)
+    def live_view():
+        # Only this fragment reruns on each tick; the rest of the page stays put
+        kpis = feed.kpis()
+        if kpis is None:
+            st.info("Waiting for the first bars...")
+            return
+        kcol1, kcol2, kcol3, kcol4 = st.columns(4)
+        kcol1.metric("Last", f"${kpis['Close']:,.2f}", f"{kpis['Session Change %']:+.2f}% today")
+        kcol2.metric("Session High", f"${kpis['Session High']:,.2f}")
+        kcol3.metric("Session Low", f"${kpis['Session Low']:,.2f}")
+        kcol4.metric("Bars", f"{kpis['Bars']:,}")
+        readings = [f"{c} {kpis[c]:,.2f}" for c in feed.indicator_columns if not pd.isna(kpis[c])]
+        st.caption(" • ".join([f"Last bar {kpis['Time']:%Y-%m-%d %H:%M}", *readings]))
+        if feed.error:
+            st.warning(f"Last poll failed: {feed.error}")
+        elif getattr(feed.source, "finished", False):
+            st.caption("Replay finished.")
+
+        st.plotly_chart(push_live_points(feed), use_container_width=True, key="live_chart")
+
+    live_view()
+    render_panel(perf)
+    st.stop()
 
-# Final squeeze just in case
-close_prices = close_prices.squeeze()
+# --------------------------------------------------
+# Load Data (cached by the shared market-data provider)
+# --------------------------------------------------
+def load_data(ticker, start, end, interval="1d"):
+    return market.bars(ticker, interval, start, end)
 
-if not isinstance(close_prices, pd.Series):
-    st.error("Could not extract Close prices as a Series. Data format issue.")
-    st.stop()
+@st.cache_data(ttl=60, max_entries=512, show_spinner=False)
+def indicator_frame(ticker, start, end, interval, name):
+    # Cached per indicator: toggling one never recomputes the others
+    return analytics.indicators(load_data(ticker, start, end, interval), [name])
 
 # --------------------------------------------------
 # Company Info
 # --------------------------------------------------
-st.markdown("## Company Overview")
+def render_overview(info):
+    st.markdown("## Company Overview")
 
-col1, col2 = st.columns(2)
+    col1, col2 = st.columns(2)
 
-with col1:
-    st.markdown(f"""
-    <div class="card">
-    <h3>{info.get('longName', ticker)}</h3>
-    <p class="subtle">{info.get('sector', '—')} • {info.get('industry', '—')}</p>
-    <p><b>Website:</b> {info.get('website', 'N/A')}</p>
-    <p><b>Employees:</b> {info.get('fullTimeEmployees', 'N/A'):,}</p>
-    </div>
-    """, unsafe_allow_html=True)
+    with col1:
+        st.markdown(f"""
+        <div class="card">
+        <h3>{info.get('longName', ticker)}</h3>
+        <p class="subtle">{info.get('sector', '—')} • {info.get('industry', '—')}</p>
+        <p><b>Website:</b> {info.get('website', 'N/A')}</p>
+        <p><b>Employees:</b> {info.get('fullTimeEmployees', 'N/A'):,}</p>
+        </div>
+        """, unsafe_allow_html=True)
 
-with col2:
-    market_cap = info.get('marketCap')
-    pe = info.get('trailingPE')
+    with col2:
+        market_cap = info.get('marketCap')
+        pe = info.get('trailingPE')
     
-    st.markdown(f"""
-    <div class="card">
-    <h4>Market Cap</h4>
-    <h2>{f"${market_cap:,.0f}" if market_cap else 'N/A'}</h2>
-    <hr>
-    <h4>P/E Ratio (TTM)</h4>
-    <h2>{f"{pe:.2f}" if pe else 'N/A'}</h2>
-    </div>
-    """, unsafe_allow_html=True)
+        st.markdown(f"""
+        <div class="card">
+        <h4>Market Cap</h4>
+        <h2>{f"${market_cap:,.0f}" if market_cap else 'N/A'}</h2>
+        <hr>
+        <h4>P/E Ratio (TTM)</h4>
+        <h2>{f"{pe:.2f}" if pe else 'N/A'}</h2>
+        </div>
+        """, unsafe_allow_html=True)
 
 # --------------------------------------------------
-# KPIs
+# Prices: KPIs, Indicators & Charts
 # --------------------------------------------------
-st.markdown("## Key Metrics")
-
-col1, col2, col3 = st.columns(3)
-
-# Daily change
-daily_change_pct = close_prices.pct_change() * 100
-
-with col1:
-    if len(close_prices) > 1:
-        last_change = daily_change_pct.iloc[-1]
-        delta_color = "normal" if last_change >= 0 else "inverse"
-        st.metric(
-            "Daily Change",
-            f"{last_change:+.2f}%",
-            delta=None,
-            delta_color=delta_color
+def render_prices(data):
+    # Plotly is only needed once there is something to chart
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    if data.empty:
+        st.warning("No data found for the selected ticker and date range.")
+        return
+
+    # Reset index so Date is a column
+    data.reset_index(inplace=True)
+
+    close_prices = data["Close"]
+
+    # --------------------------------------------------
+    # KPIs
+    # --------------------------------------------------
+    st.markdown("## Key Metrics")
+
+    col1, col2, col3 = st.columns(3)
+
+    # Daily change
+    daily_change_pct = close_prices.pct_change() * 100
+
+    with col1:
+        if len(close_prices) > 1:
+            last_change = daily_change_pct.iloc[-1]
+            delta_color = "normal" if last_change >= 0 else "inverse"
+            st.metric(
+                "Daily Change" if interval == "1d" else f"Change ({interval})",
+                f"{last_change:+.2f}%",
+                delta=None,
+                delta_color=delta_color
+            )
+        else:
+            st.metric("Daily Change", "N/A")
+
+    with perf.stage("metrics.52w"):
+        high_52, low_52 = analytics.week52_range(ticker, end_date, market)
+
+    with col2:
+        st.metric("52-Week High", f"${high_52:,.2f}" if high_52 is not None else "N/A")
+
+    with col3:
+        st.metric("52-Week Low", f"${low_52:,.2f}" if low_52 is not None else "N/A")
+
+    # --------------------------------------------------
+    # Technical Indicators
+    # --------------------------------------------------
+    selected_indicators = st.multiselect(
+        "Indicators",
+        options=list(INDICATORS),
+        default=["SMA 20", "SMA 50"],
+    )
+    with perf.stage("indicators"):
+        indicators = {
+            name: indicator_frame(ticker, start_date, end_date, interval, name)
+            for name in selected_indicators
+        }
+
+    # --------------------------------------------------
+    # Price Chart
+    # --------------------------------------------------
+    st.markdown("## Price Trend")
+
+    with st.expander("Chart Settings"):
+        ccol1, ccol2 = st.columns(2)
+        with ccol1:
+            ds_method = st.radio("Downsampling", DOWNSAMPLE_METHODS, horizontal=True)
+        with ccol2:
+            chart_width = st.select_slider(
+                "Chart Width (px)",
+                options=[600, 800, 1200, 1600, 2400, 3200],
+                value=1600,
+            )
+
+    # Zooming re-slices the full-resolution data, then downsamples the window
+    dates = data["Date"]
+    view_start, view_end = 0, len(data)
+    if len(data) > 1:
+        zoom = st.slider(
+            "Zoom",
+            min_value=dates.iloc[0].date(),
+            max_value=dates.iloc[-1].date(),
+            value=(dates.iloc[0].date(), dates.iloc[-1].date()),
+            format="YYYY-MM-DD",
+        )
+        view_start = int(dates.searchsorted(pd.Timestamp(zoom[0])))
+        view_end = max(
+            int(dates.searchsorted(pd.Timestamp(zoom[1]) + pd.Timedelta(days=1))),
+            view_start + 1,
         )
-    else:
-        st.metric("Daily Change", "N/A")
-
-with col2:
-    high_52 = close_prices.max()
-    st.metric("52-Week High", f"${high_52:,.2f}")
-
-with col3:
-    low_52 = close_prices.min()
-    st.metric("52-Week Low", f"${low_52:,.2f}")
 
-# --------------------------------------------------
-# Moving Averages
-# --------------------------------------------------
-data["MA20"] = close_prices.rolling(window=20).mean()
-data["MA50"] = close_prices.rolling(window=50).mean()
+    with perf.stage("chart.price"):
+        view = slice(view_start, view_end)
+        idx = view_start + downsample_indices(
+            dates.iloc[view].to_numpy(), close_prices.iloc[view].to_numpy(), chart_width, ds_method,
+        )
+        if ds_method == "Off":
+            vol_idx = idx
+        else:
+            vol_idx = view_start + minmax(data["Volume"].iloc[view].to_numpy(), chart_width, keep="max")
+        st.caption(f"Plotting {len(idx):,} of {view_end - view_start:,} bars")
+        # Indicator frames come from their own cache and may lag ``data`` by a
+        # bar or more: pick their rows by timestamp, not position
+        plot_dates = dates.iloc[idx].to_numpy()
+
+        fig = go.Figure()
+
+        fig.add_trace(go.Scatter(
+            x=dates.iloc[idx],
+            y=close_prices.iloc[idx],
+            mode="lines",
+            name="Close Price",
+            line=dict(width=2.2, color='#6366f1')
+        ))
+
+        for name, frame in indicators.items():
+            if INDICATORS[name].panel:
+                continue
+            frame = frame.reindex(plot_dates)
+            for column in frame.columns:
+                fig.add_trace(go.Scatter(
+                    x=frame.index,
+                    y=frame[column],
+                    mode="lines",
+                    name=column,
+                    line=INDICATOR_STYLES.get(column, {}),
+                ))
+
+        fig.update_layout(
+            template="plotly_dark",
+            height=580,
+            hovermode="x unified",
+            margin=dict(l=10, r=10, t=30, b=10),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            xaxis_rangeslider_visible=False
+        )
 
-# --------------------------------------------------
-# Price Chart
-# --------------------------------------------------
-st.markdown("## Price Trend")
-
-fig = go.Figure()
-
-fig.add_trace(go.Scatter(
-    x=data["Date"],
-    y=close_prices,
-    mode="lines",
-    name="Close Price",
-    line=dict(width=2.2, color='#6366f1')
-))
-
-fig.add_trace(go.Scatter(
-    x=data["Date"],
-    y=data["MA20"],
-    mode="lines",
-    name="20-day MA",
-    line=dict(dash="dot", color='#10b981')
-))
-
-fig.add_trace(go.Scatter(
-    x=data["Date"],
-    y=data["MA50"],
-    mode="lines",
-    name="50-day MA",
-    line=dict(dash="dash", color='#f59e0b')
-))
-
-fig.update_layout(
-    template="plotly_dark",
-    height=580,
-    hovermode="x unified",
-    margin=dict(l=10, r=10, t=30, b=10),
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-    xaxis_rangeslider_visible=False
-)
+        st.plotly_chart(fig, use_container_width=True)
+
+    panels = [name for name in indicators if INDICATORS[name].panel]
+    with perf.stage("chart.panels"):
+        if panels:
+            panel_fig = make_subplots(
+                rows=len(panels), cols=1, shared_xaxes=True,
+                vertical_spacing=0.06, subplot_titles=panels,
+            )
+            for row, name in enumerate(panels, start=1):
+                frame = indicators[name].reindex(plot_dates)
+                for column in frame.columns:
+                    if column == "MACD Hist":
+                        panel_fig.add_trace(go.Bar(
+                            x=frame.index, y=frame[column], name=column, marker_color='#6b7280',
+                        ), row=row, col=1)
+                    else:
+                        panel_fig.add_trace(go.Scatter(
+                            x=frame.index, y=frame[column], mode="lines", name=column,
+                            line=INDICATOR_STYLES.get(column, {}),
+                        ), row=row, col=1)
+
+            panel_fig.update_layout(
+                template="plotly_dark",
+                height=220 * len(panels),
+                margin=dict(l=10, r=10, t=30, b=10),
+                showlegend=False,
+            )
+            st.plotly_chart(panel_fig, use_container_width=True)
+
+    # --------------------------------------------------
+    # Volume Chart
+    # --------------------------------------------------
+    st.markdown("## Trading Volume")
+
+    with perf.stage("chart.volume"):
+        vol_fig = go.Figure()
+
+        vol_fig.add_trace(go.Bar(
+            x=dates.iloc[vol_idx],
+            y=data["Volume"].iloc[vol_idx],
+            name="Volume",
+            marker_color='#6b7280'
+        ))
+
+        vol_fig.update_layout(
+            template="plotly_dark",
+            height=320,
+            margin=dict(l=10, r=10, t=30, b=10),
+            xaxis_rangeslider_visible=False
+        )
 
-st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(vol_fig, use_container_width=True)
 
 # --------------------------------------------------
-# Volume Chart
+# News Section
 # --------------------------------------------------
-st.markdown("## Trading Volume")
-
-vol_fig = go.Figure()
-
-vol_fig.add_trace(go.Bar(
-    x=data["Date"],
-    y=data["Volume"],
-    name="Volume",
-    marker_color='#6b7280'
-))
-
-vol_fig.update_layout(
-    template="plotly_dark",
-    height=320,
-    margin=dict(l=10, r=10, t=30, b=10),
-    xaxis_rangeslider_visible=False
-)
+def render_news(news):
+    st.markdown("## Recent News")
+
+    if news:
+        for item in news[:6]:
+            pub_time = item.get('providerPublishTime', '')
+            if pub_time:
+                from datetime import datetime
+                pub_time = datetime.fromtimestamp(pub_time).strftime("%b %d, %Y")
+        
+            st.markdown(f"""
+            <div class="card">
+            <h4>{item.get('title', '—')}</h4>
+            <p class="subtle">{item.get('publisher', '—')} • {pub_time}</p>
+            <a href="{item.get('link', '#')}" target="_blank">Read More →</a>
+            </div>
+            """, unsafe_allow_html=True)
+    else:
+        st.info("No recent news available at the moment.")
 
-st.plotly_chart(vol_fig, use_container_width=True)
+# Counted once per session and view, so the pre-warmer replays what people look at
+view = ("analysis", ticker, interval, start_date, end_date)
+if st.session_state.get("prewarm_view_analysis") != view:
+    st.session_state["prewarm_view_analysis"] = view
+    record_request(*view)
 
 # --------------------------------------------------
-# News Section
+# Concurrent Loading with Progressive Rendering
 # --------------------------------------------------
-st.markdown("## Recent News")
-
-news = stock.news
-
-if news:
-    for item in news[:6]:
-        pub_time = item.get('providerPublishTime', '')
-        if pub_time:
-            from datetime import datetime
-            pub_time = datetime.fromtimestamp(pub_time).strftime("%b %d, %Y")
-        
-        st.markdown(f"""
-        <div class="card">
-        <h4>{item.get('title', '—')}</h4>
-        <p class="subtle">{item.get('publisher', '—')} • {pub_time}</p>
-        <a href="{item.get('link', '#')}" target="_blank">Read More →</a>
-        </div>
-        """, unsafe_allow_html=True)
-else:
-    st.info("No recent news available at the moment.")
+# Fundamentals, prices and news are independent: fetch them in parallel and
+# fill each section as soon as its own data arrives.
+sections = {
+    "info": (st.container(), render_overview, "company info"),
+    "prices": (st.container(), render_prices, "price data"),
+    "news": (st.container(), render_news, "news"),
+}
+pending = {
+    market.submit(perf.wrap("info.load", market.info), ticker): "info",
+    market.submit(perf.wrap("prices.load", load_data), ticker, start_date, end_date, interval): "prices",
+    market.submit(perf.wrap("news.load", market.news), ticker): "news",
+}
+placeholders = {}
+for kind, (box, _, label) in sections.items():
+    with box:
+        placeholders[kind] = st.empty()
+        placeholders[kind].info(f"Loading {label}...")
+
+for future in as_completed(pending):
+    kind = pending[future]
+    box, render, label = sections[kind]
+    placeholders[kind].empty()
+    with box:
+        try:
+            result = future.result()
+        except Exception as e:
+            st.error(f"Error loading {label}: {str(e)}")
+            continue
+        render(result)
 
 # --------------------------------------------------
 # Disclaimer
@@ -262,4 +567,6 @@ st.markdown("""
 <br><br>
 ⚠️ **Disclaimer:** This dashboard is for educational and informational purposes only.  
 It is **not** financial advice. Always do your own research and consult a qualified advisor.
-""")
\ No newline at end of file
+""")
+
+render_panel(perf)
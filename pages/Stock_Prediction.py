@@ -1,9 +1,19 @@
 import streamlit as st
-import pandas as pd
-import yfinance as yf
-import plotly.graph_objects as go
 import datetime
-from statsmodels.tsa.arima.model import ARIMA
+import os
+
+from pages.utils import analytics
+from pages.utils.backtest import MIN_TRAIN, max_origins, walk_forward, walk_forward_model
+from pages.utils.downsample import downsample_indices
+from pages.utils.forecasters import BACKENDS, ENSEMBLE, INTERACTIVE_BUDGET
+from pages.utils.instrumentation import Trace, render_panel
+from pages.utils.intervals import INTERVALS
+from pages.utils.market_data import get_market_data
+from pages.utils.model_train import DEFAULT_ORDER
+from pages.utils.preload import start_from_env
+from pages.utils.prewarm import order_choice, record as record_request
+from pages.utils.simulation import METHODS as SIMULATION_METHODS, simulate
+from pages.utils.trading_calendar import calendar_for_ticker
 
 # Page Configuration
 st.set_page_config(
@@ -12,10 +22,16 @@ st.set_page_config(
     layout="wide",
 )
 
+# Warm heavy imports in the background when STOCKVISION_PRELOAD is set
+start_from_env()
+
 st.title("📈 Stock Price Prediction")
 
+# Stage timings for this rerun, shown in the Performance panel at the bottom
+perf = Trace("prediction", profile=st.session_state.get("perf_profile_prediction", False))
+
 # User Inputs
-col1, col2, col3 = st.columns(3)
+col1, col2, col3, col4 = st.columns(4)
 today = datetime.date.today()
 
 with col1:
@@ -30,28 +46,89 @@ with col2:
     )
 
 with col3:
+    interval = st.selectbox("Interval", list(INTERVALS), index=list(INTERVALS).index("1d"))
+
+with col4:
+    # Forecast steps are bars of the chosen interval
     forecast_days = st.number_input(
-        "Forecast Days",
+        "Forecast Days" if interval == "1d" else f"Forecast Bars ({interval})",
         min_value=1,
         max_value=90,
         value=30,
     )
 
+with st.expander("Model Settings"):
+    model_choice = st.selectbox(
+        "Model",
+        ["auto", *BACKENDS, ENSEMBLE],
+        index=1,
+        format_func=lambda name: (
+            f"Auto (best expected to fit in {INTERACTIVE_BUDGET:g}s)" if name == "auto"
+            else "Ensemble (all models, weighted by holdout error)" if name == ENSEMBLE
+            else BACKENDS[name].label
+        ),
+    )
+    is_arima = model_choice == "arima"
+    mcol1, mcol2, mcol3 = st.columns(3)
+    with mcol1:
+        use_auto_order = st.checkbox(
+            "Auto-select ARIMA order",
+            help="Search (p, d, q) by information criterion instead of the default (5, 1, 0).",
+            disabled=not is_arima,
+        ) and is_arima
+    with mcol2:
+        criterion = st.radio("Criterion", ["aic", "bic"], horizontal=True, disabled=not use_auto_order)
+    with mcol3:
+        search_budget = st.number_input(
+            "Search Budget (seconds)", min_value=2, max_value=120, value=20,
+            disabled=not use_auto_order,
+        )
+
 # --------------------------------------------------
-# Cached Data Loader
+# Data Loader (cached by the shared market-data provider)
 # --------------------------------------------------
-@st.cache_data(show_spinner=False)
-def load_stock_data(symbol, start):
-    data = yf.download(symbol, start=start)
+def load_stock_data(symbol, start, interval="1d"):
+    data = get_market_data().bars(symbol, interval, start)
     data.reset_index(inplace=True)
     return data
 
+@st.cache_data(show_spinner=False, max_entries=32)
+def run_backtest(symbol, values, model_name, order, horizon, n_origins, refit_every):
+    if model_name != "arima":
+        return walk_forward_model(values, model_name, horizon=horizon, n_origins=n_origins)
+    return walk_forward(
+        values,
+        horizon=horizon,
+        n_origins=n_origins,
+        refit_every=refit_every,
+        order=order,
+    )
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def run_simulation(symbol, values, steps, n_paths, method, workers, seed):
+    # Only the summaries are cached; the paths themselves never exist in full
+    sim = simulate(values, steps, n_paths, method, seed=seed, workers=workers)
+    return sim.fan(), sim.touch_table(), sim.touch_probability(), sim.paths_per_second, sim.elapsed
+
 # --------------------------------------------------
 # Main Logic
 # --------------------------------------------------
 if stock_symbol:
+    # Charting is only needed once there is a symbol to forecast
+    import plotly.graph_objects as go
+
+    # Counted once per session and view, so the pre-warmer replays what people look at
+    view = (
+        "prediction", stock_symbol, interval, start_date, None, model_choice,
+        order_choice("auto" if use_auto_order else None, criterion),
+    )
+    if st.session_state.get("prewarm_view_prediction") != view:
+        st.session_state["prewarm_view_prediction"] = view
+        record_request(*view)
+
     try:
-        stock_data = load_stock_data(stock_symbol, start_date)
+        with perf.stage("prices.load") as rec:
+            stock_data = rec.payload(load_stock_data(stock_symbol, start_date, interval))
 
         if stock_data.empty:
             st.warning("No data found for this stock symbol.")
@@ -66,55 +143,122 @@ if stock_symbol:
         ts_data.set_index("Date", inplace=True)
 
         # --------------------------------------------------
-        # Train ARIMA Model
+        # Select Model & Order (order memoized per ticker)
         # --------------------------------------------------
-        with st.spinner("Training forecasting model..."):
-            model = ARIMA(ts_data["Close"], order=(5, 1, 0))
-            model_fit = model.fit()
+        # "Auto" picks by expected fit cost for this many bars
+        model_name = analytics.resolve_model(model_choice, len(ts_data))
+        order = DEFAULT_ORDER
+        if use_auto_order:
+            with st.spinner("Searching ARIMA orders..."), perf.stage("order.search"):
+                search = analytics.choose_order(
+                    stock_symbol,
+                    ts_data["Close"].to_numpy(),
+                    interval,
+                    criterion=criterion,
+                    budget_seconds=search_budget,
+                )
+            order = search.order
+            if search.memoized:
+                st.caption(f"ARIMA{order} (memoized {criterion.upper()} choice)")
+            else:
+                st.caption(
+                    f"ARIMA{order} chosen by {criterion.upper()} in {search.elapsed:.1f}s: "
+                    f"d picked by ADF in {search.d_seconds:.2f}s, "
+                    f"{len(search.scores)} fits, {len(search.skipped)} skipped"
+                )
 
         # --------------------------------------------------
-        # Forecast
+        # Train Model (cached; only new bars trigger work)
         # --------------------------------------------------
-        forecast = model_fit.forecast(steps=forecast_days)
+        with st.spinner("Training forecasting model..."), perf.stage("model.fit"):
+            model_fit = analytics.fit_model(
+                stock_symbol, ts_data["Close"], start_date, interval, order, model_name,
+            )
+        cost = f"{model_fit.label} fit on {len(ts_data):,} bars in {model_fit.fit_seconds * 1000:,.0f} ms"
+        if model_fit.peak_bytes:
+            cost += f", peak {model_fit.peak_bytes / 2**20:,.1f} MiB"
+        st.caption(cost + (" (auto-selected)" if model_choice == "auto" else ""))
+        if model_name == ENSEMBLE:
+            # Members fit concurrently: wall time tracks the slowest, not the sum
+            st.caption(
+                f"Members fitted concurrently: {model_fit.member_total_seconds * 1000:,.0f} ms "
+                f"of member fits in {model_fit.fit_seconds * 1000:,.0f} ms wall time, "
+                f"weights from the last {model_fit.holdout_used} bars"
+            )
+            st.dataframe(model_fit.table().round(4), hide_index=True)
 
-        forecast_dates = pd.date_range(
-            start=ts_data.index[-1] + pd.Timedelta(days=1),
-            periods=forecast_days,
-            freq="B",
-        )
+        # --------------------------------------------------
+        # Forecast
+        # --------------------------------------------------
+        levels = sorted(st.multiselect(
+            "Confidence Levels (%)",
+            options=[50, 80, 90, 95, 99],
+            default=[80, 95],
+        ), reverse=True)
 
-        forecast_df = pd.DataFrame(
-            {"Forecast": forecast.values},
-            index=forecast_dates,
-        )
+        # Next sessions on the ticker's exchange calendar (holidays skipped)
+        calendar = calendar_for_ticker(stock_symbol)
+        with perf.stage("forecast") as rec:
+            forecast_df = rec.payload(analytics.forecast_frame(
+                model_fit, ts_data.index, forecast_days, interval, levels, calendar,
+            ))
+        if interval != "1wk" and not calendar.covers(forecast_df.index[-1]):
+            st.warning(
+                f"{calendar.name} holidays are only known until {calendar.known_until:%d %b %Y}; "
+                f"forecast dates after that may fall on exchange holidays."
+            )
 
         # --------------------------------------------------
         # Visualization
         # --------------------------------------------------
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatter(
-            x=ts_data.index,
-            y=ts_data["Close"],
-            mode="lines",
-            name="Historical Price",
-        ))
-
-        fig.add_trace(go.Scatter(
-            x=forecast_df.index,
-            y=forecast_df["Forecast"],
-            mode="lines",
-            name="Forecasted Price",
-            line=dict(dash="dash"),
-        ))
-
-        fig.update_layout(
-            template="plotly_dark",
-            height=600,
-            title="Actual vs Forecasted Stock Price",
-        )
+        with perf.stage("chart.forecast"):
+            fig = go.Figure()
 
-        st.plotly_chart(fig, use_container_width=True)
+            # The forecast covers at most 90 points; only the history needs thinning
+            hist_idx = downsample_indices(ts_data.index.to_numpy(), ts_data["Close"].to_numpy(), 1600)
+            fig.add_trace(go.Scatter(
+                x=ts_data.index[hist_idx],
+                y=ts_data["Close"].iloc[hist_idx],
+                mode="lines",
+                name="Historical Price",
+            ))
+
+            # Widest band first so narrower ones draw on top
+            for i, level in enumerate(levels):
+                opacity = 0.12 + 0.12 * i
+                fig.add_trace(go.Scatter(
+                    x=forecast_df.index,
+                    y=forecast_df[f"Upper {level}%"],
+                    mode="lines",
+                    line=dict(width=0),
+                    showlegend=False,
+                    hoverinfo="skip",
+                ))
+                fig.add_trace(go.Scatter(
+                    x=forecast_df.index,
+                    y=forecast_df[f"Lower {level}%"],
+                    mode="lines",
+                    line=dict(width=0),
+                    fill="tonexty",
+                    fillcolor=f"rgba(99,102,241,{opacity:.2f})",
+                    name=f"{level}% Interval",
+                ))
+
+            fig.add_trace(go.Scatter(
+                x=forecast_df.index,
+                y=forecast_df["Forecast"],
+                mode="lines",
+                name="Forecasted Price",
+                line=dict(dash="dash"),
+            ))
+
+            fig.update_layout(
+                template="plotly_dark",
+                height=600,
+                title="Actual vs Forecasted Stock Price",
+            )
+
+            st.plotly_chart(fig, use_container_width=True)
 
         # --------------------------------------------------
         # Forecast Table
@@ -122,5 +266,158 @@ if stock_symbol:
         st.subheader("📊 Forecasted Prices")
         st.dataframe(forecast_df)
 
+        # --------------------------------------------------
+        # Monte Carlo Simulation
+        # --------------------------------------------------
+        st.subheader("🎲 Monte Carlo Simulation")
+
+        scol1, scol2, scol3, scol4 = st.columns(4)
+        with scol1:
+            sim_method = st.radio(
+                "Paths", SIMULATION_METHODS, horizontal=True,
+                format_func=lambda m: {"gbm": "GBM", "bootstrap": "Bootstrap"}[m],
+                help="GBM: normal log returns with the history's drift and volatility. "
+                     "Bootstrap: daily returns resampled from the history.",
+            )
+        with scol2:
+            sim_paths = st.select_slider(
+                "Number of Paths", options=[10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000],
+                value=100_000, format_func=lambda n: f"{n:,}",
+            )
+        with scol3:
+            sim_workers = st.number_input(
+                "Worker Processes", min_value=1, max_value=os.cpu_count() or 1, value=1,
+            )
+        with scol4:
+            st.write("")
+            run_sim = st.checkbox("Run Simulation")
+
+        if run_sim:
+            with st.spinner(f"Simulating {sim_paths:,} paths..."), perf.stage("simulation"):
+                fan, touch, touch_curve, rate, elapsed = run_simulation(
+                    analytics.model_key(stock_symbol, interval),
+                    ts_data["Close"].to_numpy(),
+                    int(forecast_days),
+                    int(sim_paths),
+                    sim_method,
+                    int(sim_workers),
+                    0,
+                )
+            fan.index = forecast_df.index
+            st.caption(f"{sim_paths:,} paths × {forecast_days} steps in {elapsed:.2f}s ({rate:,.0f} paths/s)")
+
+            sim_fig = go.Figure()
+            tail = ts_data["Close"].iloc[-min(len(ts_data), 4 * int(forecast_days)):]
+            sim_fig.add_trace(go.Scatter(x=tail.index, y=tail, mode="lines", name="Historical Price"))
+            for lo, hi, opacity in (("P5", "P95", 0.18), ("P25", "P75", 0.35)):
+                sim_fig.add_trace(go.Scatter(
+                    x=fan.index, y=fan[hi], mode="lines", line=dict(width=0),
+                    showlegend=False, hoverinfo="skip",
+                ))
+                sim_fig.add_trace(go.Scatter(
+                    x=fan.index, y=fan[lo], mode="lines", line=dict(width=0), fill="tonexty",
+                    fillcolor=f"rgba(16,185,129,{opacity})", name=f"{lo[1:]}–{hi[1:]}th percentile",
+                ))
+            sim_fig.add_trace(go.Scatter(x=fan.index, y=fan["P50"], mode="lines", name="Median Path"))
+            sim_fig.add_trace(go.Scatter(
+                x=forecast_df.index, y=forecast_df["Forecast"], mode="lines",
+                name=f"{model_fit.label} Forecast", line=dict(dash="dash"),
+            ))
+            sim_fig.update_layout(template="plotly_dark", height=500, title="Simulated Price Fan")
+            st.plotly_chart(sim_fig, use_container_width=True)
+
+            tcol1, tcol2 = st.columns([1, 2])
+            with tcol1:
+                st.markdown("**Probability of Touch**")
+                st.dataframe(touch.round(2), hide_index=True)
+            with tcol2:
+                touch_fig = go.Figure()
+                for i, move in enumerate(touch["Move %"]):
+                    touch_fig.add_trace(go.Scatter(
+                        x=fan.index, y=touch_curve[:, i] * 100, mode="lines", name=f"{move:+.0f}%",
+                    ))
+                touch_fig.update_layout(
+                    template="plotly_dark", height=320, title="P(touched by date) %",
+                    margin=dict(t=40, b=10),
+                )
+                st.plotly_chart(touch_fig, use_container_width=True)
+
+        # --------------------------------------------------
+        # Walk-Forward Backtest
+        # --------------------------------------------------
+        st.subheader("🧪 Walk-Forward Backtest")
+
+        bcol1, bcol2, bcol3, bcol4 = st.columns(4)
+        with bcol1:
+            bt_horizon = st.number_input("Horizon (bars)", min_value=1, max_value=30, value=5)
+        # Clamp to what the loaded series supports at this interval
+        bt_limit = min(max_origins(len(ts_data), int(bt_horizon)), 1000)
+        with bcol2:
+            bt_origins = st.number_input(
+                "Origins", min_value=min(10, bt_limit), max_value=bt_limit,
+                value=min(250, bt_limit), step=10, disabled=not bt_limit,
+            )
+        with bcol3:
+            bt_refit = st.number_input(
+                "Refit Every (origins)", min_value=0, max_value=500, value=0,
+                help="0 estimates parameters once and only updates the filter state.",
+                disabled=model_name != "arima",
+            )
+        with bcol4:
+            st.write("")
+            run_bt = st.checkbox("Run Backtest", disabled=not bt_limit)
+        if not bt_limit:
+            st.info(
+                f"A {int(bt_horizon)}-step backtest needs at least "
+                f"{MIN_TRAIN + int(bt_horizon)} bars; {len(ts_data)} are loaded at "
+                f"this interval. Pick an earlier start date or a shorter interval."
+            )
+
+        if run_bt and bt_limit:
+            with st.spinner("Backtesting..."), perf.stage("backtest"):
+                bt = run_backtest(
+                    analytics.model_key(stock_symbol, interval),
+                    ts_data["Close"].to_numpy(),
+                    model_name,
+                    order,
+                    int(bt_horizon),
+                    int(bt_origins),
+                    int(bt_refit),
+                )
+
+            summary = bt.summary()
+            mcols = st.columns(4)
+            for mcol, (label, value) in zip(mcols, summary.items()):
+                mcol.metric(label, f"{value:,.2f}")
+            st.caption(
+                f"{len(bt.origins)} origins × {bt.forecasts.shape[1]} steps, "
+                f"{bt.n_fits} parameter fit(s) in {bt.elapsed:.2f}s"
+            )
+
+            origin_dates = ts_data.index[bt.origins + 1]
+            bt_fig = go.Figure()
+            bt_fig.add_trace(go.Scatter(
+                x=origin_dates,
+                y=bt.actuals[:, 0],
+                mode="lines",
+                name="Actual",
+            ))
+            bt_fig.add_trace(go.Scatter(
+                x=origin_dates,
+                y=bt.forecasts[:, 0],
+                mode="lines",
+                name="1-Step Forecast",
+                line=dict(dash="dot"),
+            ))
+            bt_fig.update_layout(
+                template="plotly_dark",
+                height=420,
+                title="1-Step-Ahead Backtest Forecasts",
+            )
+            st.plotly_chart(bt_fig, use_container_width=True)
+            st.dataframe(bt.metrics().round(3))
+
     except Exception as e:
-        st.error(f"❌ Error during prediction: {e}")
\ No newline at end of file
+        st.error(f"❌ Error during prediction: {e}")
+
+render_panel(perf)
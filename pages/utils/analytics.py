@@ -0,0 +1,159 @@
+"""Analysis and forecast results, independent of any UI.
+
+The Streamlit pages and the JSON API (``pages.utils.api``) both go through
+these functions, so they share the market-data, fitted-model and order-memo
+caches and always agree on the numbers. With ``STOCKVISION_SHARED_CACHE``
+set, fitted models are also shared between processes.
+"""
+import datetime
+import math
+
+import pandas as pd
+
+from pages.utils.forecasters import BACKENDS, ENSEMBLE, INTERACTIVE_BUDGET, get_forecaster_cache, select
+from pages.utils.indicators import compute as compute_indicators
+from pages.utils.intervals import future_index
+from pages.utils.market_data import get_market_data
+from pages.utils.model_train import DEFAULT_ORDER, MAX_HORIZON, get_model_cache
+from pages.utils.order_selection import auto_order
+from pages.utils.shared_cache import get_shared_cache
+from pages.utils.trading_calendar import calendar_for_ticker
+
+DEFAULT_LEVELS = (80, 95)
+
+
+def model_key(ticker, interval):
+    """Models and memoized orders are per (ticker, interval)."""
+    return ticker if interval == "1d" else f"{ticker}@{interval}"
+
+
+def _number(value):
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+# --------------------------------------------------
+# Metrics & Indicators
+# --------------------------------------------------
+def week52_range(ticker, end, market=None):
+    """(high, low) close over the 52 weeks of sessions before ``end``, whatever the chart range."""
+    market = market or get_market_data()
+    sessions = calendar_for_ticker(ticker).sessions_between(
+        end - datetime.timedelta(weeks=52), end - datetime.timedelta(days=1)
+    )
+    if not len(sessions):
+        return None, None
+    close = market.history(ticker, sessions[0].date(), end)["Close"]
+    if close.empty:
+        return None, None
+    return _number(close.max()), _number(close.min())
+
+
+def key_metrics(ticker, bars, end, market=None):
+    """Headline numbers for ``bars`` (any interval) ending before ``end``."""
+    close = bars["Close"].dropna()
+    high_52, low_52 = week52_range(ticker, end, market)
+    return {
+        "last_close": _number(close.iloc[-1]) if len(close) else None,
+        "change_pct": _number(close.pct_change().iloc[-1] * 100) if len(close) > 1 else None,
+        "week52_high": high_52,
+        "week52_low": low_52,
+        "bars": int(len(bars)),
+    }
+
+
+def indicators(bars, names):
+    """Batch-computed indicator columns aligned to ``bars``."""
+    return compute_indicators(bars, names)
+
+
+# --------------------------------------------------
+# Forecast
+# --------------------------------------------------
+def choose_order(ticker, values, interval="1d", criterion="aic", budget_seconds=20):
+    """Memoized automatic ARIMA order; returns the ``SearchResult``."""
+    return auto_order(
+        model_key(ticker, interval), values, criterion=criterion, budget_seconds=budget_seconds,
+    )
+
+
+def resolve_model(model, n_obs, budget_seconds=INTERACTIVE_BUDGET):
+    """``"auto"`` -> the most accurate backend expected to fit within the budget."""
+    if model == "auto":
+        return select(n_obs, budget_seconds)
+    if model != ENSEMBLE and model not in BACKENDS:
+        raise ValueError(f"model must be auto or one of {', '.join([*BACKENDS, ENSEMBLE])}")
+    return model
+
+
+def fit_model(ticker, close, start, interval="1d", order=DEFAULT_ORDER, model="arima"):
+    """Cached fit for a ``Date``-indexed close series; only new bars trigger work.
+
+    ARIMA goes through the ``ModelCache`` (append / warm-start); the other
+    backends and the ensemble through the ``ForecasterCache`` (``update``).
+    A process-wide shared cache, when configured, is consulted first.
+    """
+    def fit():
+        if model != "arima":
+            return get_forecaster_cache().get(
+                model_key(ticker, interval), close.to_numpy(), model,
+                window_start=start, window_end=close.index[-1], trace_memory=True,
+            )
+        return get_model_cache().get(
+            model_key(ticker, interval),
+            close.to_numpy(),
+            order=order,
+            window_start=start,
+            window_end=close.index[-1],
+        )
+
+    shared = get_shared_cache()
+    if shared is None:
+        return fit()
+    # Same series window and last bar -> same fit, whichever replica made it
+    key = (
+        model_key(ticker, interval), model, tuple(order) if model == "arima" else None,
+        str(start), str(close.index[-1]), len(close), float(close.iloc[-1]),
+    )
+    return shared.get("model", key, fit)
+
+
+def forecast_frame(model, index, steps, interval="1d", levels=DEFAULT_LEVELS, calendar=None):
+    """Point forecast plus ``Lower/Upper {level}%`` bands on the next trading sessions."""
+    if not 1 <= steps <= MAX_HORIZON:
+        raise ValueError(f"steps must be between 1 and {MAX_HORIZON}")
+    frame = pd.DataFrame(
+        {"Forecast": model.forecast(steps)},
+        index=future_index(index, steps, interval, calendar),
+    )
+    # Bands are slices of the fit's precomputed max-horizon variance
+    for level in sorted(levels, reverse=True):
+        lower, upper = model.forecast_interval(steps, level / 100)
+        frame[f"Lower {level}%"] = lower
+        frame[f"Upper {level}%"] = upper
+    return frame
+
+
+def forecast(
+    ticker, start, steps=30, interval="1d", levels=DEFAULT_LEVELS, order=DEFAULT_ORDER,
+    market=None, model="arima", criterion="aic",
+):
+    """End-to-end forecast: load, (optionally auto-)order, fit, project.
+
+    ``order="auto"`` uses the memoized ``criterion`` search (ARIMA only); ``model="auto"``
+    picks a backend by cost. Returns ``(forecast frame, fitted model, order)``,
+    where ``order`` is ``None`` for non-ARIMA backends.
+    """
+    market = market or get_market_data()
+    bars = market.bars(ticker, interval, start)
+    close = bars["Close"].dropna()
+    if close.empty:
+        raise ValueError(f"no data for {ticker}")
+    model = resolve_model(model, len(close))
+    if model != "arima":
+        order = None
+    elif order == "auto":
+        order = choose_order(ticker, close.to_numpy(), interval, criterion).order
+    fitted = fit_model(ticker, close, start, interval, order, model)
+    frame = forecast_frame(fitted, close.index, steps, interval, levels, calendar_for_ticker(ticker))
+    return frame, fitted, tuple(order) if order else None
@@ -0,0 +1,403 @@
+"""Headless JSON API over the same caches the Streamlit pages use.
+
+    python -m pages.utils.api --port 8600
+
+Endpoints (GET or HEAD, query-string parameters):
+
+    /ohlcv     ticker, start, end, interval
+    /metrics   ticker, start, end, interval, indicators ("SMA 20,RSI 14")
+    /forecast  ticker, start, steps, interval, levels ("80,95"), order ("5,1,0" or "auto"),
+               model ("arima", "ets", "ridge_ar", "naive", "ensemble" or "auto")
+    /health    cache statistics
+
+Frames are encoded as ``{"columns", "index", "data"}``. Every response carries
+a strong ETag over its body and a ``Cache-Control: max-age`` matching the data
+TTL; a request whose ``If-None-Match`` matches gets an empty 304. Encoded
+responses are cached for the same TTL, so repeat requests never leave the
+event loop; everything else runs on a thread pool so a slow forecast does not
+block cheap requests. Setting ``STOCKVISION_API_PORT`` makes the Streamlit app
+start the server in-process, sharing its in-memory caches with the UI.
+"""
+import argparse
+import asyncio
+import datetime
+import hashlib
+import json
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from pages.utils import analytics
+from pages.utils.forecasters import BACKENDS, ENSEMBLE, get_forecaster_cache
+from pages.utils.indicators import INDICATORS
+from pages.utils.instrumentation import configure_from_env, note_cache, stage
+from pages.utils.intervals import INTERVALS
+from pages.utils.market_data import TTLCache, get_market_data
+from pages.utils.model_train import DEFAULT_ORDER, MAX_HORIZON, get_model_cache
+from pages.utils.prewarm import get_prewarmer, order_choice, record as record_request
+from pages.utils.shared_cache import get_shared_cache
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8600
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+_REQUIRED = object()
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _arg(query, name, default=_REQUIRED, parse=str):
+    values = query.get(name)
+    if not values or values[-1] == "":
+        if default is _REQUIRED:
+            raise ApiError(400, f"missing parameter: {name}")
+        return default
+    try:
+        return parse(values[-1])
+    except ValueError as exc:
+        raise ApiError(400, f"bad {name}: {exc}") from None
+
+
+def _ints(text):
+    return tuple(int(x) for x in text.split(",") if x.strip())
+
+
+def encode(payload):
+    """JSON body; DataFrames go through pandas' encoder (NaN -> null, ISO dates)."""
+    parts = []
+    for key, value in payload.items():
+        if isinstance(value, pd.DataFrame):
+            value = value.to_json(orient="split", date_format="iso", double_precision=6)
+        else:
+            value = json.dumps(value, default=str)
+        parts.append(f"{json.dumps(key)}:{value}")
+    return ("{" + ",".join(parts) + "}").encode()
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+# --------------------------------------------------
+# Application
+# --------------------------------------------------
+class Api:
+    """Routes and response cache; transport-independent."""
+
+    def __init__(self, market=None, max_entries=1024, max_workers=8):
+        self.market = market or get_market_data()
+        self.responses = TTLCache(max_entries)
+        self.stats = Counter()
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="api")
+        self.routes = {
+            "/ohlcv": self.ohlcv,
+            "/metrics": self.metrics,
+            "/forecast": self.forecast,
+        }
+
+    # ---- handlers: query -> (payload, ttl) ----
+    def _window(self, query):
+        ticker = _arg(query, "ticker").upper().strip()
+        interval = _arg(query, "interval", "1d")
+        if interval not in INTERVALS:
+            raise ApiError(400, f"interval must be one of {', '.join(INTERVALS)}")
+        start = _arg(query, "start", datetime.date.today() - datetime.timedelta(days=365),
+                     datetime.date.fromisoformat)
+        end = _arg(query, "end", None, datetime.date.fromisoformat)
+        if end is not None and start >= end:
+            raise ApiError(400, "end must be after start")
+        return ticker, interval, start, end
+
+    def _ttl(self, interval):
+        return self.market.ttls["intraday" if INTERVALS[interval].intraday else "history"]
+
+    def ohlcv(self, query):
+        ticker, interval, start, end = self._window(query)
+        bars = self.market.bars(ticker, interval, start, end)
+        return {"ticker": ticker, "interval": interval, "bars": bars}, self._ttl(interval)
+
+    def metrics(self, query):
+        ticker, interval, start, end = self._window(query)
+        names = [n.strip() for n in _arg(query, "indicators", "").split(",") if n.strip()]
+        unknown = [n for n in names if n not in INDICATORS]
+        if unknown:
+            raise ApiError(400, f"unknown indicators: {', '.join(unknown)}")
+
+        bars = self.market.bars(ticker, interval, start, end)
+        as_of = end or datetime.date.today() + datetime.timedelta(days=1)
+        payload = {
+            "ticker": ticker,
+            "interval": interval,
+            "metrics": analytics.key_metrics(ticker, bars, as_of, self.market),
+        }
+        if names:
+            payload["indicators"] = analytics.indicators(bars, names)
+        return payload, self._ttl(interval)
+
+    def forecast(self, query):
+        ticker = _arg(query, "ticker").upper().strip()
+        interval = _arg(query, "interval", "1d")
+        if interval not in INTERVALS:
+            raise ApiError(400, f"interval must be one of {', '.join(INTERVALS)}")
+        start = _arg(query, "start", datetime.date.today() - datetime.timedelta(days=365 * 2),
+                     datetime.date.fromisoformat)
+        steps = _arg(query, "steps", 30, int)
+        if not 1 <= steps <= MAX_HORIZON:
+            raise ApiError(400, f"steps must be between 1 and {MAX_HORIZON}")
+        levels = _arg(query, "levels", analytics.DEFAULT_LEVELS, _ints)
+        if any(not 0 < level < 100 for level in levels):
+            raise ApiError(400, "levels must be percentages between 0 and 100")
+        order = _arg(query, "order", DEFAULT_ORDER, lambda s: s if s == "auto" else _ints(s))
+        if order != "auto" and len(order) != 3:
+            raise ApiError(400, "order must be p,d,q or auto")
+        model = _arg(query, "model", "arima")
+        if model not in ("auto", ENSEMBLE, *BACKENDS):
+            raise ApiError(400, f"model must be auto or one of {', '.join([*BACKENDS, ENSEMBLE])}")
+
+        record_request("prediction", ticker, interval, start, None, model, order_choice(order))
+        frame, fitted, order = analytics.forecast(
+            ticker, start, steps, interval, levels, order, self.market, model,
+        )
+        return {
+            "ticker": ticker,
+            "interval": interval,
+            "model": fitted.name,
+            "order": list(order) if order else None,
+            "fit_seconds": round(fitted.fit_seconds, 4),
+            "forecast": frame,
+        }, self._ttl(interval)
+
+    def health(self):
+        return {
+            "market": {
+                **self.market.stats,
+                "cache_bytes": self.market.cache.nbytes,
+                "cache_evictions": self.market.cache.evictions,
+            },
+            "models": dict(get_model_cache().stats),
+            "forecasters": dict(get_forecaster_cache().stats),
+            "shared": dict(shared.stats) if (shared := get_shared_cache()) else None,
+            "prewarm": warmer.status if (warmer := get_prewarmer()) else None,
+            "api": dict(self.stats),
+        }
+
+    # ---- dispatch ----
+    def cached(self, path, query):
+        """(body, etag, ttl) from the response cache, or None."""
+        entry = self.responses.get(self._key(path, query), None)
+        if entry is not None:
+            self.stats["response.hit"] += 1
+            note_cache("api", "hit")
+        return entry
+
+    def render(self, path, query):
+        """Compute, encode and cache a response; runs on the worker pool."""
+        self.stats["response.miss"] += 1
+        note_cache("api", "miss")
+        with stage(f"api{path}") as record:
+            payload, ttl = self.routes[path](query)
+            body = record.payload(encode(payload))
+        entry = (body, f'"{hashlib.sha1(body).hexdigest()[:20]}"', ttl)
+        self.responses.set(self._key(path, query), entry, ttl)
+        return entry
+
+    @staticmethod
+    def _key(path, query):
+        return path, tuple(sorted((k, tuple(v)) for k, v in query.items()))
+
+    async def respond(self, method, target, headers):
+        """(status, extra headers, body) for one request."""
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, {"Cache-Control": "no-store"}, encode(self.health())
+        if url.path not in self.routes:
+            return _error(404, f"no route for {url.path}")
+        if method not in ("GET", "HEAD"):
+            return _error(405, f"{method} not allowed")
+
+        query = parse_qs(url.query, keep_blank_values=True)
+        entry = self.cached(url.path, query)
+        if entry is None:
+            loop = asyncio.get_running_loop()
+            try:
+                entry = await loop.run_in_executor(self.executor, self.render, url.path, query)
+            except ApiError as exc:
+                return _error(exc.status, str(exc))
+            except ValueError as exc:
+                return _error(400, str(exc))
+            except Exception as exc:
+                self.stats["error"] += 1
+                return _error(500, f"{type(exc).__name__}: {exc}")
+
+        body, etag, ttl = entry
+        extra = {"ETag": etag, "Cache-Control": f"max-age={int(ttl)}"}
+        if etag_matches(headers.get("if-none-match"), etag):
+            self.stats["not_modified"] += 1
+            return 304, extra, b""
+        return 200, extra, body
+
+
+def _error(status, message):
+    return status, {"Cache-Control": "no-store"}, encode({"error": message})
+
+
+# --------------------------------------------------
+# HTTP/1.1 transport (asyncio streams, keep-alive)
+# --------------------------------------------------
+class ApiServer:
+    def __init__(self, api=None, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.api = api or Api()
+        self.host = host
+        self.port = port
+        self.ready = threading.Event()
+        self.error = None  # why the socket could not be bound, once ``ready`` is set
+        self._loop = None
+        self._server = None
+
+    async def serve(self):
+        self._loop = asyncio.get_running_loop()
+        try:
+            self._server = await asyncio.start_server(self._client, self.host, self.port)
+            # port=0 binds an ephemeral port; report the real one
+            self.port = self._server.sockets[0].getsockname()[1]
+        except BaseException as exc:
+            self.error = exc
+            raise
+        finally:
+            self.ready.set()
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    def start_in_thread(self):
+        """Serve from a daemon thread; returns once the socket is bound, or raises why not."""
+        thread = threading.Thread(target=self._run, daemon=True, name="stockvision-api")
+        thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        return thread
+
+    def _run(self):
+        try:
+            asyncio.run(self.serve())
+        except OSError:
+            pass  # bind failure, re-raised by ``start_in_thread``
+
+    def stop(self):
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+    async def _client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    await self._send(writer, *_error(400, "malformed request line"), False, False)
+                    break
+
+                headers = {}
+                while True:
+                    raw = await reader.readline()
+                    if raw in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = raw.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (
+                    version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                )
+                status, extra, body = await self.api.respond(method, target, headers)
+                await self._send(writer, status, extra, body, method == "HEAD", keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _send(writer, status, extra, body, head_only, keep_alive):
+        lines = [
+            f"HTTP/1.1 {status} {REASONS[status]}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            *(f"{name}: {value}" for name, value in extra.items()),
+        ]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if not head_only:
+            writer.write(body)
+        await writer.drain()
+
+
+_background = None
+_background_lock = threading.Lock()
+
+
+def serve_in_background(port=DEFAULT_PORT, host=DEFAULT_HOST):
+    """Start one in-process API server (idempotent); used by the Streamlit app.
+
+    If the port cannot be bound (another replica or a stale process holds it)
+    the ``OSError`` is raised, on this and every later call in the process.
+    """
+    global _background
+    with _background_lock:
+        if _background is None:
+            _background = ApiServer(host=host, port=port)
+            try:
+                _background.start_in_thread()
+            except OSError:
+                pass
+        if _background.error is not None:
+            raise _background.error
+        return _background
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve analysis and forecast results as JSON.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=8, help="Compute threads")
+    args = parser.parse_args(argv)
+
+    configure_from_env()
+    server = ApiServer(Api(max_workers=args.workers), args.host, args.port)
+    print(f"Serving on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""Walk-forward (rolling-origin) backtesting for the forecasters.
+
+For ARIMA, instead of refitting at every origin, parameters are estimated
+once per block of origins and a single Kalman-filter pass over the series
+yields the predicted state at every origin. The h-step forecasts for all origins are
+then propagated together through the state-space matrices, and the scores
+are computed with vectorized NumPy over the (origins x horizon) matrices.
+The other ``pages.utils.forecasters`` backends step through the origins
+with their O(1)-per-bar ``update`` instead.
+"""
+import time
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.model_train import DEFAULT_ORDER, fit_arima
+
+
+# Fewest bars any backtest origin trains on
+MIN_TRAIN = 120
+
+
+def max_origins(n, horizon, min_train=MIN_TRAIN):
+    """How many origins a series of ``n`` bars supports for an ``horizon``-step backtest."""
+    return max(0, n - horizon - min_train + 1)
+
+
+@dataclass
+class BacktestResult:
+    origins: np.ndarray       # positions of the last observed bar at each origin
+    forecasts: np.ndarray     # (n_origins, horizon)
+    actuals: np.ndarray       # (n_origins, horizon)
+    last_observed: np.ndarray # (n_origins,)
+    n_fits: int
+    elapsed: float
+
+    def metrics(self):
+        """MAE / RMSE / MAPE / directional accuracy per horizon step."""
+        return score(self.forecasts, self.actuals, self.last_observed)
+
+    def summary(self):
+        table = self.metrics()
+        return {
+            "MAE": float(table["MAE"].mean()),
+            "RMSE": float(np.sqrt((table["RMSE"] ** 2).mean())),
+            "MAPE %": float(table["MAPE %"].mean()),
+            "Directional Accuracy %": float(table["Directional Accuracy %"].mean()),
+        }
+
+
+def score(forecasts, actuals, last_observed):
+    errors = forecasts - actuals
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ape = np.abs(errors / actuals)
+    predicted_move = np.sign(forecasts - last_observed[:, None])
+    actual_move = np.sign(actuals - last_observed[:, None])
+
+    return pd.DataFrame(
+        {
+            "MAE": np.abs(errors).mean(axis=0),
+            "RMSE": np.sqrt((errors ** 2).mean(axis=0)),
+            "MAPE %": np.nanmean(np.where(np.isfinite(ape), ape, np.nan), axis=0) * 100,
+            "Directional Accuracy %": (predicted_move == actual_move).mean(axis=0) * 100,
+        },
+        index=pd.RangeIndex(1, forecasts.shape[1] + 1, name="Horizon"),
+    )
+
+
+def _state_forecasts(result, origins, horizon):
+    """h-step forecasts from every origin, propagated through the SSM matrices."""
+    ssm = result.model.ssm
+    design = ssm["design"][..., 0] if ssm["design"].ndim == 3 else ssm["design"]
+    transition = ssm["transition"][..., 0] if ssm["transition"].ndim == 3 else ssm["transition"]
+    obs_intercept = np.ravel(ssm["obs_intercept"])[0]
+    state_intercept = (
+        ssm["state_intercept"][..., 0] if ssm["state_intercept"].ndim == 2 else ssm["state_intercept"]
+    )
+
+    # predicted_state[:, t + 1] is the state forecast for t + 1 given data up to t
+    states = result.predicted_state[:, origins + 1]
+    out = np.empty((len(origins), horizon))
+    for h in range(horizon):
+        out[:, h] = design[0] @ states + obs_intercept
+        states = transition @ states + state_intercept[:, None]
+    return out
+
+
+def walk_forward(
+    values,
+    horizon=5,
+    n_origins=250,
+    min_train=MIN_TRAIN,
+    refit_every=0,
+    order=DEFAULT_ORDER,
+):
+    """Rolling-origin evaluation over the last ``n_origins`` feasible origins.
+
+    ``refit_every=0`` estimates parameters once at the first origin and only
+    updates the filter state afterwards; ``refit_every=k`` re-estimates
+    (warm-started) every ``k`` origins.
+    """
+    started = time.perf_counter()
+    values = np.asarray(values, dtype="float64")
+    n = len(values)
+
+    last_origin = n - horizon - 1
+    first_origin = max(min_train - 1, last_origin - n_origins + 1)
+    if last_origin < first_origin:
+        raise ValueError(
+            f"need at least {min_train + horizon} observations for a "
+            f"{horizon}-step backtest, got {n}"
+        )
+    origins = np.arange(first_origin, last_origin + 1)
+
+    block = refit_every or len(origins)
+    forecasts = np.empty((len(origins), horizon))
+    params, n_fits = None, 0
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for lo in range(0, len(origins), block):
+            block_origins = origins[lo:lo + block]
+            # Estimate only on data available at the block's first origin
+            fitted = fit_arima(values[:block_origins[0] + 1], order, start_params=params)
+            params, n_fits = fitted.params, n_fits + 1
+            # Filter through the block with those parameters; the filter is causal
+            extended = fitted.apply(values[:block_origins[-1] + 1], refit=False)
+            forecasts[lo:lo + block] = _state_forecasts(extended, block_origins, horizon)
+
+    actuals = values[origins[:, None] + np.arange(1, horizon + 1)]
+    return BacktestResult(
+        origins=origins,
+        forecasts=forecasts,
+        actuals=actuals,
+        last_observed=values[origins],
+        n_fits=n_fits,
+        elapsed=time.perf_counter() - started,
+    )
+
+
+def walk_forward_model(values, name, horizon=5, n_origins=250, min_train=MIN_TRAIN):
+    """Rolling-origin evaluation of a ``pages.utils.forecasters`` backend.
+
+    Fits once at the first origin (once per member for the ensemble), then
+    steps through the origins with ``update`` (one bar at a time), so cost
+    scales with the backend's update, not its fit.
+    """
+    from pages.utils.forecasters import make_forecaster
+
+    started = time.perf_counter()
+    values = np.asarray(values, dtype="float64")
+    n = len(values)
+
+    last_origin = n - horizon - 1
+    first_origin = max(min_train - 1, last_origin - n_origins + 1)
+    if last_origin < first_origin:
+        raise ValueError(
+            f"need at least {min_train + horizon} observations for a "
+            f"{horizon}-step backtest, got {n}"
+        )
+    origins = np.arange(first_origin, last_origin + 1)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model = make_forecaster(name).fit(values[:first_origin + 1])
+        forecasts = np.empty((len(origins), horizon))
+        for i, origin in enumerate(origins):
+            if i:
+                model.update(values[origin:origin + 1])
+            forecasts[i] = model.forecast(horizon)
+
+    actuals = values[origins[:, None] + np.arange(1, horizon + 1)]
+    return BacktestResult(
+        origins=origins,
+        forecasts=forecasts,
+        actuals=actuals,
+        last_observed=values[origins],
+        # An ensemble fits each of its members once
+        n_fits=len(getattr(model, "members", None) or (model,)),
+        elapsed=time.perf_counter() - started,
+    )
@@ -0,0 +1,232 @@
+"""Headless batch forecaster: forecasts for a whole ticker universe.
+
+Prices are loaded in the parent through the shared market-data provider
+(batched downloads, on-disk store); each ticker is then fitted in a
+``ProcessPoolExecutor`` worker with a per-task timeout. ``--model`` picks a
+backend from ``pages.utils.forecasters``; ``auto`` chooses per ticker by
+expected fit cost within the batch budget, and ``ensemble`` fits every
+backend (on threads inside the worker) and combines them.
+
+Usage::
+
+    python -m pages.utils.batch_forecast AAPL MSFT NVDA --steps 30
+    python -m pages.utils.batch_forecast --tickers-file universe.txt \\
+        --workers 16 --timeout 60 --model auto --output forecasts.parquet
+"""
+import argparse
+import datetime
+import os
+import signal
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.forecasters import BACKENDS, BATCH_BUDGET, ENSEMBLE, make_forecaster, select
+from pages.utils.intervals import future_index
+from pages.utils.market_data import get_market_data
+from pages.utils.model_train import DEFAULT_ORDER, fit_arima, init_fit_worker
+from pages.utils.trading_calendar import calendar_for_ticker
+
+FORECAST_COLUMNS = ["Ticker", "Model", "Step", "Date", "Forecast"]
+
+
+@dataclass
+class BatchResult:
+    forecasts: pd.DataFrame
+    failures: dict = field(default_factory=dict)
+    warnings: dict = field(default_factory=dict)
+    fit_seconds: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def summary(self):
+        lines = [
+            f"{len(self.fit_seconds)} succeeded ({len(self.warnings)} with warnings), "
+            f"{len(self.failures)} failed in {self.elapsed:.1f}s"
+        ]
+        for ticker, error in sorted(self.failures.items()):
+            lines.append(f"  FAILED  {ticker}: {error}")
+        for ticker, warning in sorted(self.warnings.items()):
+            lines.append(f"  WARNING {ticker}: {warning}")
+        return "\n".join(lines)
+
+
+# --------------------------------------------------
+# Worker
+# --------------------------------------------------
+def _on_alarm(signum, frame):
+    raise TimeoutError("fit timed out")
+
+
+def _forecast_one(values, model, order, steps, timeout):
+    """Runs in a worker process; returns (forecast, seconds, warning)."""
+    use_alarm = timeout and hasattr(signal, "setitimer")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    started = time.perf_counter()
+    converged = True
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if model == "arima":
+                result = fit_arima(values, order)
+                converged = result.mle_retvals.get("converged", True) if result.mle_retvals else True
+                forecast = np.asarray(result.forecast(steps=steps))
+            else:
+                forecast = make_forecaster(model).fit(values).forecast(steps)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    if not np.all(np.isfinite(forecast)):
+        raise ValueError("non-finite forecast")
+    return forecast, time.perf_counter() - started, None if converged else "did not converge"
+
+
+# --------------------------------------------------
+# Driver
+# --------------------------------------------------
+def forecast_universe(
+    tickers,
+    start,
+    steps=30,
+    order=DEFAULT_ORDER,
+    model="arima",
+    workers=None,
+    timeout=120.0,
+    min_history=60,
+    download_chunk=200,
+    market=None,
+):
+    """Fit and forecast every ticker in parallel; never raises per-ticker errors."""
+    started = time.perf_counter()
+    market = market or get_market_data()
+    tickers = list(dict.fromkeys(tickers))
+
+    failures = {}
+    frames = {}
+    for i in range(0, len(tickers), download_chunk):
+        chunk = tickers[i:i + download_chunk]
+        try:
+            frames.update(market.history_many(chunk, start))
+        except Exception:
+            # A failed batch should not sink the run: retry its tickers one by one
+            for ticker in chunk:
+                try:
+                    frames[ticker] = market.history(ticker, start)
+                except Exception as exc:
+                    failures[ticker] = f"download failed: {type(exc).__name__}: {exc}"
+
+    series = {}
+    for ticker in tickers:
+        if ticker in failures:
+            continue
+        close = frames.get(ticker, pd.DataFrame()).get("Close", pd.Series(dtype="float64")).dropna()
+        if len(close) < min_history:
+            failures[ticker] = f"only {len(close)} bars of history"
+        else:
+            series[ticker] = close
+
+    models = {
+        ticker: select(len(close), BATCH_BUDGET) if model == "auto" else model
+        for ticker, close in series.items()
+    }
+    rows, fit_seconds, warnings_ = [], {}, {}
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_fit_worker) as pool:
+        futures = {
+            ticker: pool.submit(_forecast_one, close.to_numpy(), models[ticker], order, steps, timeout)
+            for ticker, close in series.items()
+        }
+        # Workers enforce the per-task timeout themselves; the overall deadline
+        # only guards against a worker process that stops responding
+        deadline = (
+            time.monotonic() + timeout * (len(futures) / workers + 1) if timeout else None
+        )
+        for ticker, future in futures.items():
+            try:
+                forecast, seconds, warning = future.result(
+                    timeout=max(0.0, deadline - time.monotonic()) if deadline else None
+                )
+            except FutureTimeout:
+                failures[ticker] = "timed out"
+                continue
+            except Exception as exc:
+                failures[ticker] = f"{type(exc).__name__}: {exc}"
+                continue
+
+            if warning:
+                warnings_[ticker] = warning
+            fit_seconds[ticker] = seconds
+            dates = future_index(series[ticker].index, steps, "1d", calendar_for_ticker(ticker))
+            rows.append(pd.DataFrame({
+                "Ticker": ticker,
+                "Model": models[ticker],
+                "Step": np.arange(1, steps + 1),
+                "Date": dates,
+                "Forecast": forecast,
+            }))
+
+    forecasts = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(columns=FORECAST_COLUMNS)
+    return BatchResult(forecasts, failures, warnings_, fit_seconds, time.perf_counter() - started)
+
+
+def write_forecasts(forecasts, path):
+    if path.endswith(".csv"):
+        forecasts.to_csv(path, index=False)
+    else:
+        forecasts.to_parquet(path, index=False)
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch forecasts for many tickers.")
+    parser.add_argument("tickers", nargs="*", help="Ticker symbols")
+    parser.add_argument("--tickers-file", help="File with one ticker per line")
+    parser.add_argument(
+        "--start",
+        default=(datetime.date.today() - datetime.timedelta(days=365 * 2)).isoformat(),
+        help="Training start date (default: two years ago)",
+    )
+    parser.add_argument("--steps", type=int, default=30, help="Forecast horizon in business days")
+    parser.add_argument("--model", default="arima", choices=["auto", *BACKENDS, ENSEMBLE],
+                        help="Forecasting backend; auto picks by expected fit cost")
+    parser.add_argument("--order", default="5,1,0", help="ARIMA order p,d,q")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-ticker fit timeout in seconds")
+    parser.add_argument("--output", default="forecasts.parquet", help="Output .parquet or .csv file")
+    args = parser.parse_args(argv)
+
+    tickers = [t.upper() for t in args.tickers]
+    if args.tickers_file:
+        with open(args.tickers_file) as fh:
+            tickers += [line.strip().upper() for line in fh if line.strip() and not line.startswith("#")]
+    if not tickers:
+        parser.error("no tickers given")
+
+    result = forecast_universe(
+        tickers,
+        start=args.start,
+        steps=args.steps,
+        order=tuple(int(x) for x in args.order.split(",")),
+        model=args.model,
+        workers=args.workers,
+        timeout=args.timeout,
+    )
+    write_forecasts(result.forecasts, args.output)
+
+    print(f"Wrote {len(result.forecasts)} rows to {args.output}")
+    print(result.summary())
+    return 0 if not result.failures else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
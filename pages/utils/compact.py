@@ -0,0 +1,72 @@
+"""Compact in-memory daily OHLCV, as held by the market-data cache.
+
+A normalized daily frame (see ``pages.utils.price_store``) costs 48 bytes
+per bar as float64 columns plus a datetime index, more with pandas block
+overhead. ``CompactFrame`` keeps the same bars in three contiguous,
+read-only arrays:
+
+    days     int64   (n,)     days since 1970-01-01
+    prices   float32 (4, n)   Open, High, Low, Close rows
+    volume   int64   (n,)
+
+which is 32 bytes per bar. ``to_frame`` hands out a ``Date``-indexed
+DataFrame whose columns are views of those arrays, so a cache hit copies
+nothing but the index. The arrays are read-only: pandas copies them when a
+caller adds or replaces columns, and raises on element-wise writes instead
+of corrupting the cache (take a ``.copy()`` first if you need those).
+
+float32 keeps about 7 significant digits, i.e. cents up to $100,000.
+"""
+import numpy as np
+import pandas as pd
+
+from pages.utils.price_store import OHLCV_COLUMNS, empty_frame
+
+PRICE_COLUMNS = OHLCV_COLUMNS[:4]
+NS_PER_DAY = 86_400 * 10**9
+
+
+def _frozen(array):
+    array.flags.writeable = False
+    return array
+
+
+class CompactFrame:
+    """Daily OHLCV bars as contiguous float32 / int64 arrays."""
+
+    __slots__ = ("days", "prices", "volume")
+
+    def __init__(self, days, prices, volume):
+        self.days = _frozen(np.ascontiguousarray(days, dtype="int64"))
+        self.prices = _frozen(np.ascontiguousarray(prices, dtype="float32"))
+        self.volume = _frozen(np.ascontiguousarray(volume, dtype="int64"))
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Pack a normalized daily frame; intraday timestamps are floored to their day."""
+        days = frame.index.as_unit("ns").asi8 // NS_PER_DAY
+        prices = frame[PRICE_COLUMNS].to_numpy(dtype="float32").T
+        volume = np.rint(np.nan_to_num(frame["Volume"].to_numpy(dtype="float64")))
+        return cls(days, prices, volume)
+
+    def __reduce__(self):
+        # Through __init__, so unpickled copies are read-only too
+        return CompactFrame, (self.days, self.prices, self.volume)
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def nbytes(self):
+        return self.days.nbytes + self.prices.nbytes + self.volume.nbytes
+
+    def index(self):
+        return pd.DatetimeIndex((self.days * NS_PER_DAY).view("datetime64[ns]"), name="Date")
+
+    def to_frame(self):
+        """``Date``-indexed OHLCV frame over this object's arrays (no data copy)."""
+        if not len(self):
+            return empty_frame()
+        columns = dict(zip(PRICE_COLUMNS, self.prices))
+        columns["Volume"] = self.volume
+        return pd.DataFrame(columns, index=self.index(), copy=False)
@@ -0,0 +1,77 @@
+"""Server-side downsampling for line and bar charts.
+
+A chart a few thousand pixels wide cannot show more points than it has
+pixels, so long histories are reduced before they are handed to Plotly.
+Both methods return *indices* into the original arrays, so every trace that
+shares an x-axis can be sliced with the same selection.
+"""
+import numpy as np
+
+METHODS = ("LTTB", "Min-Max", "Off")
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype("int64").astype("float64")
+    return x.astype("float64")
+
+
+def lttb(x, y, n_out):
+    """Largest-triangle-three-buckets: indices of the ``n_out`` most salient points."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x, y = _as_float(x), np.asarray(y, dtype="float64")
+    # Bucket edges over the interior points; first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket is the third triangle vertex
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        nxt = y[nxt_lo:nxt_hi]
+        nxt = nxt[~np.isnan(nxt)]
+        avg_y = nxt.mean() if len(nxt) else y[prev]
+
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[prev] - avg_x) * (by - y[prev]) - (x[prev] - bx) * (avg_y - y[prev]))
+        prev = lo + int(np.nanargmax(area)) if np.isfinite(area).any() else lo
+        out[i + 1] = prev
+    return out
+
+
+def minmax(y, n_buckets, keep="both"):
+    """Indices of each bucket's min and/or max (``keep`` = "both", "min" or "max")."""
+    n = len(y)
+    if n_buckets * (2 if keep == "both" else 1) >= n or n_buckets < 1:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype="float64")
+    width = -(-n // n_buckets)
+    blocks = np.full(width * n_buckets, np.nan)
+    blocks[:n] = y
+    blocks = blocks.reshape(n_buckets, width)
+    offsets = np.arange(n_buckets) * width
+    has_data = ~np.isnan(blocks).all(axis=1)
+
+    picks = [np.array([0, n - 1])]
+    if keep in ("both", "min"):
+        picks.append((offsets + np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1))[has_data])
+    if keep in ("both", "max"):
+        picks.append((offsets + np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1))[has_data])
+    return np.unique(np.concatenate(picks))
+
+
+def downsample_indices(x, y, width_px, method="LTTB"):
+    """Indices to plot for a chart ``width_px`` pixels wide (one point per pixel)."""
+    if method == "Off":
+        return np.arange(len(y))
+    if method == "Min-Max":
+        return minmax(y, max(width_px // 2, 1))
+    return lttb(x, y, width_px)
@@ -0,0 +1,227 @@
+"""Ensemble of forecasting backends fitted concurrently on shared features.
+
+    ensemble = Ensemble(["arima", "ets", "ridge_ar", "naive"]).fit(close)
+    ensemble.forecast(30), ensemble.forecast_interval(30, 0.95)
+    ensemble.table()   # per-member weight, holdout error, fit time
+
+The series is preprocessed once into a read-only ``Features`` (price
+changes, log returns, lag windows as ``sliding_window_view``s) that every
+member reads without copying. Each member fits on all but the last
+``holdout`` bars, is scored on them, then folds them in with ``update``
+rather than fitting a second time. Weights are proportional to the inverse
+holdout MAE.
+
+Members run on a thread pool by default. ``executor="process"`` runs them
+in worker processes that map the series from one ``SharedMemory`` block, for
+members (ARIMA) that hold the GIL for most of their fit. Either way the
+ensemble's latency is roughly that of its slowest member.
+"""
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.forecasters import BACKENDS, make_forecaster
+
+DEFAULT_MEMBERS = tuple(BACKENDS)
+DEFAULT_HOLDOUT = 20
+
+
+# --------------------------------------------------
+# Shared features
+# --------------------------------------------------
+class Features:
+    """Preprocessed views of one series, computed once and shared read-only."""
+
+    def __init__(self, values, copy=True):
+        values = np.array(values, dtype="float64", copy=copy)
+        values.flags.writeable = False
+        self.values = values
+        self.changes = self._frozen(np.diff(values))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.log_returns = self._frozen(np.diff(np.log(values)))
+
+    @staticmethod
+    def _frozen(array):
+        array.flags.writeable = False
+        return array
+
+    def lag_windows(self, lags):
+        """``(n - lags - 1, lags + 1)`` rows of [change_{t-lags} .. change_t]; a view, no copy."""
+        from numpy.lib.stride_tricks import sliding_window_view
+
+        return sliding_window_view(self.changes, lags + 1)
+
+    def prefix(self, n):
+        """The first ``n`` observations, as views into this object's arrays."""
+        head = Features.__new__(Features)
+        head.values = self.values[:n]
+        head.changes = self.changes[:n - 1]
+        head.log_returns = self.log_returns[:n - 1]
+        return head
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.changes.nbytes + self.log_returns.nbytes
+
+
+# --------------------------------------------------
+# Member fits
+# --------------------------------------------------
+def _fit_member(name, features, holdout):
+    """Fit on the training part, score on the holdout, then update through it."""
+    model = make_forecaster(name)
+    model._imports()  # a cold import is not this member's fit time
+    started = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        n_train = len(features.values) - holdout
+        model.fit(None, features=features.prefix(n_train))
+        actual = features.values[n_train:]
+        mae = float(np.mean(np.abs(model.forecast(holdout) - actual))) if holdout else np.nan
+        model.update(actual)
+    return model, mae, time.perf_counter() - started
+
+
+def _fit_member_shared(name, shm_name, n, holdout):
+    """Process-pool entry point: map the parent's series without copying it."""
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        values = np.ndarray((n,), dtype="float64", buffer=shm.buf)
+        features = Features(values, copy=False)
+        result = _fit_member(name, features, holdout)
+        del values, features
+        return result
+    finally:
+        shm.close()
+
+
+# --------------------------------------------------
+# Ensemble
+# --------------------------------------------------
+class Ensemble:
+    """Inverse-holdout-error weighted combination; same interface as a single forecaster."""
+
+    name = "ensemble"
+    label = "Ensemble"
+    peak_bytes = None
+
+    def __init__(self, members=DEFAULT_MEMBERS, holdout=DEFAULT_HOLDOUT, executor="thread"):
+        self.names = list(members)
+        self.holdout = holdout
+        self.executor = executor
+        self.members = {}
+        self.errors = {}
+        self.member_seconds = {}
+        self.failures = {}
+        self.weights = {}
+        self.holdout_used = 0
+        self.fit_seconds = None
+        self.n_obs = 0
+        self.last_value = None
+
+    def fit(self, values, trace_memory=False):
+        started = time.perf_counter()
+        features = Features(values)
+        holdout = self.holdout_used = min(self.holdout, len(features.values) // 5)
+
+        if self.executor == "process":
+            results = self._fit_processes(features, holdout)
+        else:
+            with ThreadPoolExecutor(len(self.names), thread_name_prefix="ensemble") as pool:
+                futures = {name: pool.submit(_fit_member, name, features, holdout) for name in self.names}
+                results = self._collect(futures)
+
+        for name, (model, mae, seconds) in results.items():
+            self.members[name], self.errors[name], self.member_seconds[name] = model, mae, seconds
+        if not self.members:
+            raise ValueError("every ensemble member failed: " + "; ".join(
+                f"{name}: {error}" for name, error in self.failures.items()
+            ))
+        self.weights = self._weights()
+        self.n_obs, self.last_value = len(features.values), float(features.values[-1])
+        self.fit_seconds = time.perf_counter() - started
+        return self
+
+    def _collect(self, futures):
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as exc:
+                # One member failing (e.g. too little data) should not sink the others
+                self.failures[name] = f"{type(exc).__name__}: {exc}"
+        return results
+
+    def _fit_processes(self, features, holdout):
+        from multiprocessing import shared_memory
+
+        from pages.utils.model_train import init_fit_worker
+
+        values = features.values
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        try:
+            np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+            with ProcessPoolExecutor(len(self.names), initializer=init_fit_worker) as pool:
+                futures = {
+                    name: pool.submit(_fit_member_shared, name, shm.name, len(values), holdout)
+                    for name in self.names
+                }
+                return self._collect(futures)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _weights(self):
+        errors = {name: self.errors[name] for name in self.members}
+        if any(not np.isfinite(e) for e in errors.values()):
+            return {name: 1 / len(errors) for name in errors}
+        # A member with zero holdout error gets all of the weight
+        inverse = {name: 1 / max(e, 1e-12) for name, e in errors.items()}
+        total = sum(inverse.values())
+        return {name: w / total for name, w in inverse.items()}
+
+    def update(self, values):
+        """Fold new bars into every member; weights stay as fitted."""
+        values = np.asarray(values, dtype="float64")
+        if len(values):
+            for model in self.members.values():
+                model.update(values)
+            self.n_obs += len(values)
+            self.last_value = float(values[-1])
+        return self
+
+    def forecast(self, steps):
+        return sum(w * self.members[name].forecast(steps) for name, w in self.weights.items())
+
+    def forecast_interval(self, steps, level=0.95):
+        """Weighted average of the members' bounds (an approximation, not a mixture quantile)."""
+        lower = upper = 0.0
+        for name, w in self.weights.items():
+            lo, hi = self.members[name].forecast_interval(steps, level)
+            lower, upper = lower + w * lo, upper + w * hi
+        return lower, upper
+
+    @property
+    def member_total_seconds(self):
+        return sum(self.member_seconds.values())
+
+    def table(self):
+        rows = [
+            {
+                "Model": BACKENDS[name].label,
+                "Weight": self.weights[name],
+                "Holdout MAE": self.errors[name],
+                "Fit ms": self.member_seconds[name] * 1000,
+            }
+            for name in self.members
+        ]
+        rows += [
+            {"Model": f"{BACKENDS[name].label} (failed: {error})", "Weight": 0.0}
+            for name, error in self.failures.items()
+        ]
+        return pd.DataFrame(rows, columns=["Model", "Weight", "Holdout MAE", "Fit ms"])
@@ -0,0 +1,484 @@
+"""Forecasting backends behind one interface, with measured fit cost.
+
+    model = make_forecaster("ets").fit(close)
+    model.update(new_bars)                  # fold in new observations cheaply
+    mean = model.forecast(30)
+    lower, upper = model.forecast_interval(30, 0.95)
+
+Every backend is CPU-only and reports ``fit_seconds`` (and ``peak_bytes``
+when fitted with ``trace_memory=True``). Observed fit times feed a per-backend
+cost estimate, so ``select`` can pick the most accurate backend that fits a
+time budget: a fast one for interactive reruns, a heavier one in batch.
+
+    arima     ARIMA via statsmodels (``pages.utils.model_train``)
+    ets       additive damped-trend exponential smoothing, ETS(A,Ad,N)
+    ridge_ar  ridge-regularized autoregression on lagged price changes
+    naive     random walk with drift
+
+``make_forecaster("ensemble")`` combines all of them (``pages.utils.ensemble``).
+"""
+import copy
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict, namedtuple
+from contextlib import contextmanager
+from statistics import NormalDist
+
+import numpy as np
+
+from pages.utils.instrumentation import note_cache
+from pages.utils.model_train import DEFAULT_ORDER, FittedModel, fit_arima
+
+# Time budgets for ``select``: a page rerun vs. the batch forecaster
+INTERACTIVE_BUDGET = 0.5
+BATCH_BUDGET = 30.0
+
+
+# --------------------------------------------------
+# Cost measurement
+# --------------------------------------------------
+class _Cost:
+    seconds = None
+    peak_bytes = None
+
+
+_trace_lock = threading.Lock()
+
+
+@contextmanager
+def _measure(trace_memory):
+    """Wall time and, optionally, the tracemalloc peak of the block."""
+    cost = _Cost()
+    # tracemalloc is process-wide: only one traced fit at a time, never nested
+    traced = trace_memory and not tracemalloc.is_tracing() and _trace_lock.acquire(blocking=False)
+    if traced:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        yield cost
+    finally:
+        cost.seconds = time.perf_counter() - started
+        if traced:
+            cost.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            _trace_lock.release()
+
+
+# --------------------------------------------------
+# Interface
+# --------------------------------------------------
+class Forecaster:
+    """Base class: subclasses implement ``_fit``, ``_update`` and ``_mean_se``."""
+
+    name = None
+    label = None
+    min_obs = 3
+
+    def __init__(self):
+        self.n_obs = 0
+        self.last_value = None
+        self.fit_seconds = None
+        self.peak_bytes = None
+
+    def fit(self, values, trace_memory=False, features=None):
+        """``features`` (``pages.utils.ensemble.Features``) stands in for ``values`` with shared arrays."""
+        values = features.values if features is not None else np.asarray(values, dtype="float64")
+        if len(values) < self.min_obs:
+            raise ValueError(f"{self.label} needs at least {self.min_obs} observations, got {len(values)}")
+        self._imports()  # outside the measurement: a cold import is not fit cost
+        with _measure(trace_memory) as cost:
+            self._fit(values, features)
+        self.n_obs, self.last_value = len(values), float(values[-1])
+        self.fit_seconds, self.peak_bytes = cost.seconds, cost.peak_bytes
+        if cost.peak_bytes is None:
+            # Traced fits run slower; keep them out of the cost estimate
+            observe_cost(self.name, len(values), cost.seconds)
+        return self
+
+    def update(self, values):
+        """Extend the fit with observations that follow the training series."""
+        values = np.asarray(values, dtype="float64")
+        if len(values):
+            self._update(values)
+            self.n_obs += len(values)
+            self.last_value = float(values[-1])
+        return self
+
+    def forecast(self, steps):
+        return self._mean_se(steps)[0]
+
+    def forecast_interval(self, steps, level=0.95):
+        """(lower, upper) bounds of the ``level`` prediction interval for each step."""
+        mean, se = self._mean_se(steps)
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+        return mean - z * se, mean + z * se
+
+    def _imports(self):
+        pass
+
+    def _fit(self, values, features=None):
+        raise NotImplementedError
+
+    def _update(self, values):
+        raise NotImplementedError
+
+    def _mean_se(self, steps):
+        raise NotImplementedError
+
+
+# --------------------------------------------------
+# Backends
+# --------------------------------------------------
+class ArimaForecaster(Forecaster):
+    """The existing statsmodels ARIMA; ``update`` appends with frozen parameters."""
+
+    name = "arima"
+    label = "ARIMA"
+    min_obs = 20
+
+    def __init__(self, order=DEFAULT_ORDER):
+        super().__init__()
+        self.order = tuple(order)
+        self.model = None
+
+    def _imports(self):
+        import statsmodels.tsa.arima.model  # noqa: F401
+
+    def _fit(self, values, features=None):
+        self.model = FittedModel(None, fit_arima(values, self.order), values)
+
+    def _update(self, values):
+        n_obs = self.model.n_obs + len(values)
+        self.model = FittedModel(None, self.model.result.append(values, refit=False), values)
+        self.model.n_obs = n_obs
+
+    def _mean_se(self, steps):
+        mean, std = self.model._forecast_table(steps)
+        return mean[:steps], std[:steps]
+
+
+class ETSForecaster(Forecaster):
+    """ETS(A,Ad,N): level + damped trend, smoothing weights fitted by least squares.
+
+    The recursion is linear with constant coefficients, so the one-step
+    predictions for a whole series come out of two ``scipy.signal.lfilter``
+    passes instead of a Python loop; that keeps each optimizer step O(n) in C.
+    """
+
+    name = "ets"
+    label = "ETS (damped trend)"
+    min_obs = 10
+
+    def __init__(self, damped=True):
+        super().__init__()
+        self.damped = damped
+        self.params = None  # (alpha, beta, phi)
+        self.state = None   # (level, trend) after the last observation
+        self.sse = 0.0
+        self.n_errors = 0
+
+    def _imports(self):
+        import scipy.optimize  # noqa: F401
+        import scipy.signal  # noqa: F401
+
+    @staticmethod
+    def _outputs(values, params, state, weights):
+        """``weights @ state_{t-1}`` for t = 0..n, i.e. what was known before each bar."""
+        from scipy.signal import lfilter
+
+        alpha, beta, phi = params
+        # state_t = D @ state_{t-1} + g * y_t  (error-correction form, errors substituted)
+        d = np.array([[1 - alpha, phi * (1 - alpha)], [-beta, phi * (1 - beta)]])
+        g = np.array([alpha, beta])
+        adj = np.array([[-d[1, 1], d[0, 1]], [d[1, 0], -d[0, 0]]])  # lag-1 term of adj(I - D z^-1)
+        a = [1.0, -np.trace(d), d[0, 0] * d[1, 1] - d[0, 1] * d[1, 0]]
+        w = np.asarray(weights, dtype="float64")
+        driven = lfilter([0.0, w @ g, w @ adj @ g], a, np.append(values, 0.0))
+        impulse = np.zeros(len(values) + 1)
+        impulse[0] = 1.0
+        initial = lfilter([w @ state, w @ adj @ state], a, impulse)
+        return driven + initial
+
+    def _sse(self, values, params, state):
+        phi = params[2]
+        predicted = self._outputs(values, params, state, (1.0, phi))[:-1]
+        errors = values - predicted
+        return float(errors @ errors)
+
+    def _fit(self, values, features=None):
+        from scipy.optimize import minimize
+
+        state = np.array([values[0], 0.0])
+        changes = features.changes if features is not None else np.diff(values)
+        scale = np.var(changes) or 1.0
+        phi_bounds = (0.8, 0.98) if self.damped else (1.0, 1.0)
+
+        def objective(x):
+            alpha, beta_star, phi = x
+            return self._sse(values, (alpha, alpha * beta_star, phi), state) / (scale * len(values))
+
+        best = minimize(
+            objective, x0=(0.5, 0.1, phi_bounds[1]), method="L-BFGS-B",
+            bounds=[(1e-4, 0.9999), (1e-4, 0.9999), phi_bounds],
+        )
+        alpha, beta_star, phi = best.x
+        self.params = (alpha, alpha * beta_star, phi)
+        self.sse = self._sse(values, self.params, state)
+        self.n_errors = len(values)
+        self.state = self._final_state(values, state)
+
+    def _final_state(self, values, state):
+        return np.array([
+            self._outputs(values, self.params, state, (1.0, 0.0))[-1],
+            self._outputs(values, self.params, state, (0.0, 1.0))[-1],
+        ])
+
+    def _update(self, values):
+        phi = self.params[2]
+        predicted = self._outputs(values, self.params, self.state, (1.0, phi))[:-1]
+        errors = values - predicted
+        self.sse += float(errors @ errors)
+        self.n_errors += len(values)
+        self.state = self._final_state(values, self.state)
+
+    def _mean_se(self, steps):
+        alpha, beta, phi = self.params
+        level, trend = self.state
+        damping = np.cumsum(phi ** np.arange(1, steps + 1))   # phi + phi^2 + ... + phi^h
+        mean = level + damping * trend
+        sigma2 = self.sse / max(self.n_errors - 3, 1)
+        # Hyndman et al. (2008), class 1: var_h = sigma^2 (1 + sum_{j<h} (alpha + beta * phi_j)^2)
+        c = alpha + beta * damping[:-1]
+        var = sigma2 * (1 + np.concatenate([[0.0], np.cumsum(c ** 2)]))
+        return mean, np.sqrt(var)
+
+
+class RidgeARForecaster(Forecaster):
+    """AR(p) on price changes, solved in closed form from running X'X / X'y sums.
+
+    ``update`` only adds the new rows' outer products and re-solves the
+    (p+1)-square system, so extending by a bar costs O(p^2), not a refit.
+    """
+
+    name = "ridge_ar"
+    label = "Ridge AR"
+
+    def __init__(self, lags=10, ridge=0.01):
+        super().__init__()
+        self.lags = lags
+        self.ridge = ridge
+        self.gram = np.zeros((lags + 1, lags + 1))
+        self.moment = np.zeros(lags + 1)
+        self.target_sq = 0.0
+        self.rows = 0
+        self.coef = None
+        self.tail = None  # last ``lags + 1`` observed values
+
+    @property
+    def min_obs(self):
+        return 2 * self.lags + 2
+
+    def _accumulate(self, values, windows=None):
+        from numpy.lib.stride_tricks import sliding_window_view
+
+        if windows is None:
+            changes = np.diff(values)
+            if len(changes) <= self.lags:
+                return
+            windows = sliding_window_view(changes, self.lags + 1)
+        design = np.column_stack([np.ones(len(windows)), windows[:, :-1]])
+        target = windows[:, -1]
+        self.gram += design.T @ design
+        self.moment += design.T @ target
+        self.target_sq += float(target @ target)
+        self.rows += len(windows)
+
+    def _solve(self):
+        penalty = np.eye(self.lags + 1) * self.ridge * np.trace(self.gram[1:, 1:]) / self.lags
+        penalty[0, 0] = 0.0  # never shrink the intercept (the drift)
+        self.coef = np.linalg.solve(self.gram + penalty, self.moment)
+
+    def _fit(self, values, features=None):
+        self._accumulate(values, features.lag_windows(self.lags) if features is not None else None)
+        self._solve()
+        # A copy: ``values`` may be a shared read-only buffer
+        self.tail = np.array(values[-(self.lags + 1):])
+
+    def _update(self, values):
+        joined = np.concatenate([self.tail, values])
+        self._accumulate(joined)
+        self._solve()
+        self.tail = joined[-(self.lags + 1):]
+
+    def _mean_se(self, steps):
+        intercept, weights = self.coef[0], self.coef[1:]  # weights: oldest lag first
+        history = list(np.diff(self.tail))
+        changes = np.empty(steps)
+        for h in range(steps):
+            changes[h] = intercept + weights @ np.asarray(history[-self.lags:])
+            history.append(changes[h])
+        mean = self.tail[-1] + np.cumsum(changes)
+
+        sse = self.target_sq - 2 * self.coef @ self.moment + self.coef @ self.gram @ self.coef
+        sigma2 = max(sse, 0.0) / max(self.rows - self.lags - 1, 1)
+        # psi weights of the AR on changes, cumulated to the price level
+        phi = weights[::-1]
+        psi = np.zeros(steps)
+        psi[0] = 1.0
+        for j in range(1, steps):
+            k = min(j, self.lags)
+            psi[j] = phi[:k] @ psi[j - 1::-1][:k]
+        var = sigma2 * np.cumsum(np.cumsum(psi) ** 2)
+        return mean, np.sqrt(var)
+
+
+class NaiveForecaster(Forecaster):
+    """Random walk, with drift by default; the baseline every model should beat."""
+
+    name = "naive"
+    label = "Naive (drift)"
+
+    def __init__(self, drift=True):
+        super().__init__()
+        self.drift = drift
+        self.first = None
+        self.change_sq = 0.0
+
+    def _fit(self, values, features=None):
+        changes = features.changes if features is not None else np.diff(values)
+        self.first = float(values[0])
+        self.change_sq = float(changes @ changes)
+
+    def _update(self, values):
+        changes = np.diff(np.concatenate([[self.last_value], values]))
+        self.change_sq += float(changes @ changes)
+
+    def _mean_se(self, steps):
+        n_changes = self.n_obs - 1
+        h = np.arange(1, steps + 1)
+        if self.drift:
+            slope = (self.last_value - self.first) / n_changes
+            sigma2 = max(self.change_sq - n_changes * slope ** 2, 0.0) / max(n_changes - 1, 1)
+            # Hyndman & Athanasopoulos: the drift's own estimation error widens the band
+            return self.last_value + h * slope, np.sqrt(sigma2 * h * (1 + h / n_changes))
+        sigma2 = self.change_sq / n_changes
+        return np.full(steps, self.last_value), np.sqrt(sigma2 * h)
+
+
+# --------------------------------------------------
+# Registry & cost-aware selection
+# --------------------------------------------------
+Backend = namedtuple("Backend", ["name", "label", "factory", "seconds_per_1k"])
+
+# Most accurate first; ``select`` walks this order. The per-1,000-observation
+# fit times are warm-fit priors from ``python -m benchmarks.forecasters``;
+# observed fits move them toward this machine's numbers at runtime.
+BACKENDS = {
+    spec.name: spec
+    for spec in (
+        Backend("arima", ArimaForecaster.label, ArimaForecaster, 0.15),
+        Backend("ets", ETSForecaster.label, ETSForecaster, 0.005),
+        Backend("ridge_ar", RidgeARForecaster.label, RidgeARForecaster, 0.0005),
+        Backend("naive", NaiveForecaster.label, NaiveForecaster, 0.00005),
+    )
+}
+
+# Not a backend (``select`` never picks it): every backend fitted at once and
+# combined, see ``pages.utils.ensemble``
+ENSEMBLE = "ensemble"
+
+_costs = {name: spec.seconds_per_1k for name, spec in BACKENDS.items()}
+_costs_lock = threading.Lock()
+
+
+def observe_cost(name, n_obs, seconds, weight=0.3):
+    """Fold an observed fit time into the backend's seconds-per-1k estimate."""
+    if name not in _costs or not n_obs:
+        return
+    with _costs_lock:
+        _costs[name] += weight * (seconds * 1000 / n_obs - _costs[name])
+
+
+def expected_seconds(name, n_obs):
+    return _costs[name] * n_obs / 1000
+
+
+def select(n_obs, budget_seconds=INTERACTIVE_BUDGET, candidates=None):
+    """Most accurate backend expected to fit ``n_obs`` points within the budget."""
+    candidates = [name for name in BACKENDS if candidates is None or name in candidates]
+    for name in candidates:
+        if expected_seconds(name, n_obs) <= budget_seconds:
+            return name
+    return min(candidates, key=lambda name: _costs[name])
+
+
+def make_forecaster(name, **options):
+    if name == ENSEMBLE:
+        from pages.utils.ensemble import Ensemble
+
+        return Ensemble(**options)
+    if name not in BACKENDS:
+        raise ValueError(f"unknown model {name!r}; choose from {', '.join([*BACKENDS, ENSEMBLE])}")
+    return BACKENDS[name].factory(**options)
+
+
+# --------------------------------------------------
+# Fitted-model cache (non-ARIMA backends; ARIMA uses ``ModelCache``)
+# --------------------------------------------------
+class ForecasterCache:
+    """LRU of fitted forecasters keyed by (ticker, backend, window); extends via ``update``."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.stats = Counter()
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ticker, values, name, window_start=None, window_end=None, trace_memory=False):
+        values = np.asarray(values, dtype="float64")
+        # Same identity as ``ModelCache``: a moved last bar is a different series
+        key = (ticker, name, window_start, window_end, len(values), float(values[-1]))
+        with self._lock:
+            cached = self._models.get(key)
+            if cached is not None:
+                self._models.move_to_end(key)
+                self.stats["hit"] += 1
+                note_cache("forecaster", "hit")
+                return cached
+            base = max(
+                (m for (t, n, s, *_), m in self._models.items()
+                 if (t, n, s) == (ticker, name, window_start)
+                 and len(values) > m.n_obs and np.isclose(values[m.n_obs - 1], m.last_value)),
+                key=lambda m: m.n_obs, default=None,
+            )
+
+        if base is None:
+            model = make_forecaster(name).fit(values, trace_memory=trace_memory)
+            self.stats["fit"] += 1
+            note_cache("forecaster", "fit")
+        else:
+            # Cached models are shared between sessions: extend a copy
+            model = copy.deepcopy(base).update(values[base.n_obs:])
+            self.stats["update"] += 1
+            note_cache("forecaster", "update")
+
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+        return model
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_forecaster_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ForecasterCache()
+        return _default_cache
+
@@ -0,0 +1,358 @@
+"""Technical indicators: vectorized batch compute plus O(1) streaming state.
+
+Every indicator has a NumPy batch function for full-history compute and a
+state object whose ``update(bar)`` folds in one new bar in constant time.
+``prime(frame)`` seeds a state from history with the batch functions, so a
+stream can pick up where a chart left off without replaying every bar.
+Both paths produce the same numbers.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# --------------------------------------------------
+# Batch (full history)
+# --------------------------------------------------
+def _ewm(values, alpha, seed, start):
+    """y[start] = seed; y[t] = alpha * x[t] + (1 - alpha) * y[t-1] afterwards."""
+    from scipy.signal import lfilter
+
+    out = np.full(len(values), np.nan)
+    if start >= len(values):
+        return out
+    out[start] = seed
+    tail = values[start + 1:]
+    if len(tail):
+        out[start + 1:] = lfilter([alpha], [1, alpha - 1], tail, zi=[(1 - alpha) * seed])[0]
+    return out
+
+
+def sma(close, window):
+    close = np.asarray(close, dtype="float64")
+    out = np.full(len(close), np.nan)
+    if len(close) >= window:
+        csum = np.cumsum(np.insert(close, 0, 0.0))
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def ema(close, span):
+    close = np.asarray(close, dtype="float64")
+    if not len(close):
+        return np.array([])
+    return _ewm(close, 2 / (span + 1), close[0], 0)
+
+
+def _wilder(values, period, first):
+    """Wilder's RMA: SMA of the first ``period`` values, then alpha = 1/period."""
+    end = first + period
+    if end > len(values):
+        return np.full(len(values), np.nan)
+    return _ewm(values, 1 / period, values[first:end].mean(), end - 1)
+
+
+def rsi(close, period=14):
+    close = np.asarray(close, dtype="float64")
+    delta = np.diff(close, prepend=np.nan)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    avg_gain = _wilder(gains, period, 1)
+    avg_loss = _wilder(losses, period, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + avg_gain / avg_loss)
+    return np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, out)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, window=20, k=2.0):
+    close = np.asarray(close, dtype="float64")
+    mid = sma(close, window)
+    std = np.full(len(close), np.nan)
+    if len(close) >= window:
+        std[window - 1:] = sliding_window_view(close, window).std(axis=1)
+    return mid - k * std, mid, mid + k * std
+
+
+def true_range(high, low, close):
+    high, low, close = (np.asarray(a, dtype="float64") for a in (high, low, close))
+    prev_close = np.roll(close, 1)
+    tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    if len(tr):
+        tr[0] = high[0] - low[0]
+    return tr
+
+
+def atr(high, low, close, period=14):
+    return _wilder(true_range(high, low, close), period, 0)
+
+
+def vwap(high, low, close, volume):
+    """Volume-weighted average price anchored at the first bar."""
+    typical = (np.asarray(high) + np.asarray(low) + np.asarray(close)) / 3
+    volume = np.asarray(volume, dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.cumsum(typical * volume) / np.cumsum(volume)
+
+
+# --------------------------------------------------
+# Streaming state (O(1) per bar)
+# --------------------------------------------------
+class _Ring:
+    """Fixed-size window over the last ``size`` values."""
+
+    def __init__(self, size):
+        self.values = np.zeros(size)
+        self.size = size
+        self.count = 0
+
+    def push(self, value):
+        """Store ``value``; return the value it evicted (0.0 while filling)."""
+        slot = self.count % self.size
+        evicted = self.values[slot] if self.count >= self.size else 0.0
+        self.values[slot] = value
+        self.count += 1
+        return evicted
+
+    @property
+    def full(self):
+        return self.count >= self.size
+
+
+class SMAState:
+    def __init__(self, window):
+        self.window = window
+        self.ring = _Ring(window)
+        self.total = 0.0
+
+    def update(self, bar):
+        self.total += bar["Close"] - self.ring.push(bar["Close"])
+        return self.total / self.window if self.ring.full else math.nan
+
+    def prime(self, frame):
+        for value in frame["Close"].to_numpy()[-self.window:]:
+            self.update({"Close": value})
+
+
+class EMAState:
+    def __init__(self, span, key="Close"):
+        self.span = span
+        self.alpha = 2 / (span + 1)
+        self.key = key
+        self.value = None
+
+    def update(self, bar):
+        x = bar[self.key]
+        self.value = x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    def prime(self, frame):
+        if len(frame):
+            self.value = ema(frame[self.key].to_numpy(), self.span)[-1]
+
+
+class _WilderState:
+    def __init__(self, period):
+        self.period = period
+        self.seed_sum = 0.0
+        self.seen = 0
+        self.value = math.nan
+
+    def push(self, x):
+        if self.seen < self.period:
+            self.seed_sum += x
+            self.seen += 1
+            if self.seen == self.period:
+                self.value = self.seed_sum / self.period
+        else:
+            self.value += (x - self.value) / self.period
+        return self.value
+
+
+class RSIState:
+    def __init__(self, period=14):
+        self.gain = _WilderState(period)
+        self.loss = _WilderState(period)
+        self.prev_close = None
+
+    def update(self, bar):
+        close = bar["Close"]
+        if self.prev_close is None:
+            self.prev_close = close
+            return math.nan
+        delta, self.prev_close = close - self.prev_close, close
+        gain = self.gain.push(max(delta, 0.0))
+        loss = self.loss.push(max(-delta, 0.0))
+        if math.isnan(gain):
+            return math.nan
+        return 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+
+    def prime(self, frame):
+        close = frame["Close"].to_numpy()
+        period = self.gain.period
+        if len(close) <= period:
+            for value in close:
+                self.update({"Close": value})
+            return
+        delta = np.diff(close, prepend=np.nan)
+        for state, series in (
+            (self.gain, _wilder(np.where(delta > 0, delta, 0.0), period, 1)),
+            (self.loss, _wilder(np.where(delta < 0, -delta, 0.0), period, 1)),
+        ):
+            state.seen, state.value = period, series[-1]
+        self.prev_close = close[-1]
+
+
+class MACDState:
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal, key="MACD")
+
+    def update(self, bar):
+        line = self.fast.update(bar) - self.slow.update(bar)
+        signal = self.signal.update({"MACD": line})
+        return line, signal, line - signal
+
+    def prime(self, frame):
+        close = frame["Close"].to_numpy()
+        if not len(close):
+            return
+        _, signal, _ = macd(close, self.fast.span, self.slow.span, self.signal.span)
+        self.fast.prime(frame)
+        self.slow.prime(frame)
+        self.signal.value = signal[-1]
+
+
+class BollingerState:
+    def __init__(self, window=20, k=2.0):
+        self.window = window
+        self.k = k
+        self.ring = _Ring(window)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, bar):
+        x = bar["Close"]
+        evicted = self.ring.push(x)
+        self.total += x - evicted
+        self.total_sq += x * x - evicted * evicted
+        if not self.ring.full:
+            return math.nan, math.nan, math.nan
+        mid = self.total / self.window
+        std = math.sqrt(max(self.total_sq / self.window - mid * mid, 0.0))
+        return mid - self.k * std, mid, mid + self.k * std
+
+    def prime(self, frame):
+        for value in frame["Close"].to_numpy()[-self.window:]:
+            self.update({"Close": value})
+
+
+class ATRState:
+    def __init__(self, period=14):
+        self.tr = _WilderState(period)
+        self.prev_close = None
+
+    def update(self, bar):
+        high, low = bar["High"], bar["Low"]
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = bar["Close"]
+        return self.tr.push(tr)
+
+    def prime(self, frame):
+        period = self.tr.period
+        if len(frame) < period:
+            for bar in frame.to_dict("records"):
+                self.update(bar)
+            return
+        series = atr(frame["High"], frame["Low"], frame["Close"], period)
+        self.tr.seen, self.tr.value = period, series[-1]
+        self.prev_close = frame["Close"].iloc[-1]
+
+
+class VWAPState:
+    def __init__(self):
+        self.pv = 0.0
+        self.volume = 0.0
+
+    def update(self, bar):
+        self.pv += (bar["High"] + bar["Low"] + bar["Close"]) / 3 * bar["Volume"]
+        self.volume += bar["Volume"]
+        return self.pv / self.volume if self.volume else math.nan
+
+    def prime(self, frame):
+        typical = (frame["High"] + frame["Low"] + frame["Close"]) / 3
+        self.pv = float((typical * frame["Volume"]).sum())
+        self.volume = float(frame["Volume"].sum())
+
+
+# --------------------------------------------------
+# Registry
+# --------------------------------------------------
+Indicator = namedtuple("Indicator", ["name", "panel", "columns", "compute", "state"])
+
+
+INDICATORS = {
+    spec.name: spec
+    for spec in (
+        Indicator("SMA 20", False, ("SMA 20",),
+                  lambda f: [sma(f["Close"], 20)], lambda: SMAState(20)),
+        Indicator("SMA 50", False, ("SMA 50",),
+                  lambda f: [sma(f["Close"], 50)], lambda: SMAState(50)),
+        Indicator("EMA 20", False, ("EMA 20",),
+                  lambda f: [ema(f["Close"], 20)], lambda: EMAState(20)),
+        Indicator("Bollinger 20", False, ("BB Lower", "BB Mid", "BB Upper"),
+                  lambda f: bollinger(f["Close"], 20), lambda: BollingerState(20)),
+        Indicator("VWAP", False, ("VWAP",),
+                  lambda f: [vwap(f["High"], f["Low"], f["Close"], f["Volume"])], VWAPState),
+        Indicator("RSI 14", True, ("RSI 14",),
+                  lambda f: [rsi(f["Close"], 14)], lambda: RSIState(14)),
+        Indicator("MACD", True, ("MACD", "MACD Signal", "MACD Hist"),
+                  lambda f: macd(f["Close"]), MACDState),
+        Indicator("ATR 14", True, ("ATR 14",),
+                  lambda f: [atr(f["High"], f["Low"], f["Close"], 14)], lambda: ATRState(14)),
+    )
+}
+
+
+def compute(frame, names):
+    """Batch-compute the selected indicators; one column per output."""
+    out = {}
+    for name in names:
+        spec = INDICATORS[name]
+        for column, values in zip(spec.columns, spec.compute(frame)):
+            out[column] = np.asarray(values)
+    return pd.DataFrame(out, index=frame.index)
+
+
+class IndicatorSet:
+    """Streaming state for several indicators; ``update`` is O(1) per indicator."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.states = {name: INDICATORS[name].state() for name in self.names}
+
+    def prime(self, frame):
+        for state in self.states.values():
+            state.prime(frame)
+        return self
+
+    def update(self, bar):
+        """Fold in one OHLCV bar; returns ``{column: latest value}``."""
+        out = {}
+        for name, state in self.states.items():
+            values = state.update(bar)
+            values = values if isinstance(values, tuple) else (values,)
+            out.update(zip(INDICATORS[name].columns, values))
+        return out
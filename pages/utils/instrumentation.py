@@ -0,0 +1,412 @@
+"""Stage timing, cache attribution, Prometheus metrics and per-rerun profiling.
+
+    perf = Trace("analysis")
+    with perf.stage("prices.load") as rec:
+        data = rec.payload(market.bars(...))
+    ...
+    perf.finish()
+    render_panel(perf)
+
+Each stage records wall time and payload bytes. Cache lookups made while a
+stage is active on the same thread (``MarketData`` and ``ModelCache`` report
+theirs through ``note_cache``) are attached to it as hit/miss counts. Every
+stage also feeds the process-wide Prometheus ``REGISTRY``, which is exported
+to ``STOCKVISION_METRICS_FILE`` after each rerun and/or served at
+``http://127.0.0.1:$STOCKVISION_METRICS_PORT/metrics``.
+
+Profiling is opt-in per rerun: ``STOCKVISION_PROFILE=cprofile|pyinstrument``
+profiles every rerun, or a session can tick "Profile each rerun" in the
+Performance panel. Profiles cover the script thread (not the I/O pool) and
+are saved under ``<cache dir>/profiles``.
+"""
+import datetime
+import io
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import pandas as pd
+
+from pages.utils.price_store import DEFAULT_CACHE_DIR
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PROFILE_DIR = os.path.join(DEFAULT_CACHE_DIR, "profiles")
+
+
+# --------------------------------------------------
+# Prometheus registry
+# --------------------------------------------------
+def _labels(labels, extra=()):
+    items = [*sorted(labels), *extra]
+    if not items:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in items
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class Registry:
+    """Thread-safe counters and histograms rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def inc(self, name, value=1, help="", **labels):
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            self._help.setdefault(name, ("counter", help))
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, help="", buckets=DEFAULT_BUCKETS, **labels):
+        key = (name, tuple(labels.items()))
+        with self._lock:
+            self._help.setdefault(name, ("histogram", help))
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [buckets, [0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[1][i] += 1
+            entry[2] += value
+            entry[3] += 1
+
+    def render(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: (b, list(c), s, n) for k, (b, c, s, n) in self._histograms.items()}
+            meta = dict(self._help)
+
+        lines = []
+        for name in sorted(meta):
+            kind, help_text = meta[name]
+            lines += [f"# HELP {name} {help_text or name}", f"# TYPE {name} {kind}"]
+            if kind == "counter":
+                for (n, labels), value in sorted(counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{_labels(labels)} {value}")
+                continue
+            for (n, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                for bound, cumulative in zip(buckets, counts):
+                    lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {total}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Atomic write, for node_exporter's textfile collector or a sidecar scraper."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as fh:
+            fh.write(self.render())
+        os.replace(tmp, path)
+
+
+REGISTRY = Registry()
+
+
+_exporter = None
+_exporter_error = None
+_exporter_lock = threading.Lock()
+
+
+def start_exporter(port, host="127.0.0.1"):
+    """Serve ``/metrics`` from a daemon thread (idempotent).
+
+    A port that cannot be bound (e.g. taken by another replica) is logged
+    once and not retried; returns None then.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = REGISTRY.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    global _exporter, _exporter_error
+    with _exporter_lock:
+        if _exporter is None and _exporter_error is None:
+            try:
+                _exporter = ThreadingHTTPServer((host, port), MetricsHandler)
+            except OSError as exc:
+                _exporter_error = exc
+                logging.getLogger(__name__).warning(
+                    "Metrics exporter not started on %s:%s: %s. Give each replica its own "
+                    "STOCKVISION_METRICS_PORT, or use STOCKVISION_METRICS_FILE.", host, port, exc,
+                )
+                return None
+            threading.Thread(target=_exporter.serve_forever, daemon=True,
+                             name="stockvision-metrics").start()
+        return _exporter
+
+
+def configure_from_env():
+    if os.environ.get("STOCKVISION_METRICS_PORT"):
+        start_exporter(int(os.environ["STOCKVISION_METRICS_PORT"]))
+
+
+def export():
+    path = os.environ.get("STOCKVISION_METRICS_FILE")
+    if path:
+        REGISTRY.write_textfile(path)
+
+
+# --------------------------------------------------
+# Stages
+# --------------------------------------------------
+def payload_bytes(obj):
+    """Approximate in-memory / wire size of a stage's result."""
+    if obj is None:
+        return 0
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True))
+    if isinstance(obj, (bytes, bytearray, str)):
+        return len(obj)
+    if isinstance(obj, (dict, list, tuple)):
+        return len(json.dumps(obj, default=str))
+    nbytes = getattr(obj, "nbytes", None)
+    return int(nbytes) if nbytes is not None else 0
+
+
+class StageRecord:
+    __slots__ = ("name", "start", "seconds", "cache", "bytes", "error")
+
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        self.seconds = None
+        self.cache = Counter()
+        self.bytes = None
+        self.error = None
+
+    def payload(self, obj):
+        """Add ``obj``'s size to this stage's payload bytes; returns ``obj``."""
+        self.bytes = (self.bytes or 0) + payload_bytes(obj)
+        return obj
+
+
+_local = threading.local()
+
+
+def _active():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def note_cache(kind, outcome, n=1):
+    """Report a cache lookup; counted globally and on every active stage of this thread."""
+    REGISTRY.inc("stockvision_cache_events_total", n, "Cache lookups by kind and outcome",
+                 kind=kind, outcome=outcome)
+    for record in _active():
+        record.cache[f"{kind}.{outcome}"] += n
+
+
+@contextmanager
+def stage(name, trace=None):
+    """Time a block (also usable as a decorator); yields its ``StageRecord``."""
+    record = StageRecord(name, time.perf_counter())
+    stack = _active()
+    stack.append(record)
+    try:
+        yield record
+    except Exception as exc:
+        record.error = type(exc).__name__
+        raise
+    finally:
+        record.seconds = time.perf_counter() - record.start
+        stack.remove(record)
+        REGISTRY.observe("stockvision_stage_seconds", record.seconds,
+                         "Wall time per instrumented stage", stage=name)
+        if record.bytes:
+            REGISTRY.inc("stockvision_stage_bytes_total", record.bytes,
+                         "Payload bytes produced per stage", stage=name)
+        if record.error:
+            REGISTRY.inc("stockvision_stage_errors_total", 1,
+                         "Stages that raised", stage=name, error=record.error)
+        if trace is not None:
+            trace.add(record)
+
+
+# --------------------------------------------------
+# Per-rerun trace
+# --------------------------------------------------
+_profile_lock = threading.Lock()
+_profiling = None  # (trace, thread) holding ``_profile_lock``
+
+
+def _finish_abandoned():
+    """Finish traces whose rerun ended without ``finish()`` (``st.stop()``, an exception).
+
+    That is the previous trace on this script thread, and the profiling trace
+    once its thread has exited, so its profiler and the lock are released.
+    """
+    previous = getattr(_local, "trace", None)
+    if previous is not None:
+        previous.finish(abandoned=True)
+    holder = _profiling
+    if holder is not None and not holder[1].is_alive():
+        try:
+            holder[0].finish(abandoned=True)
+        except Exception:  # noqa: BLE001 - a profiler stopped off its thread; the lock is free
+            pass
+
+
+class Trace:
+    """Stage records for one script rerun, plus an optional profile of it."""
+
+    def __init__(self, page, profile=False):
+        configure_from_env()
+        _finish_abandoned()
+        _local.trace = self
+        self.page = page
+        self.records = []
+        self.started = time.perf_counter()
+        self.seconds = None
+        self.profile_text = None
+        self.profile_path = None
+        self._lock = threading.Lock()
+
+        engine = os.environ.get("STOCKVISION_PROFILE") or ("cprofile" if profile else None)
+        self._profiler = self._start_profiler(engine) if engine else None
+
+    def stage(self, name):
+        return stage(name, self)
+
+    def wrap(self, name, fn):
+        """``fn`` run as a stage that records its result's size; for thread pools."""
+        def run(*args, **kwargs):
+            with self.stage(name) as record:
+                return record.payload(fn(*args, **kwargs))
+        return run
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def finish(self, abandoned=False):
+        """Stop timing and profiling; ``abandoned`` traces ended at an unknown time, so are not timed."""
+        with self._lock:
+            if self.seconds is not None:
+                return self
+            self.seconds = time.perf_counter() - self.started
+            if getattr(_local, "trace", None) is self:
+                _local.trace = None
+            if not abandoned:
+                REGISTRY.observe("stockvision_rerun_seconds", self.seconds,
+                                 "Wall time per page rerun", page=self.page)
+            if self._profiler is not None:
+                self._stop_profiler()
+        export()
+        return self
+
+    def table(self):
+        rows = [
+            {
+                "Stage": r.name,
+                "Start ms": (r.start - self.started) * 1000,
+                "Wall ms": r.seconds * 1000,
+                "Cache": ", ".join(f"{k} ×{v}" for k, v in sorted(r.cache.items())),
+                "Payload KB": r.bytes / 1024 if r.bytes else None,
+                "Error": r.error or "",
+            }
+            for r in sorted(self.records, key=lambda r: r.start)
+        ]
+        return pd.DataFrame(rows, columns=["Stage", "Start ms", "Wall ms", "Cache", "Payload KB", "Error"])
+
+    def _start_profiler(self, engine):
+        global _profiling
+        # One profiler per process at a time; other sessions just skip
+        if not _profile_lock.acquire(blocking=False):
+            self.profile_text = "Another rerun is being profiled; skipped."
+            return None
+        _profiling = (self, threading.current_thread())
+        if engine == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                engine = "cprofile"
+            else:
+                profiler = Profiler()
+                profiler.start()
+                return engine, profiler
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return "cprofile", profiler
+
+    def _stop_profiler(self):
+        global _profiling
+        engine, profiler = self._profiler
+        self._profiler = None
+        try:
+            stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            if engine == "pyinstrument":
+                profiler.stop()
+                self.profile_text = profiler.output_text(unicode=False, color=False)
+                self.profile_path = os.path.join(PROFILE_DIR, f"{self.page}-{stamp}.html")
+                with open(self.profile_path, "w") as fh:
+                    fh.write(profiler.output_html())
+            else:
+                import pstats
+
+                profiler.disable()
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+                self.profile_text = out.getvalue()
+                self.profile_path = os.path.join(PROFILE_DIR, f"{self.page}-{stamp}.prof")
+                profiler.dump_stats(self.profile_path)
+        finally:
+            _profiling = None
+            _profile_lock.release()
+
+
+def render_panel(trace):
+    """Collapsible "Performance" expander for a finished trace (``STOCKVISION_PERF_PANEL=0`` hides it)."""
+    import streamlit as st
+
+    # Finishing records and exports the rerun's metrics even with the panel hidden
+    trace.finish()
+    if os.environ.get("STOCKVISION_PERF_PANEL") == "0":
+        return
+    with st.expander("Performance"):
+        st.caption(f"Rerun took {trace.seconds * 1000:,.0f} ms across {len(trace.records)} stages")
+        if _exporter_error is not None:
+            st.caption(f"Metrics exporter not running: {_exporter_error}")
+        st.dataframe(trace.table().round(2), use_container_width=True, hide_index=True)
+        st.checkbox(
+            "Profile each rerun",
+            key=f"perf_profile_{trace.page}",
+            help="Captures a cProfile (or pyinstrument, via STOCKVISION_PROFILE) of the script thread.",
+        )
+        if trace.profile_text:
+            if trace.profile_path:
+                st.caption(f"Profile saved to {trace.profile_path}")
+            st.code(trace.profile_text[:20000], language=None)
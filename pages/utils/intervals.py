@@ -0,0 +1,240 @@
+"""Bar intervals, local resampling and a day-chunked intraday store.
+
+Intraday bars are stored one file per (ticker, interval, trading day) with
+float32 prices and int64 volumes, so loading a window only touches the days
+it spans. A coarse interval is derived by resampling any finer interval
+already on disk for that day before anything is downloaded, and decoded day
+chunks are kept in a byte-bounded LRU.
+"""
+import datetime
+import os
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+from pages.utils.price_store import (
+    DEFAULT_CACHE_DIR,
+    FRAME_SUFFIX,
+    OHLCV_COLUMNS,
+    as_date,
+    empty_frame,
+    read_frame,
+    write_frame,
+)
+from pages.utils.trading_calendar import calendar_for_ticker, get_calendar
+
+Interval = namedtuple("Interval", ["name", "rule", "intraday", "lookback_days", "request_days"])
+
+# lookback / request sizes follow Yahoo's limits for each bar size
+INTERVALS = {
+    spec.name: spec
+    for spec in (
+        Interval("1m", "1min", True, 29, 7),
+        Interval("5m", "5min", True, 59, 59),
+        Interval("15m", "15min", True, 59, 59),
+        Interval("1h", "1h", True, 729, 729),
+        Interval("1d", "1D", False, None, None),
+        Interval("1wk", "W-FRI", False, None, None),
+    )
+}
+
+# Finer intervals a coarser one can be rebuilt from, closest first
+DERIVABLE_FROM = {
+    "5m": ("1m",),
+    "15m": ("5m", "1m"),
+    "1h": ("15m", "5m", "1m"),
+}
+
+_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def compact_ohlcv(frame):
+    """float32 prices, int64 volume, datetime64 index."""
+    out = frame.reindex(columns=OHLCV_COLUMNS).astype({
+        "Open": "float32", "High": "float32", "Low": "float32", "Close": "float32",
+    })
+    out["Volume"] = out["Volume"].fillna(0).astype("int64")
+    return out
+
+
+def resample_ohlcv(frame, interval):
+    """Aggregate bars to ``interval``; intraday bins start at each session's first bar."""
+    spec = INTERVALS[interval]
+    if frame.empty:
+        return frame
+    if not spec.intraday:
+        return frame.resample(spec.rule).agg(_AGG).dropna(subset=["Close"])
+
+    days = []
+    for _, day in frame.groupby(frame.index.normalize()):
+        days.append(day.resample(spec.rule, origin="start").agg(_AGG).dropna(subset=["Close"]))
+    return pd.concat(days)
+
+
+# --------------------------------------------------
+# Forecast timestamps
+# --------------------------------------------------
+def session_bounds(index):
+    """(first, last) bar time of day seen in an intraday index."""
+    times = index.time
+    return min(times), max(times)
+
+
+def future_index(index, steps, interval, calendar=None):
+    """The next ``steps`` bar timestamps after ``index[-1]`` on ``calendar``'s sessions."""
+    calendar = calendar or get_calendar()
+    last = index[-1]
+    spec = INTERVALS[interval]
+    if interval == "1wk":
+        return pd.date_range(last + pd.Timedelta(days=1), periods=steps, freq="W-FRI")
+    if not spec.intraday:
+        return pd.DatetimeIndex(calendar.next_sessions(last, steps), name=index.name)
+
+    open_time, close_time = session_bounds(index)
+    step = pd.Timedelta(spec.rule)
+    per_day = int((pd.Timedelta(hours=close_time.hour, minutes=close_time.minute)
+                   - pd.Timedelta(hours=open_time.hour, minutes=open_time.minute)) / step) + 1
+    # The rest of the current session, then as many whole sessions as needed
+    days = [last.normalize()] + list(calendar.next_sessions(last, steps // per_day + 2))
+    out = []
+    current = last + step
+    for day in days:
+        session_open = day + pd.Timedelta(hours=open_time.hour, minutes=open_time.minute)
+        session_last = day + pd.Timedelta(hours=close_time.hour, minutes=close_time.minute)
+        current = max(current, session_open)
+        while current <= session_last and len(out) < steps:
+            out.append(current)
+            current += step
+        if len(out) == steps:
+            break
+    return pd.DatetimeIndex(out, name=index.name)
+
+
+# --------------------------------------------------
+# Intraday store
+# --------------------------------------------------
+class _ChunkCache:
+    """Byte-bounded LRU of decoded day chunks."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            frame = self._data.get(key)
+            if frame is not None:
+                self._data.move_to_end(key)
+            return frame
+
+    def put(self, key, frame):
+        size = int(frame.memory_usage(index=True).sum())
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= int(old.memory_usage(index=True).sum())
+            self._data[key] = frame
+            self.nbytes += size
+            while self.nbytes > self.max_bytes and len(self._data) > 1:
+                _, evicted = self._data.popitem(last=False)
+                self.nbytes -= int(evicted.memory_usage(index=True).sum())
+
+
+class IntradayStore:
+    """Per-day intraday chunks on disk, filled from finer chunks or the source."""
+
+    def __init__(self, source, cache_dir=None, max_memory_bytes=64 * 2**20):
+        self.source = source
+        self.cache_dir = cache_dir or os.path.join(DEFAULT_CACHE_DIR, "intraday")
+        self.memory = _ChunkCache(max_memory_bytes)
+
+    def get(self, ticker, interval, start, end=None):
+        """Bars for ``start <= day < end``; days beyond the provider lookback stay empty."""
+        today = datetime.date.today()
+        start = as_date(start)
+        end = as_date(end) or today + datetime.timedelta(days=1)
+        sessions = calendar_for_ticker(ticker).sessions_between(start, end - datetime.timedelta(days=1))
+        days = [d.date() for d in sessions]
+
+        frames, missing = {}, []
+        for day in days:
+            frame = self._load_day(ticker, interval, day) if day < today else None
+            if frame is None:
+                missing.append(day)
+            else:
+                frames[day] = frame
+
+        spec = INTERVALS[interval]
+        oldest = today - datetime.timedelta(days=spec.lookback_days)
+        missing = [d for d in missing if d >= oldest]
+        if missing:
+            frames.update(self._download(ticker, interval, missing))
+
+        parts = [frames[d] for d in days if d in frames and not frames[d].empty]
+        return pd.concat(parts) if parts else compact_ohlcv(empty_frame())
+
+    def _path(self, ticker, interval, day):
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+        return os.path.join(self.cache_dir, safe, interval, f"{day.isoformat()}.{FRAME_SUFFIX}")
+
+    def _read_chunk(self, ticker, interval, day):
+        key = (ticker, interval, day)
+        frame = self.memory.get(key)
+        if frame is None:
+            path = self._path(ticker, interval, day)
+            if not os.path.exists(path):
+                return None
+            frame = read_frame(path)
+            self.memory.put(key, frame)
+        return frame
+
+    def _load_day(self, ticker, interval, day):
+        frame = self._read_chunk(ticker, interval, day)
+        if frame is not None:
+            return frame
+        for finer in DERIVABLE_FROM.get(interval, ()):
+            source = self._read_chunk(ticker, finer, day)
+            if source is not None:
+                frame = compact_ohlcv(resample_ohlcv(source, interval))
+                self._save(ticker, interval, day, frame)
+                return frame
+        return None
+
+    def _save(self, ticker, interval, day, frame):
+        path = self._path(ticker, interval, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_frame(frame, path)
+        self.memory.put((ticker, interval, day), frame)
+
+    def _download(self, ticker, interval, days):
+        spec = INTERVALS[interval]
+        today = datetime.date.today()
+        out = {}
+        # One request per run of consecutive missing days, split to the provider's limit
+        lo = 0
+        while lo < len(days):
+            hi = lo
+            while (
+                hi + 1 < len(days)
+                and (days[hi + 1] - days[lo]).days < spec.request_days
+                and (days[hi + 1] - days[hi]).days <= 3
+            ):
+                hi += 1
+            first, last = days[lo], days[hi]
+            bars = compact_ohlcv(
+                self.source.intraday(ticker, interval, first, last + datetime.timedelta(days=1))
+            )
+            by_day = {d.date(): g for d, g in bars.groupby(bars.index.normalize())}
+            for day in days[lo:hi + 1]:
+                frame = by_day.get(day, bars.iloc[:0])
+                out[day] = frame
+                # Only finished sessions are final; today's bars keep moving. ``days``
+                # are all sessions, so no bars means a failed download: not persisted
+                if day < today and day in by_day:
+                    self._save(ticker, interval, day, frame)
+            lo = hi + 1
+        return out
@@ -0,0 +1,333 @@
+"""Live quotes: pluggable sources, a bar ring buffer and a background feed.
+
+    feed = LiveFeed(PollingSource(), "AAPL", indicators=["SMA 20", "VWAP"])
+    feed.start()
+    ...
+    rows, cursor = feed.since(cursor)   # only the bars added after ``cursor``
+
+A source has two methods: ``history(ticker)`` returns the bars to prime with,
+and ``poll(ticker, after)`` returns bars stamped after ``after`` (a
+``Timestamp`` or ``None``). ``PollingSource`` goes through the shared
+``MarketData`` intraday cache, so sessions watching the same ticker share one
+upstream request per TTL. ``ReplaySource`` streams a recorded CSV/Parquet
+file at a fixed bar rate, for testing without a market:
+
+    python -m pages.utils.live record AAPL --interval 1m --days 2 --out aapl.csv
+"""
+import argparse
+import datetime
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.indicators import INDICATORS, IndicatorSet
+from pages.utils.instrumentation import stage
+from pages.utils.price_store import OHLCV_COLUMNS, normalize_ohlcv
+
+
+# --------------------------------------------------
+# Sources
+# --------------------------------------------------
+class PollingSource:
+    """Intraday bars from the shared market-data provider, polled on demand."""
+
+    def __init__(self, market=None, interval="1m", history_days=4):
+        if market is None:
+            from pages.utils.market_data import get_market_data
+
+            market = get_market_data()
+        self.market = market
+        self.interval = interval
+        self.history_days = history_days
+
+    def history(self, ticker):
+        start = datetime.date.today() - datetime.timedelta(days=self.history_days)
+        return self.market.bars(ticker, self.interval, start)
+
+    def poll(self, ticker, after):
+        bars = self.history(ticker)
+        if after is None:
+            return bars
+        # The provider hands back the whole window; keep only what is new
+        return bars.iloc[bars.index.searchsorted(after, side="right"):]
+
+
+def load_recording(path):
+    """A recorded OHLCV file (CSV with a Date column, Parquet or pickle)."""
+    if path.endswith(".parquet"):
+        frame = pd.read_parquet(path)
+    elif path.endswith(".pkl"):
+        frame = pd.read_pickle(path)
+    else:
+        frame = pd.read_csv(path, index_col=0, parse_dates=True)
+    return normalize_ohlcv(frame)
+
+
+class ReplaySource:
+    """Stream a recording: ``warmup`` bars up front, then ``bars_per_second``."""
+
+    def __init__(self, path, bars_per_second=1.0, warmup=120, loop=False, clock=time.monotonic):
+        self.path = path
+        self.frame = load_recording(path)
+        self.bars_per_second = bars_per_second
+        self.warmup = min(warmup, len(self.frame))
+        self.loop = loop
+        self.clock = clock
+        self.started = None
+        self._shift = pd.Timedelta(0)
+        self._served = self.warmup
+
+    def history(self, ticker):
+        self.started = self.clock()
+        return self.frame.iloc[:self.warmup]
+
+    def _released(self):
+        if self.started is None:
+            self.started = self.clock()
+        return self.warmup + int((self.clock() - self.started) * self.bars_per_second)
+
+    def poll(self, ticker, after):
+        released = self._released()
+        frame, out = self.frame, []
+        while self._served < released:
+            if self._served >= len(frame):
+                if not self.loop or len(frame) < 2:
+                    break
+                # Wrap around, shifted so timestamps keep increasing
+                self._shift += frame.index[-1] - frame.index[0] + (frame.index[1] - frame.index[0])
+                self.started += len(frame) / self.bars_per_second
+                released -= len(frame)
+                self._served = 0
+                continue
+            upto = min(released, len(frame))
+            chunk = frame.iloc[self._served:upto]
+            out.append(chunk.set_axis(chunk.index + self._shift))
+            self._served = upto
+        if not out:
+            return frame.iloc[:0]
+        bars = pd.concat(out)
+        return bars if after is None else bars[bars.index > after]
+
+    @property
+    def finished(self):
+        return not self.loop and self._served >= len(self.frame)
+
+
+# --------------------------------------------------
+# Ring buffer
+# --------------------------------------------------
+class BarBuffer:
+    """Last ``capacity`` bars as preallocated numpy arrays (ns timestamps + float columns)."""
+
+    def __init__(self, columns, capacity=2000):
+        self.columns = list(columns)
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype="int64")
+        self.values = np.full((capacity, len(self.columns)), np.nan)
+        self.total = 0  # bars ever appended; doubles as a cursor for readers
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, times, values):
+        """Append rows in time order, overwriting the oldest when full."""
+        n = len(times)
+        if n > self.capacity:
+            times, values = times[-self.capacity:], values[-self.capacity:]
+            self.total += n - self.capacity
+            n = self.capacity
+        slots = (self.total + np.arange(n)) % self.capacity
+        self.times[slots] = times
+        self.values[slots] = values
+        self.total += n
+
+    def _order(self, count):
+        return (self.total - count + np.arange(count)) % self.capacity
+
+    def tail(self, count=None):
+        """The newest ``count`` bars (all buffered bars by default) as a frame."""
+        count = len(self) if count is None else min(count, len(self))
+        slots = self._order(count)
+        index = pd.DatetimeIndex(self.times[slots].astype("datetime64[ns]"), name="Date")
+        return pd.DataFrame(self.values[slots], index=index, columns=self.columns)
+
+    def last(self):
+        if not self.total:
+            return None
+        return dict(zip(self.columns, self.values[(self.total - 1) % self.capacity]))
+
+
+# --------------------------------------------------
+# Feed
+# --------------------------------------------------
+class LiveFeed:
+    """Polls a source on a daemon thread; appends only new bars and updates indicators."""
+
+    def __init__(
+        self, source, ticker, indicators=(), capacity=2000, poll_seconds=5.0, idle_seconds=300,
+    ):
+        self.source = source
+        self.ticker = ticker
+        self.indicator_names = list(indicators)
+        self.indicators = IndicatorSet(self.indicator_names)
+        self.indicator_columns = [c for name in self.indicator_names for c in INDICATORS[name].columns]
+        self.buffer = BarBuffer(OHLCV_COLUMNS + self.indicator_columns, capacity)
+        self.poll_seconds = poll_seconds
+        # A browser tab that went away stops reading; stop polling for it too
+        self.idle_seconds = idle_seconds
+        self.read_at = time.monotonic()
+        self.last_time = None
+        self.session_open = None
+        self.session_high = self.session_low = None
+        self.updated = None
+        self.error = None
+        self.polls = 0
+        self.paused = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -- lifecycle --
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, daemon=True, name=f"live-{self.ticker}",
+            )
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        try:
+            if self.last_time is None:
+                self.prime()
+        except Exception as exc:
+            self.error = f"{type(exc).__name__}: {exc}"
+        while not self._stop.wait(self.poll_seconds):
+            if time.monotonic() - self.read_at > self.idle_seconds:
+                break
+            if not self.paused:
+                self.poll_once()
+
+    # -- ingestion --
+    def prime(self):
+        with stage("live.prime") as record:
+            bars = record.payload(self.source.history(self.ticker))
+            if not len(bars):
+                return
+            frame = self._with_indicators(bars)
+            with self._lock:
+                self.indicators.prime(bars)
+                self._store(frame)
+
+    def poll_once(self):
+        """Fetch from the source and append what is new; returns the number of bars added."""
+        try:
+            with stage("live.poll") as record:
+                bars = record.payload(self.source.poll(self.ticker, self.last_time))
+        except Exception as exc:
+            # Keep the feed alive through transient provider errors
+            self.error = f"{type(exc).__name__}: {exc}"
+            return 0
+        self.error = None
+        self.polls += 1
+        if self.last_time is not None:
+            bars = bars.iloc[bars.index.searchsorted(self.last_time, side="right"):]
+        if not len(bars):
+            return 0
+
+        with self._lock:
+            rows = []
+            for when, bar in zip(bars.index, bars[OHLCV_COLUMNS].to_dict("records")):
+                latest = self.indicators.update(bar)
+                rows.append([bar[c] for c in OHLCV_COLUMNS] + [latest[c] for c in self.indicator_columns])
+            frame = pd.DataFrame(rows, index=bars.index, columns=self.buffer.columns)
+            self._store(frame)
+        return len(bars)
+
+    def _with_indicators(self, bars):
+        # Priming keeps the history's indicator values so the chart starts complete
+        if not self.indicator_names:
+            return bars[OHLCV_COLUMNS]
+        from pages.utils.indicators import compute
+
+        return pd.concat([bars[OHLCV_COLUMNS], compute(bars, self.indicator_names)], axis=1)
+
+    def _store(self, frame):
+        self.buffer.append(frame.index.as_unit("ns").asi8, frame.to_numpy(dtype="float64"))
+        last_day = frame.index[-1].normalize()
+        if self.last_time is None or self.last_time.normalize() != last_day:
+            self.session_open = None
+        today = frame[frame.index >= last_day]
+        if self.session_open is None:
+            self.session_open = float(today["Open"].iloc[0])
+            self.session_high, self.session_low = -np.inf, np.inf
+        self.session_high = max(self.session_high, float(today["High"].max()))
+        self.session_low = min(self.session_low, float(today["Low"].min()))
+        self.last_time = frame.index[-1]
+        self.updated = time.time()
+
+    # -- readers --
+    def since(self, cursor):
+        """``(new bars, cursor)``: bars appended after ``cursor`` (``None`` -> everything)."""
+        self.read_at = time.monotonic()
+        with self._lock:
+            total = self.buffer.total
+            count = len(self.buffer) if cursor is None else min(total - cursor, len(self.buffer))
+            return self.buffer.tail(count), total
+
+    def snapshot(self):
+        with self._lock:
+            return self.buffer.tail()
+
+    def kpis(self):
+        with self._lock:
+            last = self.buffer.last()
+            if last is None:
+                return None
+            return {
+                **last,
+                "Time": self.last_time,
+                "Session Change %": (last["Close"] / self.session_open - 1) * 100,
+                "Session High": self.session_high,
+                "Session Low": self.session_low,
+                "Bars": self.buffer.total,
+                "Updated": self.updated,
+            }
+
+
+# --------------------------------------------------
+# CLI: record a replay file
+# --------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pages.utils.live", description="Live-mode helpers.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    record = sub.add_parser("record", help="Save recent intraday bars for ReplaySource")
+    record.add_argument("ticker")
+    record.add_argument("--interval", default="1m")
+    record.add_argument("--days", type=int, default=2, help="Calendar days back from today")
+    record.add_argument("--out", required=True, help=".csv or .parquet")
+    args = parser.parse_args(argv)
+
+    source = PollingSource(interval=args.interval, history_days=args.days)
+    bars = source.history(args.ticker.upper())
+    if args.out.endswith(".parquet"):
+        bars.to_parquet(args.out)
+    else:
+        bars.to_csv(args.out)
+    print(f"Wrote {len(bars)} bars to {os.path.abspath(args.out)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
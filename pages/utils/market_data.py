@@ -0,0 +1,481 @@
+"""Market-data provider layer shared by every page.
+
+All price, fundamentals and news requests go through ``MarketData``: one
+normalized OHLCV schema (see ``pages.utils.price_store``), one TTL cache and
+request coalescing, so concurrent sessions asking for the same thing share a
+single in-flight fetch. Daily bars are cached as ``CompactFrame``s and the
+cache is held to a byte budget (``STOCKVISION_CACHE_MB``), evicting least
+recently used entries first. With ``STOCKVISION_SHARED_CACHE`` set, misses
+go through the cross-process ``pages.utils.shared_cache`` before the backend,
+so app replicas share one another's fetches. The backend is pluggable; ``FakeBackend`` serves
+deterministic data without network (``STOCKVISION_DATA_BACKEND=fake``).
+"""
+import datetime
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from pages.utils.compact import CompactFrame
+from pages.utils.instrumentation import note_cache, payload_bytes
+from pages.utils.intervals import IntradayStore, resample_ohlcv
+from pages.utils.shared_cache import get_shared_cache
+from pages.utils.price_store import (
+    DEFAULT_CACHE_DIR,
+    OHLCV_COLUMNS,
+    PriceStore,
+    ProviderError,
+    as_date,
+    empty_frame,
+    normalize_ohlcv,
+)
+from pages.utils.trading_calendar import calendar_for_ticker
+
+__all__ = [
+    "OHLCV_COLUMNS",
+    "FakeBackend",
+    "MarketData",
+    "ProviderError",
+    "TTLCache",
+    "YFinanceBackend",
+    "empty_frame",
+    "get_market_data",
+    "normalize_ohlcv",
+]
+
+DEFAULT_TTLS = {
+    "history": 300,       # 5 minutes
+    "intraday": 60,       # the current session's bars move every minute
+    "info": 6 * 3600,     # fundamentals barely move intraday
+    "news": 600,          # 10 minutes
+}
+
+# Process-wide budget for cached bars, info and news
+DEFAULT_CACHE_BYTES = int(float(os.environ.get("STOCKVISION_CACHE_MB", 256)) * 2**20)
+
+
+# --------------------------------------------------
+# Backends
+# --------------------------------------------------
+def _normalize_news(items):
+    """Flatten both the legacy and the ``content``-wrapped yfinance news layouts."""
+    news = []
+    for item in items or []:
+        content = item.get("content")
+        if content:
+            published = content.get("pubDate")
+            news.append({
+                "title": content.get("title"),
+                "publisher": (content.get("provider") or {}).get("displayName"),
+                "link": ((content.get("canonicalUrl") or {}).get("url")
+                         or (content.get("clickThroughUrl") or {}).get("url")),
+                "providerPublishTime": (
+                    int(pd.Timestamp(published).timestamp()) if published else None
+                ),
+            })
+        else:
+            news.append({
+                "title": item.get("title"),
+                "publisher": item.get("publisher"),
+                "link": item.get("link"),
+                "providerPublishTime": item.get("providerPublishTime"),
+            })
+    return news
+
+
+def _yahoo_history(ticker, **kwargs):
+    """One symbol's bars; a failed request raises ``ProviderError``.
+
+    yfinance logs failed requests and returns an empty frame, which looks
+    like "no bars in this range". An empty frame is only taken as an answer
+    when Yahoo returned a chart for the symbol (nothing traded in the range)
+    or said why there is none (delisted); a missing timezone, an HTTP error
+    or no response at all is a provider failure.
+    """
+    import yfinance as yf
+
+    symbol = yf.Ticker(ticker)
+    try:
+        data = symbol.history(auto_adjust=True, actions=False, **kwargs)
+    except Exception as exc:  # rate limits are always raised
+        raise ProviderError(f"{ticker}: {exc}") from exc
+    if data is not None and not data.empty:
+        return normalize_ohlcv(data, ticker)
+
+    # The soft error yfinance recorded (``yf.download`` reads the same field)
+    history = symbol._price_history
+    error = history._last_error if history is not None else None
+    answered = "symbol" in ((history._history_metadata or {}) if history is not None else {})
+    if error is None or answered:
+        return empty_frame()
+    if "delisted" in error.lower() and not error.startswith("possibly delisted"):
+        return empty_frame()  # Yahoo's own reason, not yfinance's guess
+    raise ProviderError(f"{ticker}: {error}")
+
+
+class YFinanceBackend:
+    """Yahoo Finance via yfinance."""
+
+    def history(self, ticker, start, end):
+        return _yahoo_history(ticker, start=start, end=end)
+
+    def history_many(self, tickers, start, end):
+        import yfinance as yf
+
+        data = yf.download(
+            list(tickers), start=start, end=end, progress=False,
+            group_by="column", threads=True,
+        )
+        frames = {ticker: normalize_ohlcv(data, ticker) for ticker in tickers}
+        # The batch hides per-symbol failures: ask again for the empty ones.
+        # One that still fails comes back empty (so it is not marked covered)
+        # rather than failing the whole list.
+        for ticker, frame in frames.items():
+            if frame.empty:
+                try:
+                    frames[ticker] = self.history(ticker, start, end)
+                except ProviderError:
+                    pass
+        return frames
+
+    def intraday(self, ticker, interval, start, end):
+        return _yahoo_history(ticker, start=start, end=end, interval=interval)
+
+    def info(self, ticker):
+        import yfinance as yf
+
+        try:
+            return yf.Ticker(ticker).info or {}
+        except Exception as exc:
+            raise ProviderError(f"{ticker}: {exc}") from exc
+
+    def news(self, ticker):
+        import yfinance as yf
+
+        try:
+            return _normalize_news(yf.Ticker(ticker).news)
+        except Exception as exc:
+            raise ProviderError(f"{ticker}: {exc}") from exc
+
+
+class FakeBackend:
+    """Deterministic in-memory data for offline runs; records every call."""
+
+    def __init__(self, seed=0, latency=0.0):
+        self.seed = seed
+        self.latency = latency
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, *call):
+        with self._lock:
+            self.calls.append(call)
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _rng(self, ticker):
+        return np.random.default_rng([self.seed, *ticker.encode()])
+
+    def history(self, ticker, start, end):
+        self._record("history", ticker, start, end)
+        return self._bars(ticker, start, end)
+
+    def history_many(self, tickers, start, end):
+        self._record("history_many", tuple(tickers), start, end)
+        return {ticker: self._bars(ticker, start, end) for ticker in tickers}
+
+    def _bars(self, ticker, start, end):
+        # Generate from a fixed origin so overlapping requests agree
+        origin = datetime.date(2000, 1, 3)
+        days = calendar_for_ticker(ticker).sessions_between(origin, end - datetime.timedelta(days=1))
+        days = days.rename("Date")
+        rng = self._rng(ticker)
+        returns = rng.normal(0.0003, 0.015, len(days))
+        close = 100 * np.exp(np.cumsum(returns))
+        spread = np.abs(rng.normal(0, 0.01, len(days))) * close
+        frame = pd.DataFrame(
+            {
+                "Open": close * (1 + rng.normal(0, 0.003, len(days))),
+                "High": close + spread,
+                "Low": close - spread,
+                "Close": close,
+                "Volume": rng.integers(1_000_000, 5_000_000, len(days)).astype("float64"),
+            },
+            index=days,
+        )
+        return frame.loc[pd.Timestamp(start):]
+
+    def intraday(self, ticker, interval, start, end):
+        self._record("intraday", ticker, interval, start, end)
+        days = calendar_for_ticker(ticker).sessions_between(start, end - datetime.timedelta(days=1))
+        if not len(days):
+            return empty_frame()
+        # A 09:30-16:00 session of 1-minute bars, seeded per (ticker, day)
+        minutes = pd.timedelta_range("9h30min", "15h59min", freq="1min")
+        index = pd.DatetimeIndex(np.concatenate([day + minutes for day in days]), name="Date")
+        frames = []
+        for day in days:
+            rng = np.random.default_rng([self.seed, *ticker.encode(), day.toordinal()])
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0008, len(minutes))))
+            spread = np.abs(rng.normal(0, 0.0005, len(minutes))) * close
+            frames.append(np.column_stack([
+                np.roll(close, 1), close + spread, close - spread, close,
+                rng.integers(1_000, 50_000, len(minutes)),
+            ]))
+        frame = pd.DataFrame(np.vstack(frames), index=index, columns=OHLCV_COLUMNS)
+        return frame if interval == "1m" else resample_ohlcv(frame, interval)
+
+    def info(self, ticker):
+        self._record("info", ticker)
+        rng = self._rng(ticker)
+        return {
+            "longName": f"{ticker} Holdings Inc.",
+            "sector": "Technology",
+            "industry": "Software",
+            "website": f"https://www.{ticker.lower()}.example",
+            "fullTimeEmployees": int(rng.integers(1_000, 200_000)),
+            "marketCap": float(rng.uniform(1e9, 2e12)),
+            "trailingPE": float(rng.uniform(5, 60)),
+        }
+
+    def news(self, ticker):
+        self._record("news", ticker)
+        now = int(time.time())
+        return [
+            {
+                "title": f"{ticker} headline #{i + 1}",
+                "publisher": "Offline Wire",
+                "link": "#",
+                "providerPublishTime": now - i * 3600,
+            }
+            for i in range(6)
+        ]
+
+
+# --------------------------------------------------
+# Cache
+# --------------------------------------------------
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries expire after a per-entry TTL.
+
+    With ``max_bytes`` the least recently used entries are also evicted until
+    the entries' sizes (``payload_bytes``) fit the budget.
+    """
+
+    def __init__(self, max_entries=512, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value, size = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                self.nbytes -= size
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        size = payload_bytes(value) if self.max_bytes is not None else 0
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            if self.max_bytes is not None and size > self.max_bytes:
+                return  # would evict everything else and still not fit
+            self._data[key] = (time.monotonic() + ttl, value, size)
+            self.nbytes += size
+            while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self.nbytes > self.max_bytes
+            ):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+# --------------------------------------------------
+# Provider
+# --------------------------------------------------
+class MarketData:
+    """Cached, coalescing front door to a market-data backend."""
+
+    def __init__(
+        self, backend=None, store=None, intraday_store=None, ttls=None,
+        max_entries=512, max_workers=16, max_bytes=DEFAULT_CACHE_BYTES, shared=None,
+    ):
+        self.backend = backend or YFinanceBackend()
+        self.store = store or PriceStore(self.backend)
+        self.intraday_store = intraday_store or IntradayStore(self.backend)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.cache = TTLCache(max_entries, max_bytes)
+        self.shared = shared
+        self.stats = Counter()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="market-data")
+
+    def submit(self, fn, *args, **kwargs):
+        """Run a fetch on the provider's I/O pool; returns a ``Future``."""
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def history(self, ticker, start, end=None):
+        """Daily OHLCV bars for ``start <= Date < end`` with a ``Date`` index."""
+        start, end = as_date(start), as_date(end)
+        compact = self._fetch(
+            "history", (ticker, start, end),
+            lambda: CompactFrame.from_frame(self.store.get(ticker, start, end)),
+        )
+        # Views of the cached arrays; callers adding columns never touch them
+        return compact.to_frame()
+
+    def bars(self, ticker, interval, start, end=None):
+        """OHLCV bars at any supported interval; non-daily intervals are derived locally."""
+        if interval == "1d":
+            return self.history(ticker, start, end)
+        if interval == "1wk":
+            return resample_ohlcv(self.history(ticker, start, end), "1wk")
+
+        start, end = as_date(start), as_date(end)
+        frame = self._fetch(
+            "intraday", (ticker, interval, start, end),
+            lambda: self.intraday_store.get(ticker, interval, start, end),
+        )
+        # Copy-on-write: callers adding columns never touch the cached frame
+        return frame.copy(deep=False)
+
+    def history_many(self, tickers, start, end=None):
+        """``{ticker: frame}`` for a watchlist; cache misses share one batched fetch."""
+        start, end = as_date(start), as_date(end)
+        result, missing = {}, []
+        for ticker in dict.fromkeys(tickers):
+            compact = self.cache.get(("history", ticker, start, end))
+            if compact is _MISSING:
+                missing.append(ticker)
+            else:
+                self.stats["history.hit"] += 1
+                note_cache("history", "hit")
+                result[ticker] = compact
+
+        if missing:
+            self.stats["history.miss"] += len(missing)
+            note_cache("history", "miss", len(missing))
+            if self.shared is not None:
+                # Another replica may have these; only the rest are downloaded
+                for ticker in list(missing):
+                    key = ("history", ticker, start, end)
+                    compact = self.shared.peek("history", self._shared_key(key))
+                    if compact is not None:
+                        result[ticker] = compact
+                        self.cache.set(key, compact, self.ttls["history"])
+                        missing.remove(ticker)
+            fetched = self.store.get_many(missing, start, end) if missing else {}
+            for ticker, frame in fetched.items():
+                key = ("history", ticker, start, end)
+                result[ticker] = CompactFrame.from_frame(frame)
+                if frame.empty:
+                    continue  # possibly a failed symbol: ask again next time
+                self.cache.set(key, result[ticker], self.ttls["history"])
+                if self.shared is not None:
+                    self.shared.put("history", self._shared_key(key), result[ticker], self.ttls["history"])
+
+        return {ticker: result[ticker].to_frame() for ticker in tickers}
+
+    def info(self, ticker):
+        return dict(self._fetch("info", (ticker,), lambda: self.backend.info(ticker)))
+
+    def news(self, ticker):
+        return list(self._fetch("news", (ticker,), lambda: self.backend.news(ticker)))
+
+    def _fetch(self, kind, key, loader):
+        key = (kind, *key)
+        value = self.cache.get(key)
+        if value is not _MISSING:
+            self.stats[f"{kind}.hit"] += 1
+            note_cache(kind, "hit")
+            return value
+
+        with self._inflight_lock:
+            value = self.cache.get(key)
+            if value is not _MISSING:
+                self.stats[f"{kind}.hit"] += 1
+                note_cache(kind, "hit")
+                return value
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            # Someone else is already fetching this exact key; share their result
+            self.stats[f"{kind}.coalesced"] += 1
+            note_cache(kind, "coalesced")
+            return future.result()
+
+        self.stats[f"{kind}.miss"] += 1
+        note_cache(kind, "miss")
+        try:
+            value = self._load(kind, key, loader)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            self.cache.set(key, value, self.ttls[kind])
+            future.set_result(value)
+            return value
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+
+    def _shared_key(self, key):
+        # Synthetic and real bars must never meet in a shared directory
+        return (type(self.backend).__name__, *key)
+
+    def _load(self, kind, key, loader):
+        """``loader()``, through the cross-process cache when one is configured."""
+        if self.shared is None:
+            return loader()
+        return self.shared.get(kind, self._shared_key(key), loader, ttl=self.ttls[kind])
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_market_data():
+    """Process-wide provider shared by every page and session."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            if os.environ.get("STOCKVISION_DATA_BACKEND") == "fake":
+                backend = FakeBackend()
+                # Keep synthetic bars out of the real price store
+                store = PriceStore(backend, os.path.join(DEFAULT_CACHE_DIR, "fake", "prices"))
+                intraday = IntradayStore(backend, os.path.join(DEFAULT_CACHE_DIR, "fake", "intraday"))
+                _default = MarketData(backend, store, intraday, shared=get_shared_cache())
+            else:
+                _default = MarketData(shared=get_shared_cache())
+        return _default
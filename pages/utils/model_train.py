@@ -0,0 +1,211 @@
+"""ARIMA training with a fitted-model cache and incremental updates.
+
+Fits are cached by (ticker, order, training window). When a request only
+adds a few bars to a cached window, the cached parameters are reused by
+appending the new observations; larger extensions are re-estimated starting
+from the cached parameters instead of from scratch.
+"""
+import threading
+import time
+import warnings
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from pages.utils.instrumentation import note_cache
+
+DEFAULT_ORDER = (5, 1, 0)
+
+# Longest horizon the pages offer; forecasts up to it are computed once per fit
+MAX_HORIZON = 90
+
+
+def init_fit_worker():
+    """Process-pool initializer: pay the statsmodels import once, mute fit warnings."""
+    import statsmodels.tsa.arima.model  # noqa: F401
+
+    warnings.simplefilter("ignore")
+
+
+def fit_arima(values, order=DEFAULT_ORDER, start_params=None):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    model = ARIMA(np.asarray(values, dtype="float64"), order=order)
+    return model.fit(start_params=start_params)
+
+
+class FittedModel:
+    """A fitted ARIMA result plus the bookkeeping needed to extend it.
+
+    Exposes the same ``forecast`` / ``forecast_interval`` as the backends in
+    ``pages.utils.forecasters``.
+    """
+
+    name = "arima"
+    label = "ARIMA"
+    peak_bytes = None
+
+    def __init__(self, key, result, values, appended=0, fit_seconds=0.0):
+        self.key = key
+        self.result = result
+        self.n_obs = len(values)
+        self.last_value = float(values[-1])
+        self.appended = appended
+        self.fit_seconds = fit_seconds
+        self._mean = None
+        self._std = None
+        self._table_lock = threading.Lock()
+
+    @property
+    def params(self):
+        return self.result.params
+
+    def forecast(self, steps):
+        mean, _ = self._forecast_table(steps)
+        return mean[:steps]
+
+    def forecast_interval(self, steps, level=0.95):
+        """(lower, upper) bounds of the ``level`` prediction interval for each step."""
+        from scipy.stats import norm
+
+        mean, std = self._forecast_table(steps)
+        z = norm.ppf(0.5 + level / 2)
+        return mean[:steps] - z * std[:steps], mean[:steps] + z * std[:steps]
+
+    def _forecast_table(self, steps):
+        # Mean and standard error for the whole MAX_HORIZON, computed once
+        with self._table_lock:
+            if self._mean is None or steps > len(self._mean):
+                prediction = self.result.get_forecast(steps=max(steps, MAX_HORIZON))
+                self._mean = np.asarray(prediction.predicted_mean)
+                self._std = np.sqrt(np.asarray(prediction.var_pred_mean))
+            return self._mean, self._std
+
+    # The lock is per instance: drop it when copying or pickling (ensemble
+    # members are deep-copied by caches and returned from worker processes)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_table_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._table_lock = threading.Lock()
+
+    def extends(self, values):
+        """True if ``values`` is this model's training series plus new bars."""
+        return (
+            len(values) > self.n_obs
+            and np.isclose(values[self.n_obs - 1], self.last_value)
+        )
+
+
+class ModelCache:
+    """LRU cache of fitted ARIMA models keyed by (ticker, order, window, series length and last value)."""
+
+    def __init__(self, max_entries=32, append_limit=5):
+        self.max_entries = max_entries
+        # Bars that may be appended with frozen parameters before a re-fit
+        self.append_limit = append_limit
+        self.stats = Counter()
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._fit_locks = {}
+
+    def get(self, ticker, values, order=DEFAULT_ORDER, window_start=None, window_end=None):
+        """Fitted model for ``values``; reuses, extends or warm-starts a cached fit."""
+        values = np.asarray(values, dtype="float64")
+        order = tuple(order)
+        # The series' length and last value too: today's bar moves and the store
+        # back-fills, both without changing the window (same identity as the shared cache)
+        key = (ticker, order, window_start, window_end, len(values), float(values[-1]))
+
+        with self._fit_lock(ticker, order):
+            with self._lock:
+                cached = self._models.get(key)
+                if cached is not None:
+                    self._models.move_to_end(key)
+                    self.stats["hit"] += 1
+                    note_cache("model", "hit")
+                    return cached
+                base = self._latest_prefix(ticker, order, window_start, values)
+                # A revised series (moved last bar) still warm-starts from its old fit
+                seed = base or self._latest_fit(ticker, order, window_start)
+
+            import statsmodels.tsa.arima.model  # noqa: F401  (a cold import is not fit time)
+
+            started = time.perf_counter()
+            if base is None and seed is not None:
+                result, appended = fit_arima(values, order, start_params=seed.params), 0
+                self.stats["warm_fit"] += 1
+                note_cache("model", "warm_fit")
+            elif base is None:
+                result, appended = fit_arima(values, order), 0
+                self.stats["cold_fit"] += 1
+                note_cache("model", "cold_fit")
+            else:
+                new_bars = len(values) - base.n_obs
+                if base.appended + new_bars <= self.append_limit:
+                    result = base.result.append(values[base.n_obs:], refit=False)
+                    appended = base.appended + new_bars
+                    self.stats["append"] += 1
+                    note_cache("model", "append")
+                else:
+                    result, appended = fit_arima(values, order, start_params=base.params), 0
+                    self.stats["warm_fit"] += 1
+                    note_cache("model", "warm_fit")
+
+            fitted = FittedModel(key, result, values, appended, time.perf_counter() - started)
+            if not appended:
+                # Full fits refine the cost estimate behind model="auto"
+                from pages.utils.forecasters import observe_cost
+
+                observe_cost("arima", len(values), fitted.fit_seconds)
+            self._put(key, fitted)
+            return fitted
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def __len__(self):
+        return len(self._models)
+
+    def _fit_lock(self, ticker, order):
+        # One fit at a time per (ticker, order): concurrent reruns wait and hit
+        with self._lock:
+            return self._fit_locks.setdefault((ticker, order), threading.Lock())
+
+    def _latest_prefix(self, ticker, order, window_start, values):
+        candidates = [
+            m for (t, o, start, *_), m in self._models.items()
+            if (t, o, start) == (ticker, order, window_start) and m.extends(values)
+        ]
+        return max(candidates, key=lambda m: m.n_obs, default=None)
+
+    def _latest_fit(self, ticker, order, window_start):
+        candidates = [
+            m for (t, o, start, *_), m in self._models.items()
+            if (t, o, start) == (ticker, order, window_start)
+        ]
+        return max(candidates, key=lambda m: m.n_obs, default=None)
+
+    def _put(self, key, fitted):
+        with self._lock:
+            self._models[key] = fitted
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_model_cache():
+    """Process-wide model cache shared by every session."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ModelCache()
+        return _default_cache
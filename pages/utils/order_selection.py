@@ -0,0 +1,239 @@
+"""Automatic ARIMA (p, d, q) selection.
+
+The differencing order is picked once with an ADF stationarity test, so the
+grid only spans (p, q). Candidates are fitted cheapest-first across a
+reused process pool under a wall-clock budget (fits still running at the
+deadline are killed), and the winning order is memoized
+per ticker on disk so later runs skip the search entirely.
+"""
+import datetime
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import warnings
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from pages.utils.model_train import fit_arima, init_fit_worker
+from pages.utils.price_store import DEFAULT_CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+DEFAULT_P = tuple(range(0, 6))
+DEFAULT_D = (0, 1, 2)
+DEFAULT_Q = tuple(range(0, 3))
+
+
+@dataclass
+class SearchResult:
+    order: tuple
+    criterion: str
+    score: float
+    scores: dict = field(default_factory=dict)     # order -> criterion value
+    timings: dict = field(default_factory=dict)    # order -> fit seconds
+    skipped: dict = field(default_factory=dict)    # order -> reason
+    d_seconds: float = 0.0
+    elapsed: float = 0.0
+    memoized: bool = False
+
+
+def choose_d(values, d_values=DEFAULT_D, alpha=0.05):
+    """Smallest d in ``d_values`` whose differenced series passes the ADF test."""
+    from statsmodels.tsa.stattools import adfuller
+
+    series = np.asarray(values, dtype="float64")
+    for d in sorted(d_values):
+        diffed = np.diff(series, n=d) if d else series
+        if len(diffed) < 20:
+            break
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            p_value = adfuller(diffed, autolag="AIC")[1]
+        if p_value < alpha:
+            return d
+    return max(d_values)
+
+
+def _score(values, order, criterion):
+    started = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        result = fit_arima(values, order)
+    score = float(getattr(result, criterion))
+    return score if np.isfinite(score) else float("inf"), time.perf_counter() - started
+
+
+# One pool of fit workers is kept for searches that use every CPU; a search
+# that finds it busy gets a private pool. Fits still running at the deadline
+# are killed with their pool, so the budget holds for the machine, not just
+# for the caller.
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def _acquire_pool(workers):
+    """``(pool, shared)``: the shared pool when it fits and is free, else a new one."""
+    global _shared_pool
+    if workers == (os.cpu_count() or 1) and _shared_pool_lock.acquire(blocking=False):
+        if _shared_pool is None:
+            _shared_pool = multiprocessing.Pool(workers, initializer=init_fit_worker)
+        return _shared_pool, True
+    return multiprocessing.Pool(workers, initializer=init_fit_worker), False
+
+
+def _release_pool(pool, shared, overran):
+    global _shared_pool
+    try:
+        if overran or not shared:
+            # Kills fits that overran the budget; queued ones never start
+            pool.terminate()
+            pool.join()
+            if shared:
+                _shared_pool = None
+    finally:
+        if shared:
+            _shared_pool_lock.release()
+
+
+def select_order(
+    values,
+    p_values=DEFAULT_P,
+    d_values=DEFAULT_D,
+    q_values=DEFAULT_Q,
+    criterion="aic",
+    max_workers=None,
+    budget_seconds=20.0,
+):
+    """Grid-search (p, q) at a single ADF-chosen d; best ``criterion`` wins."""
+    if criterion not in ("aic", "bic"):
+        raise ValueError(f"criterion must be 'aic' or 'bic', not {criterion!r}")
+
+    started = time.perf_counter()
+    values = np.asarray(values, dtype="float64")
+
+    d = choose_d(values, d_values)
+    d_seconds = time.perf_counter() - started
+
+    # Cheapest models first so a tight budget still covers the simple ones
+    candidates = sorted(
+        ((p, d, q) for p in p_values for q in q_values if p + q > 0),
+        key=lambda o: (o[0] + o[2], o),
+    )
+    scores, timings, skipped = {}, {}, {}
+    deadline = started + budget_seconds
+
+    workers = min(max_workers or os.cpu_count() or 1, len(candidates)) or 1
+    pool, shared = _acquire_pool(workers)
+    pending = set(candidates)
+    try:
+        finished = queue.Queue()
+        for order in candidates:
+            pool.apply_async(
+                _score, (values, order, criterion),
+                callback=lambda result, order=order: finished.put((order, result, None)),
+                error_callback=lambda exc, order=order: finished.put((order, None, exc)),
+            )
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                order, result, exc = finished.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.discard(order)
+            if exc is None:
+                scores[order], timings[order] = result
+            else:
+                skipped[order] = f"{type(exc).__name__}: {exc}"
+        for order in pending:
+            skipped[order] = "budget exhausted"
+    finally:
+        _release_pool(pool, shared, overran=bool(pending))
+
+    finite = {o: s for o, s in scores.items() if np.isfinite(s)}
+    if not finite:
+        raise RuntimeError("no ARIMA candidate could be fitted within the budget")
+    best = min(finite, key=finite.get)
+
+    return SearchResult(
+        order=best,
+        criterion=criterion,
+        score=finite[best],
+        scores=scores,
+        timings=timings,
+        skipped=skipped,
+        d_seconds=d_seconds,
+        elapsed=time.perf_counter() - started,
+    )
+
+
+# --------------------------------------------------
+# Per-ticker memo
+# --------------------------------------------------
+# Memo instances are created per call, so writers share one lock per process;
+# an ``fcntl`` lock on a sidecar file covers other processes (replicas)
+_memo_lock = threading.Lock()
+
+
+class OrderMemo:
+    """JSON file of the winning order per (ticker, criterion)."""
+
+    def __init__(self, path=None, max_age_days=30):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "arima_orders.json")
+        self.max_age = datetime.timedelta(days=max_age_days)
+
+    def get(self, ticker, criterion="aic"):
+        entry = self._load().get(f"{ticker}:{criterion}")
+        if not entry:
+            return None
+        chosen = datetime.datetime.fromisoformat(entry["chosen_at"])
+        if datetime.datetime.now() - chosen > self.max_age:
+            return None
+        return tuple(entry["order"])
+
+    def put(self, ticker, criterion, order):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with _memo_lock, open(f"{self.path}.lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Re-read under the lock so other writers' entries are kept
+                memo = self._load()
+                memo[f"{ticker}:{criterion}"] = {
+                    "order": list(order),
+                    "chosen_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                }
+                tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "w") as fh:
+                    json.dump(memo, fh, indent=1, sort_keys=True)
+                os.replace(tmp, self.path)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load(self):
+        try:
+            with open(self.path) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+
+def auto_order(ticker, values, criterion="aic", memo=None, **search_kwargs):
+    """Memoized ``select_order``: returns a ``SearchResult`` (``memoized=True`` on a hit)."""
+    memo = memo or OrderMemo()
+    order = memo.get(ticker, criterion)
+    if order is not None:
+        return SearchResult(order=order, criterion=criterion, score=float("nan"), memoized=True)
+
+    result = select_order(values, criterion=criterion, **search_kwargs)
+    memo.put(ticker, criterion, result.order)
+    return result
@@ -1,6 +1,6 @@
-import plotly.graph_objects as go
+def plotly_table(dataframe, height=400):
+    import plotly.graph_objects as go
 
-def plotly_table(dataframe):
     header_color = 'grey'
     row_even_color = 'lightgrey'
     row_odd_color = 'white'
@@ -23,7 +23,7 @@ def plotly_table(dataframe):
     )
 
     fig.update_layout(
-        height=400,
+        height=height,
         margin=dict(l=10, r=10, t=10, b=10),
     )
 
@@ -0,0 +1,122 @@
+"""Warm heavy imports and first-use caches off the request path.
+
+The pages import statsmodels, scipy and yfinance only inside the code that
+needs them, so a fresh worker starts fast, but the first user to fit a model
+or draw an indicator then pays those imports. ``STOCKVISION_PRELOAD`` moves
+that cost to a background thread at server start:
+
+    STOCKVISION_PRELOAD=1                 # every group
+    STOCKVISION_PRELOAD=arima,charts      # only these
+
+Each group is timed as a ``preload.<group>`` stage for the metrics export.
+"""
+import os
+import threading
+
+# Only the stdlib at module level: the landing page imports this module
+
+
+def _arima():
+    import numpy as np
+
+    from pages.utils.model_train import fit_arima
+
+    # A tiny fit also pulls in the state-space submodules statsmodels loads lazily
+    walk = np.cumsum(np.random.default_rng(0).normal(size=60)) + 100
+    fit_arima(walk, (1, 1, 0)).get_forecast(2).conf_int()
+
+    import scipy.stats  # noqa: F401  (forecast intervals)
+    from statsmodels.tsa.stattools import adfuller  # noqa: F401  (order search)
+
+
+def _indicators():
+    import numpy as np
+
+    from pages.utils.indicators import ema
+
+    ema(np.arange(30, dtype="float64"), 10)
+
+
+def _charts():
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    # First construction of each trace type loads its validators and the template
+    fig = make_subplots(rows=2, cols=1)
+    fig.add_trace(go.Scatter(x=[0, 1], y=[0, 1]), row=1, col=1)
+    fig.add_trace(go.Bar(x=[0, 1], y=[0, 1]), row=2, col=1)
+    fig.update_layout(template="plotly_dark")
+    fig.to_json()
+    go.Figure(go.Table(header=dict(values=["a"]), cells=dict(values=[[0]]))).to_json()
+
+
+def _data():
+    if os.environ.get("STOCKVISION_DATA_BACKEND") != "fake":
+        import yfinance  # noqa: F401
+
+
+def _calendars():
+    from pages.utils.trading_calendar import EXCHANGES, get_calendar
+
+    for name in EXCHANGES:
+        get_calendar(name)
+
+
+GROUPS = {
+    "arima": _arima,
+    "indicators": _indicators,
+    "charts": _charts,
+    "data": _data,
+    "calendars": _calendars,
+}
+
+
+def parse_groups(value):
+    """``"1"``/``"all"`` -> every group; otherwise a comma-separated subset."""
+    value = (value or "").strip().lower()
+    if value in ("", "0", "false", "no"):
+        return []
+    if value in ("1", "true", "yes", "all"):
+        return list(GROUPS)
+    names = [g.strip() for g in value.split(",") if g.strip()]
+    unknown = [g for g in names if g not in GROUPS]
+    if unknown:
+        raise ValueError(f"unknown preload groups: {', '.join(unknown)}")
+    return names
+
+
+def preload(groups=None):
+    """Run the given groups now; returns ``{group: seconds}``."""
+    from pages.utils.instrumentation import stage
+
+    timings = {}
+    for name in groups if groups is not None else GROUPS:
+        with stage(f"preload.{name}") as record:
+            GROUPS[name]()
+        timings[name] = record.seconds
+    return timings
+
+
+_started = None
+_started_lock = threading.Lock()
+
+
+def start_from_env():
+    """Kick off ``STOCKVISION_PRELOAD`` groups once per process, in the background.
+
+    Also starts the ``STOCKVISION_PREWARM`` scheduler (``pages.utils.prewarm``).
+    """
+    global _started
+    if os.environ.get("STOCKVISION_PREWARM"):
+        from pages.utils.prewarm import start_from_env as start_prewarm
+
+        start_prewarm()
+    with _started_lock:
+        if _started is None:
+            groups = parse_groups(os.environ.get("STOCKVISION_PRELOAD"))
+            _started = threading.Thread(
+                target=preload, args=(groups,), daemon=True, name="stockvision-preload",
+            )
+            if groups:
+                _started.start()
+        return _started
@@ -0,0 +1,500 @@
+"""Keep the most-requested tickers warm around each trading session.
+
+The first visitor for a ticker pays every cold path: fundamentals
+(``stock.info``), the full price download and, on the prediction page, the
+model fit. The pages and the API record what they are asked for in a
+``RequestTracker``; a ``Prewarmer`` replays the most-requested views shortly
+before the open and after the close of each ticker's exchange, so the
+people who come next find the market-data, price-store and model caches
+already filled:
+
+    STOCKVISION_PREWARM=1                              # in the app process
+    STOCKVISION_PREWARM="top=50,workers=4,before=45"   # with settings
+    python -m pages.utils.prewarm run --top 50         # sidecar process
+    python -m pages.utils.prewarm once --top 20        # one pass, now
+    python -m pages.utils.prewarm top                  # what would be warmed
+
+A sidecar only helps replicas that share its caches, i.e. with
+``STOCKVISION_SHARED_CACHE`` pointing at the same directory (the price store
+under ``STOCKVISION_CACHE_DIR`` is shared through the filesystem anyway).
+
+Tracking: every view (page, ticker, interval, lookback in days, model,
+ARIMA order choice) has
+an exponentially decayed request count (``half_life`` days), kept in memory
+and flushed every ``flush_every`` seconds to
+``<shared cache or cache dir>/requests/<host>-<pid>.json``; the top list
+sums every process's file, so app replicas and the sidecar agree on it.
+
+Warming: the top ``top`` tickers (by summed score) are warmed on a pool of
+``workers`` threads, each replaying its ``views`` most requested views. A
+provider error pauses every worker for a jittered, exponentially growing
+delay (``backoff`` .. ``max_backoff`` seconds) before the view is retried,
+up to ``retries`` times. Provider errors are ``ProviderError`` (raised by
+the yfinance backend for failed downloads and rate limits) and ``OSError``;
+``ValueError`` (no data for a ticker) is counted as skipped, not retried.
+Each step is a ``prewarm.<step>`` stage, and passes, views and retries are
+counted in ``stockvision_prewarm_*`` metrics.
+"""
+import argparse
+import atexit
+import datetime
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from pages.utils.instrumentation import REGISTRY, stage
+from pages.utils.model_train import DEFAULT_ORDER
+from pages.utils.price_store import DEFAULT_CACHE_DIR, ProviderError
+from pages.utils.shared_cache import get_shared_cache
+
+HALF_LIFE_DAYS = 7.0
+# Files not flushed for this long belong to processes that are gone
+STALE_AFTER_DAYS = 4 * HALF_LIFE_DAYS
+DEFAULT_INDICATORS = ("SMA 20", "SMA 50")  # the analysis page's defaults
+PAGES = ("analysis", "prediction")
+
+DEFAULT_SETTINGS = {
+    "top": 20,            # tickers per pass
+    "views": 2,           # most requested views replayed per ticker
+    "workers": 4,         # tickers warmed concurrently
+    "before": 30,         # minutes before the open
+    "after": 15,          # minutes after the close
+    "refresh": 0,         # minutes between passes during the session (0 = off)
+    "retries": 3,
+    "backoff": 2.0,       # seconds; doubled per attempt, with full jitter
+    "max_backoff": 120.0,
+    "steps": 30,          # forecast horizon of prediction views
+}
+
+# ``order`` defaults so files written before it was tracked still load
+View = namedtuple("View", "page ticker interval lookback to_today model order", defaults=("",))
+View.__doc__ = """What a page asked for, relative to the day it was asked.
+
+``lookback`` is the start date in days before today; ``to_today`` is whether
+an explicit end of today was passed (the analysis page) rather than none
+(the prediction page and open-ended API calls), since the two are different
+cache keys. ``order`` is the ARIMA order choice: ``""`` for the default,
+``"auto:<criterion>"`` for the memoized search, or ``"p,d,q"``.
+"""
+
+
+def order_choice(order=None, criterion="aic"):
+    """The ``View.order`` text for an ARIMA order argument (``None``, ``"auto"`` or a tuple)."""
+    if order == "auto":
+        return f"auto:{criterion}"
+    if order is None or tuple(order) == DEFAULT_ORDER:
+        return ""
+    return ",".join(str(int(x)) for x in order)
+
+
+def _order_args(choice):
+    """``View.order`` -> ``(order, criterion)`` for ``analytics.forecast``."""
+    if choice.startswith("auto"):
+        return "auto", choice.partition(":")[2] or "aic"
+    if choice:
+        return tuple(int(x) for x in choice.split(",")), "aic"
+    return DEFAULT_ORDER, "aic"
+
+
+# --------------------------------------------------
+# Request tracking
+# --------------------------------------------------
+def _decayed(score, stamp, now, half_life):
+    return score * 0.5 ** ((now - stamp) / half_life)
+
+
+class RequestTracker:
+    """Decayed request counts per view, shared between processes through small JSON files."""
+
+    def __init__(self, root, half_life_days=HALF_LIFE_DAYS, flush_every=30.0):
+        self.root = root
+        self.half_life = half_life_days * 86400
+        self.flush_every = flush_every
+        self.path = os.path.join(root, f"{socket.gethostname()}-{os.getpid()}.json")
+        self._scores = {}  # View -> (score, stamp)
+        self._lock = threading.Lock()
+        self._flushed = time.time()
+        self._dirty = False
+
+    def record(self, page, ticker, interval="1d", start=None, end=None, model=None, order=""):
+        """Count one request; ``start``/``end`` are the dates the page passed."""
+        today = datetime.date.today()
+        view = View(
+            page, ticker.upper().strip(), interval,
+            (today - start).days if start is not None else 365,
+            end is not None and end >= today,
+            model or "",
+            order or "",
+        )
+        now = time.time()
+        with self._lock:
+            score, stamp = self._scores.get(view, (0.0, now))
+            self._scores[view] = (_decayed(score, stamp, now, self.half_life) + 1.0, now)
+            self._dirty = True
+            due = now - self._flushed >= self.flush_every
+        REGISTRY.inc("stockvision_tracked_requests_total", 1,
+                     "Page and API requests seen by the pre-warm tracker", page=page)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write this process's counts (temp file + rename)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            rows = [[*view, score, stamp] for view, (score, stamp) in self._scores.items()]
+            self._dirty = False
+            self._flushed = time.time()
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w") as fh:
+                json.dump(rows, fh)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # tracking is best effort
+
+    def scores(self):
+        """``{View: decayed score}`` summed over every process's file."""
+        now = time.time()
+        totals = Counter()
+        with self._lock:
+            for view, (score, stamp) in self._scores.items():
+                totals[view] += _decayed(score, stamp, now, self.half_life)
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            names = []
+        for name in names:
+            path = os.path.join(self.root, name)
+            if not name.endswith(".json") or path == self.path:
+                continue
+            try:
+                if now - os.path.getmtime(path) > STALE_AFTER_DAYS * 86400:
+                    os.remove(path)
+                    continue
+                with open(path) as fh:
+                    rows = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            for *fields, score, stamp in rows:
+                totals[View(*fields)] += _decayed(score, stamp, now, self.half_life)
+        return totals
+
+    def top(self, n=DEFAULT_SETTINGS["top"], views=DEFAULT_SETTINGS["views"]):
+        """``[(ticker, score, [View, ...])]`` for the ``n`` most requested tickers."""
+        by_ticker = {}
+        for view, score in self.scores().items():
+            by_ticker.setdefault(view.ticker, []).append((score, view))
+        ranked = sorted(
+            ((sum(s for s, _ in rows), ticker, rows) for ticker, rows in by_ticker.items()),
+            key=lambda row: (-row[0], row[1]),
+        )
+        return [
+            (ticker, total, [view for _, view in sorted(rows, key=lambda r: -r[0])[:views]])
+            for total, ticker, rows in ranked[:n]
+        ]
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_tracker():
+    """Process-wide tracker, next to the shared cache when there is one."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            shared = get_shared_cache()
+            root = shared.root if shared is not None else DEFAULT_CACHE_DIR
+            _tracker = RequestTracker(os.path.join(root, "requests"))
+            atexit.register(_tracker.flush)
+        return _tracker
+
+
+def record(page, ticker, interval="1d", start=None, end=None, model=None, order=""):
+    """Count a page or API request for the pre-warmer; never raises."""
+    if ticker:
+        try:
+            get_tracker().record(page, ticker, interval, start, end, model, order)
+        except Exception:  # noqa: BLE001 - tracking must never break a page
+            pass
+
+
+# --------------------------------------------------
+# Warming
+# --------------------------------------------------
+def parse_settings(text):
+    """``"top=50,workers=4"`` -> ``DEFAULT_SETTINGS`` with those overrides (``"1"`` = defaults)."""
+    settings = dict(DEFAULT_SETTINGS)
+    for item in (text or "").split(","):
+        item = item.strip()
+        if not item or item.lower() in ("1", "true", "yes", "on"):
+            continue
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_SETTINGS:
+            raise ValueError(f"unknown prewarm setting: {name}")
+        settings[name] = type(DEFAULT_SETTINGS[name])(value)
+    return settings
+
+
+class Prewarmer:
+    """Replays the tracker's top views before the open and after the close."""
+
+    def __init__(self, tracker=None, market=None, **settings):
+        unknown = set(settings) - set(DEFAULT_SETTINGS)
+        if unknown:
+            raise TypeError(f"unknown prewarm settings: {', '.join(sorted(unknown))}")
+        self.tracker = tracker or get_tracker()
+        self._market = market
+        self.settings = {**DEFAULT_SETTINGS, **settings}
+        self.status = {"passes": 0, "last_pass": None, "next_pass": None}
+        self.stop_event = threading.Event()
+        self._pass_lock = threading.Lock()
+        self._resume_at = 0.0  # monotonic time before which nobody calls the provider
+        self._resume_lock = threading.Lock()
+
+    @property
+    def market(self):
+        if self._market is None:
+            from pages.utils.market_data import get_market_data
+
+            self._market = get_market_data()
+        return self._market
+
+    # ---------------- one pass ----------------
+    def warm(self, exchange=None, phase="manual"):
+        """Warm the top tickers (only ``exchange``'s if given); returns the pass summary."""
+        from pages.utils.trading_calendar import calendar_for_ticker
+
+        with self._pass_lock:
+            top = self.tracker.top(self.settings["top"], self.settings["views"])
+            if exchange is not None:
+                top = [row for row in top if calendar_for_ticker(row[0]).name == exchange]
+            outcomes = Counter()
+            started = time.perf_counter()
+            with stage(f"prewarm.pass.{phase}"):
+                if top:
+                    workers = max(1, min(self.settings["workers"], len(top)))
+                    with ThreadPoolExecutor(workers, thread_name_prefix="prewarm") as pool:
+                        for result in pool.map(lambda row: self._warm_ticker(row[2]), top):
+                            outcomes.update(result)
+            seconds = time.perf_counter() - started
+
+            REGISTRY.inc("stockvision_prewarm_passes_total", 1, "Pre-warm passes by phase", phase=phase)
+            REGISTRY.observe("stockvision_prewarm_pass_seconds", seconds, "Wall time per pre-warm pass",
+                             buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800), phase=phase)
+            summary = {
+                "phase": phase,
+                "exchange": exchange,
+                "finished": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                "seconds": round(seconds, 3),
+                "tickers": [row[0] for row in top],
+                **outcomes,
+            }
+            self.status["passes"] += 1
+            self.status["last_pass"] = summary
+            return summary
+
+    def _warm_ticker(self, views):
+        outcomes = Counter()
+        for view in views:
+            if self.stop_event.is_set():
+                break
+            outcome = self._warm_view(view)
+            outcomes[outcome] += 1
+            REGISTRY.inc("stockvision_prewarm_views_total", 1, "Views replayed by the pre-warmer",
+                         page=view.page, outcome=outcome)
+        return outcomes
+
+    def _warm_view(self, view):
+        """``ok``, ``skipped`` (no data) or ``error`` once retries run out."""
+        for attempt in range(self.settings["retries"] + 1):
+            self._wait_for_provider()
+            try:
+                self._replay(view)
+                return "ok"
+            except (ProviderError, OSError):
+                # Rate limits, outages, network errors: worth another try later
+                if attempt == self.settings["retries"] or self.stop_event.is_set():
+                    return "error"
+                REGISTRY.inc("stockvision_prewarm_retries_total", 1,
+                             "Pre-warm steps retried after a provider error", page=view.page)
+                self._back_off(attempt)
+            except ValueError:
+                # Unknown ticker or too little data: asking again will not help
+                return "skipped"
+            except Exception:  # noqa: BLE001 - one broken view must not end the pass
+                return "error"
+        return "error"
+
+    def _replay(self, view):
+        """Make the calls the page would make for ``view``, filling the same cache keys."""
+        from pages.utils import analytics
+
+        today = datetime.date.today()
+        start = today - datetime.timedelta(days=view.lookback)
+        end = today if view.to_today else None
+        market = self.market
+
+        if view.page == "prediction":
+            order, criterion = _order_args(view.order)
+            with stage("prewarm.forecast"):
+                analytics.forecast(
+                    view.ticker, start, self.settings["steps"], view.interval, order=order,
+                    market=market, model=view.model or "arima", criterion=criterion,
+                )
+            return
+
+        with stage("prewarm.prices") as rec:
+            bars = rec.payload(market.bars(view.ticker, view.interval, start, end))
+        # Failed downloads raise ProviderError; empty bars are a real "no data"
+        if bars.empty:
+            raise ValueError(f"no data for {view.ticker}")
+        with stage("prewarm.info"):
+            market.info(view.ticker)
+        with stage("prewarm.news"):
+            market.news(view.ticker)
+        with stage("prewarm.indicators"):
+            analytics.week52_range(view.ticker, end or today, market)
+            analytics.indicators(bars, list(DEFAULT_INDICATORS))
+
+    def _back_off(self, attempt):
+        """Pause every worker for a jittered ``backoff * 2**attempt`` (capped)."""
+        ceiling = min(self.settings["max_backoff"], self.settings["backoff"] * 2 ** attempt)
+        delay = random.uniform(0, ceiling)
+        with self._resume_lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+    def _wait_for_provider(self):
+        while True:
+            with self._resume_lock:
+                remaining = self._resume_at - time.monotonic()
+            if remaining <= 0 or self.stop_event.wait(remaining):
+                return
+
+    # ---------------- schedule ----------------
+    def next_pass(self, now=None):
+        """``(when, exchange, phase)`` of the first pass due after ``now`` (UTC)."""
+        import pandas as pd
+
+        from pages.utils.trading_calendar import calendar_for_ticker
+
+        now = pd.Timestamp(now or datetime.datetime.now(datetime.timezone.utc))
+        now = now.tz_localize("UTC") if now.tzinfo is None else now.tz_convert("UTC")
+        tickers = [row[0] for row in self.tracker.top(self.settings["top"], 1)]
+        calendars = {c.name: c for c in map(calendar_for_ticker, tickers or ["SPY"])}
+        before = pd.Timedelta(minutes=self.settings["before"])
+        after = pd.Timedelta(minutes=self.settings["after"])
+        refresh = pd.Timedelta(minutes=self.settings["refresh"])
+
+        due = []
+        for name, calendar in calendars.items():
+            # Sessions from two days back cover every time-zone offset from UTC
+            for day in calendar.next_sessions(now.date() - datetime.timedelta(days=2), 4):
+                open_, close = calendar.session_hours(day)
+                due += [(open_ - before, name, "pre_open"), (close + after, name, "post_close")]
+                if refresh > pd.Timedelta(0) and open_ <= now < close:
+                    due.append((min(now + refresh, close), name, "refresh"))
+        when, name, phase = min((row for row in due if row[0] > now), key=lambda row: row[0])
+        return when.tz_convert("UTC"), name, phase
+
+    def run(self, startup=True):
+        """Pass now (``startup``), then at every scheduled time until ``stop()``."""
+        import pandas as pd
+
+        if startup:
+            self._run_pass(None, "startup")
+        while not self.stop_event.is_set():
+            when, exchange, phase = self.next_pass()
+            self.status["next_pass"] = {"at": when.isoformat(), "exchange": exchange, "phase": phase}
+            # Re-check at least every 5 minutes, so clock changes are picked up
+            while not self.stop_event.is_set():
+                remaining = (when - pd.Timestamp.now(tz="UTC")).total_seconds()
+                if remaining <= 0:
+                    self._run_pass(exchange, phase)
+                    break
+                self.stop_event.wait(min(remaining, 300))
+
+    def _run_pass(self, exchange, phase):
+        try:
+            self.warm(exchange, phase)
+        except Exception as exc:  # noqa: BLE001 - keep the scheduler alive
+            self.status["last_error"] = f"{type(exc).__name__}: {exc}"
+            REGISTRY.inc("stockvision_prewarm_pass_errors_total", 1, "Pre-warm passes that raised",
+                         phase=phase, error=type(exc).__name__)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+_prewarmer = None
+_prewarmer_lock = threading.Lock()
+
+
+def get_prewarmer():
+    """The in-process scheduler started by ``start_from_env``, or None."""
+    return _prewarmer
+
+
+def start_from_env():
+    """Start the in-process scheduler once when ``STOCKVISION_PREWARM`` is set."""
+    global _prewarmer
+    value = (os.environ.get("STOCKVISION_PREWARM") or "").strip()
+    if value.lower() in ("", "0", "false", "no", "off"):
+        return None
+    with _prewarmer_lock:
+        if _prewarmer is None:
+            _prewarmer = Prewarmer(**parse_settings(value))
+            threading.Thread(target=_prewarmer.run, daemon=True, name="stockvision-prewarm").start()
+        return _prewarmer
+
+
+# --------------------------------------------------
+# CLI (sidecar)
+# --------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-warm caches for the most requested tickers.")
+    parser.add_argument("command", choices=["run", "once", "top"],
+                        help="run: schedule around sessions; once: one pass now; top: list tickers")
+    for name, default in DEFAULT_SETTINGS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+    parser.add_argument("--no-startup", action="store_true", help="run: wait for the first scheduled pass")
+    args = parser.parse_args(argv)
+    settings = {name: getattr(args, name) for name in DEFAULT_SETTINGS}
+
+    if get_shared_cache() is None and args.command != "top":
+        print("note: STOCKVISION_SHARED_CACHE is not set; only the on-disk price store is shared "
+              "with the app", file=sys.stderr)
+
+    tracker = get_tracker()
+    if args.command == "top":
+        print(f"{'ticker':<12} {'score':>8}  views")
+        for ticker, score, views in tracker.top(args.top, args.views):
+            described = ", ".join(
+                f"{v.page} {v.interval} {v.lookback}d{' ' + v.model if v.model else ''}"
+                f"{' order=' + v.order if v.order else ''}" for v in views
+            )
+            print(f"{ticker:<12} {score:>8.2f}  {described}")
+        return 0
+
+    warmer = Prewarmer(tracker, **settings)
+    if args.command == "once":
+        print(json.dumps(warmer.warm(phase="manual"), indent=1))
+        return 0
+    try:
+        warmer.run(startup=not args.no_startup)
+    except KeyboardInterrupt:
+        warmer.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
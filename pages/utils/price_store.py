@@ -0,0 +1,239 @@
+"""Persistent per-ticker OHLCV store with incremental delta fetches.
+
+Each ticker lives in one columnar file under the cache directory together
+with a small JSON sidecar recording the date range that has already been
+downloaded. A request only hits the source (any object with a
+``history(ticker, start, end)`` method, see ``pages.utils.market_data``)
+for the leading / trailing part of the range that is not on disk yet.
+"""
+import datetime
+import importlib.util
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "STOCKVISION_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "stockvision"),
+)
+
+# Parquet when an engine is installed, pickle otherwise
+_HAS_PARQUET = (
+    importlib.util.find_spec("pyarrow") is not None
+    or importlib.util.find_spec("fastparquet") is not None
+)
+FRAME_SUFFIX = "parquet" if _HAS_PARQUET else "pkl"
+
+
+def read_frame(path):
+    if _HAS_PARQUET:
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def write_frame(frame, path):
+    """Atomically replace ``path`` with ``frame`` (temp file + rename)."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if _HAS_PARQUET:
+        frame.to_parquet(tmp)
+    else:
+        frame.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+class ProviderError(Exception):
+    """The data source failed (network, rate limit, outage); nothing may be cached."""
+
+
+# --------------------------------------------------
+# Schema
+# --------------------------------------------------
+def empty_frame():
+    frame = pd.DataFrame(columns=OHLCV_COLUMNS, dtype="float64")
+    frame.index = pd.DatetimeIndex([], name="Date")
+    return frame
+
+
+def normalize_ohlcv(data, ticker=None):
+    """Flatten a provider frame into the store's single-level OHLCV schema."""
+    if data is None or data.empty:
+        return empty_frame()
+
+    data = data.copy()
+
+    if isinstance(data.columns, pd.MultiIndex):
+        # yfinance returns (Price, Ticker) columns even for a single symbol
+        price_level = next(
+            (i for i in range(data.columns.nlevels)
+             if "Close" in data.columns.get_level_values(i)),
+            0,
+        )
+        other_level = 1 - price_level if data.columns.nlevels == 2 else None
+        if other_level is not None:
+            symbols = data.columns.get_level_values(other_level)
+            symbol = ticker if ticker in symbols else symbols[0]
+            data = data.xs(symbol, axis=1, level=other_level)
+        else:
+            data.columns = data.columns.get_level_values(price_level)
+
+    data = data.reindex(columns=OHLCV_COLUMNS)
+    data.columns.name = None
+
+    index = pd.DatetimeIndex(pd.to_datetime(data.index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    data.index = index.rename("Date")
+
+    data = data[~data.index.duplicated(keep="last")].sort_index()
+    return data.dropna(subset=["Close"]).astype("float64")
+
+
+def as_date(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+# --------------------------------------------------
+# Store
+# --------------------------------------------------
+class PriceStore:
+    """On-disk OHLCV cache that only downloads the date ranges it is missing."""
+
+    def __init__(self, source, cache_dir=None):
+        self.source = source
+        self.cache_dir = cache_dir or os.path.join(DEFAULT_CACHE_DIR, "prices")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def get(self, ticker, start, end=None):
+        """Return daily bars for ``start <= Date < end`` (``end`` defaults to tomorrow)."""
+        today = datetime.date.today()
+        start = as_date(start)
+        end = as_date(end) or today + datetime.timedelta(days=1)
+
+        with self._lock_for(ticker):
+            cached, coverage = self._read(ticker)
+            frames = [cached]
+
+            # Coverage only grows by ranges the source returned bars for: an
+            # empty answer may be a failed download, so it is asked again next time
+            if coverage is None:
+                fetched = self.source.history(ticker, start, end)
+                frames.append(fetched)
+                new_start, new_end = start, end
+            else:
+                cov_start, cov_end = new_start, new_end = coverage
+                if start < cov_start:
+                    frames.append(self.source.history(ticker, start, cov_start))
+                    if not frames[-1].empty:
+                        new_start = start
+                if end > cov_end:
+                    frames.append(self.source.history(ticker, cov_end, end))
+                    if not frames[-1].empty:
+                        new_end = end
+
+            # Today's bar is still moving, so it is never marked as covered
+            new_end = min(new_end, today)
+
+            if any(not f.empty for f in frames[1:]):
+                merged = pd.concat([f for f in frames if not f.empty] or [empty_frame()])
+                merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+                self._write(ticker, merged, (new_start, new_end))
+            else:
+                merged = cached
+
+        return merged.loc[pd.Timestamp(start):pd.Timestamp(end) - pd.Timedelta(days=1)]
+
+    def get_many(self, tickers, start, end=None, max_workers=8):
+        """Bars for several tickers, returned as ``{ticker: frame}``.
+
+        Tickers with nothing on disk are downloaded in one batched request when
+        the source supports ``history_many``; partially cached tickers (and
+        sources without batching) go through ``get`` on a bounded thread pool.
+        A ticker whose download fails gets what is on disk (possibly nothing)
+        instead of failing the others; its coverage is left unchanged.
+        """
+        start = as_date(start)
+        end = as_date(end) or datetime.date.today() + datetime.timedelta(days=1)
+        tickers = list(dict.fromkeys(tickers))
+
+        result = {}
+        cold = [t for t in tickers if self._read_meta(t) is None]
+        if len(cold) > 1 and hasattr(self.source, "history_many"):
+            fetched = self.source.history_many(cold, start, end)
+            for ticker in cold:
+                with self._lock_for(ticker):
+                    if self._read_meta(ticker) is not None:
+                        continue  # filled concurrently; let ``get`` merge it
+                    frame = fetched.get(ticker, empty_frame())
+                    if not frame.empty:
+                        self._write(ticker, frame, (start, min(end, datetime.date.today())))
+                    result[ticker] = frame
+
+        warm = [t for t in tickers if t not in result]
+        if warm:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(warm))) as pool:
+                frames = pool.map(lambda t: self._get_or_cached(t, start, end), warm)
+                result.update(zip(warm, frames))
+
+        last = pd.Timestamp(end) - pd.Timedelta(days=1)
+        return {t: result[t].loc[pd.Timestamp(start):last] for t in tickers}
+
+    def _get_or_cached(self, ticker, start, end):
+        try:
+            return self.get(ticker, start, end)
+        except ProviderError:
+            return self._read(ticker)[0]
+
+    def coverage(self, ticker):
+        return self._read_meta(ticker)
+
+    # ---------------- file layout ----------------
+    def _path(self, ticker, suffix):
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+        return os.path.join(self.cache_dir, f"{safe}.{suffix}")
+
+    def _data_path(self, ticker):
+        return self._path(ticker, FRAME_SUFFIX)
+
+    def _lock_for(self, ticker):
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _read_meta(self, ticker):
+        try:
+            with open(self._path(ticker, "json")) as fh:
+                meta = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        return as_date(meta["start"]), as_date(meta["end"])
+
+    def _read(self, ticker):
+        coverage = self._read_meta(ticker)
+        path = self._data_path(ticker)
+        if coverage is None or not os.path.exists(path):
+            return empty_frame(), None
+        return read_frame(path), coverage
+
+    def _write(self, ticker, frame, coverage):
+        # Data first, then the sidecar: a crash in between only under-reports coverage
+        write_frame(frame, self._data_path(ticker))
+
+        meta_path = self._path(ticker, "json")
+        tmp = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump({"start": coverage[0].isoformat(), "end": coverage[1].isoformat()}, fh)
+        os.replace(tmp, meta_path)
+
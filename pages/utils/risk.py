@@ -0,0 +1,257 @@
+"""Portfolio risk metrics computed on one aligned (dates x tickers) price matrix.
+
+Every metric is a batched NumPy operation over the return matrix, so a book
+of a few hundred symbols costs a handful of matrix products rather than a
+loop per ticker:
+
+    R        simple daily returns, (T, N)
+    cov      centered R.T @ R / (T - 1); corr scales it by the volatilities
+    drawdown running maximum of cumulative wealth along the time axis
+    beta     centered R.T @ benchmark / var(benchmark)
+    VaR      column quantiles (historical) and mean / covariance (parametric)
+
+VaR and CVaR are one-day losses at ``level`` confidence, reported as
+positive fractions of value.
+"""
+import re
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+ASSET_COLUMNS = [
+    "Ticker", "Weight", "Ann. Return %", "Volatility %", "Sharpe", "Beta",
+    "Max Drawdown %", "VaR Hist %", "VaR Param %", "Risk Contribution %",
+]
+
+
+def parse_portfolio(text):
+    """``{ticker: weight}`` from lines like ``AAPL 30``, ``MSFT:0.2`` or a bare ``NVDA``.
+
+    Tickers without a weight share what the weighted ones leave (equally, or
+    the whole book if none are weighted); weights are normalized to sum to 1.
+    """
+    weights = {}
+    for token in re.split(r"[,\n;]+", text or ""):
+        parts = [p for p in re.split(r"[\s:=]+", token.strip()) if p]
+        if not parts:
+            continue
+        ticker = parts[0].upper()
+        weights[ticker] = float(parts[1].rstrip("%")) if len(parts) > 1 else None
+
+    if not weights:
+        return {}
+    given = {t: w for t, w in weights.items() if w is not None}
+    if any(w < 0 for w in given.values()):
+        raise ValueError("weights must be non-negative (long-only book)")
+    bare = [t for t, w in weights.items() if w is None]
+    if bare:
+        total = sum(given.values())
+        # Percent-style weights leave 100 - total, fraction-style leave 1 - total
+        scale = 100.0 if total > 1 else 1.0
+        share = max(scale - total, 0.0) / len(bare) if given else 1.0
+        weights.update({t: share for t in bare})
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("weights must not all be zero")
+    return {t: w / total for t, w in weights.items()}
+
+
+def aligned_prices(close):
+    """Forward-filled wide matrix over the window in which every ticker trades.
+
+    Holidays differ between exchanges, so gaps are forward-filled; rows before
+    the youngest listing are dropped so every column covers the same window.
+    """
+    close = close.sort_index().ffill()
+    complete = close.notna().all(axis=1).to_numpy()
+    if not complete.any():
+        return close.iloc[:0]
+    return close.iloc[int(np.argmax(complete)):]
+
+
+def returns_matrix(prices):
+    """Simple returns ``P[t] / P[t-1] - 1`` for a (T + 1, N) price array."""
+    prices = np.asarray(prices, dtype="float64")
+    return prices[1:] / prices[:-1] - 1
+
+
+def drawdown_series(returns):
+    """Fall of cumulative wealth below its running peak (starting at 1) at each step."""
+    wealth = np.cumprod(1 + returns, axis=0)
+    return wealth / np.maximum.accumulate(np.maximum(wealth, 1.0), axis=0) - 1
+
+
+def max_drawdown(returns):
+    """Largest peak-to-trough fall of cumulative wealth, per column (negative)."""
+    return drawdown_series(returns).min(axis=0)
+
+
+def historical_var(returns, level=0.95):
+    """(VaR, CVaR) per column from the empirical return distribution."""
+    cutoff = np.quantile(returns, 1 - level, axis=0)
+    tail = np.where(returns <= cutoff, returns, np.nan)
+    return -cutoff, -np.nanmean(tail, axis=0)
+
+
+def parametric_var(mean, std, level=0.95):
+    """Normal (variance-covariance) VaR and CVaR from daily mean and volatility."""
+    normal = NormalDist()
+    z = normal.inv_cdf(1 - level)
+    return -(mean + z * std), -(mean - std * normal.pdf(z) / (1 - level))
+
+
+@dataclass
+class RiskReport:
+    tickers: list
+    dates: pd.DatetimeIndex    # return dates (prices window minus its first day)
+    weights: np.ndarray        # (N,)
+    returns: np.ndarray        # (T, N)
+    portfolio_returns: np.ndarray  # (T,)
+    cov: np.ndarray            # (N, N) daily
+    corr: np.ndarray           # (N, N)
+    assets: pd.DataFrame       # one row per ticker, ``ASSET_COLUMNS``
+    portfolio: dict            # headline numbers for the whole book
+    level: float
+
+    def corr_frame(self):
+        return pd.DataFrame(self.corr, index=self.tickers, columns=self.tickers)
+
+
+def portfolio_risk(close, weights, benchmark=None, risk_free=0.0, level=0.95):
+    """Risk metrics for ``weights`` (``{ticker: weight}``) over a wide close matrix.
+
+    ``benchmark`` is a close series for beta (e.g. SPY); ``risk_free`` an
+    annual rate used for Sharpe.
+    """
+    tickers = [t for t in weights if t in close.columns]
+    if not tickers:
+        raise ValueError("none of the portfolio's tickers have prices")
+    prices = close[tickers]
+    if benchmark is not None:
+        prices = prices.join(benchmark.rename("__benchmark__"), how="left")
+    prices = aligned_prices(prices)
+    if len(prices) < 3:
+        raise ValueError("need at least 3 common trading days across the portfolio")
+
+    all_returns = returns_matrix(prices.to_numpy())
+    returns = all_returns[:, :len(tickers)]
+    w = np.array([weights[t] for t in tickers], dtype="float64")
+    w /= w.sum()
+    n_obs = len(returns)
+
+    mean = returns.mean(axis=0)
+    centered = returns - mean
+    cov = centered.T @ centered / (n_obs - 1)
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(std, std)
+    np.fill_diagonal(corr, 1.0)
+
+    rf_daily = risk_free / TRADING_DAYS
+    annual = np.sqrt(TRADING_DAYS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = (mean - rf_daily) / std * annual
+
+    if benchmark is not None:
+        bench = all_returns[:, -1]
+        bench_c = bench - bench.mean()
+        beta = centered.T @ bench_c / (bench_c @ bench_c)
+    else:
+        bench, beta = None, np.full(len(tickers), np.nan)
+
+    hist_var, hist_cvar = historical_var(returns, level)
+    param_var, param_cvar = parametric_var(mean, std, level)
+
+    # Portfolio: one more column, built from the same matrices
+    port = returns @ w
+    port_var = float(w @ cov @ w)
+    port_std = np.sqrt(port_var)
+    # Euler allocation: each asset's share of portfolio volatility (sums to 100%)
+    contribution = w * (cov @ w) / port_var if port_var > 0 else np.full(len(w), np.nan)
+    p_hist_var, p_hist_cvar = historical_var(port, level)
+    p_param_var, p_param_cvar = parametric_var(port.mean(), port_std, level)
+
+    assets = pd.DataFrame({
+        "Ticker": tickers,
+        "Weight": w * 100,
+        "Ann. Return %": mean * TRADING_DAYS * 100,
+        "Volatility %": std * annual * 100,
+        "Sharpe": sharpe,
+        "Beta": beta,
+        "Max Drawdown %": max_drawdown(returns) * 100,
+        "VaR Hist %": hist_var * 100,
+        "VaR Param %": param_var * 100,
+        "Risk Contribution %": contribution * 100,
+    }, columns=ASSET_COLUMNS)
+
+    portfolio = {
+        "Ann. Return %": float(port.mean() * TRADING_DAYS * 100),
+        "Volatility %": float(port_std * annual * 100),
+        "Sharpe": float((port.mean() - rf_daily) / port_std * annual) if port_std else float("nan"),
+        "Beta": float(beta @ w) if bench is not None else float("nan"),
+        "Max Drawdown %": float(max_drawdown(port) * 100),
+        "VaR Hist %": float(p_hist_var * 100),
+        "CVaR Hist %": float(p_hist_cvar * 100),
+        "VaR Param %": float(p_param_var * 100),
+        "CVaR Param %": float(p_param_cvar * 100),
+        # Volatility saved versus the same weights with every pair perfectly correlated
+        "Diversification %": float((1 - port_std / (w @ std)) * 100) if w @ std else float("nan"),
+    }
+
+    return RiskReport(
+        tickers=tickers,
+        dates=prices.index[1:],
+        weights=w,
+        returns=returns,
+        portfolio_returns=port,
+        cov=cov,
+        corr=corr,
+        assets=assets,
+        portfolio=portfolio,
+        level=level,
+    )
+
+
+# --------------------------------------------------
+# Correlation heatmap data
+# --------------------------------------------------
+def cluster_order(corr):
+    """Leaf order of average-linkage clustering on ``1 - corr``: correlated names sit together."""
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+
+    if len(corr) < 3:
+        return np.arange(len(corr))
+    distance = np.clip(1 - np.nan_to_num(corr, nan=0.0), 0.0, 2.0)
+    np.fill_diagonal(distance, 0.0)
+    return leaves_list(linkage(squareform(distance, checks=False), method="average"))
+
+
+def heatmap_data(corr, tickers, max_cells=60):
+    """(matrix, labels) for the heatmap: clustered, block-averaged to ``max_cells``.
+
+    Up to ``max_cells`` tickers are shown as-is (in cluster order). Larger
+    books are cut into contiguous blocks of the clustered order and each
+    cell holds the mean correlation between two blocks, so a 300 x 300
+    matrix ships as 60 x 60 values instead of 90,000.
+    """
+    order = cluster_order(corr)
+    ordered = corr[np.ix_(order, order)]
+    labels = [tickers[i] for i in order]
+    n = len(labels)
+    if n <= max_cells:
+        return ordered, labels
+
+    starts = np.linspace(0, n, max_cells + 1).astype(int)[:-1]
+    sizes = np.diff(np.append(starts, n))
+    sums = np.add.reduceat(np.add.reduceat(ordered, starts, axis=0), starts, axis=1)
+    blocks = sums / np.outer(sizes, sizes)
+    names = [
+        labels[s] if size == 1 else f"{labels[s]}…{labels[s + size - 1]} ({size})"
+        for s, size in zip(starts, sizes)
+    ]
+    return blocks, names
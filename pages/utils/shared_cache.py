@@ -0,0 +1,300 @@
+"""Cross-process cache on a shared directory, for running several app replicas.
+
+    STOCKVISION_SHARED_CACHE=/srv/stockvision/shared streamlit run Trading_App.py
+    STOCKVISION_SHARED_TTLS="history=900,info=43200" ...   # per-kind overrides
+
+Every replica (and the API, batch jobs, ...) pointing at the same directory
+sees the others' prices, fundamentals, news and fitted models, so a ticker is
+downloaded and fitted once per TTL for the whole deployment rather than once
+per process. The in-process caches stay in front of it.
+
+Layout: ``<root>/<kind>/<sha1 of key>.pkl`` holding a pickled header
+(``expires``, ``created``, ``key``) followed by the pickled value. Writes go
+to a temp file and are renamed into place, so readers never see half an
+entry. Refreshes take an ``fcntl`` lock (one of 64 lock files per kind, by
+key hash):
+
+    fresh entry        served without locking
+    expired entry      one process refreshes under the lock; the others keep
+                       serving the stale value until it lands
+    no entry           the others wait for the lock, then read what the
+                       holder wrote (``wait_timeout`` bounds the wait)
+
+Without ``fcntl`` (Windows) the lock only covers threads of one process.
+Entries are pickles: point this only at a directory the app's own user owns.
+
+    python -m pages.utils.shared_cache info [--root DIR]
+    python -m pages.utils.shared_cache purge [--root DIR]
+"""
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+from pages.utils.instrumentation import note_cache
+from pages.utils.price_store import DEFAULT_CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+DEFAULT_TTL = 300
+# Fitted models are keyed by their last bar, so they never go stale in
+# content; the TTL only bounds how long unused ones stay on disk
+DEFAULT_TTLS = {"model": 24 * 3600}
+# How long an expired entry may still be served while another process refreshes it
+STALE_GRACE = 3600
+LOCK_STRIPES = 64
+
+_MISSING = object()
+
+
+def parse_ttls(text):
+    """``"history=900,info=43200"`` -> ``{"history": 900.0, "info": 43200.0}``."""
+    ttls = {}
+    for item in (text or "").split(","):
+        if item.strip():
+            kind, _, seconds = item.partition("=")
+            ttls[kind.strip()] = float(seconds)
+    return ttls
+
+
+class SharedCache:
+    """Get-or-compute over files under ``root``, shared by every process that uses it."""
+
+    def __init__(self, root, ttls=None, stale_grace=STALE_GRACE, wait_timeout=60.0, memo_entries=128):
+        self.root = root
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.stale_grace = stale_grace
+        self.wait_timeout = wait_timeout
+        self.stats = Counter()
+        self._thread_locks = {}
+        self._thread_locks_guard = threading.Lock()
+        # Unpickled values by file version: repeat hits skip the disk read
+        self._memo = OrderedDict()
+        self._memo_entries = memo_entries
+        self._memo_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def ttl(self, kind, default=None):
+        return self.ttls.get(kind, DEFAULT_TTL if default is None else default)
+
+    # ---------------- public API ----------------
+    def get(self, kind, key, loader, ttl=None):
+        """Cached value for ``(kind, key)``; ``loader()`` runs in at most one process at a time."""
+        path = self._path(kind, key)
+        entry = self._read(path)
+        if entry is not None and entry[0] > time.time():
+            return self._count(kind, "hit", entry[1])
+
+        # Only the holder of the key's lock refreshes it
+        with self._lock(kind, path, blocking=entry is None) as locked:
+            if not locked and entry is not None:
+                # Someone else is refreshing: their predecessor is good enough for now
+                return self._count(kind, "stale", entry[1])
+            fresh = self._read(path)
+            if fresh is not None and fresh[0] > time.time():
+                # Written while we waited for the lock
+                return self._count(kind, "wait", fresh[1])
+            # Not locked here means the wait timed out: load anyway rather than fail
+            self._count(kind, "miss")
+            value = loader()
+            self._write(kind, path, key, value, self.ttl(kind, ttl))
+            return value
+
+    def peek(self, kind, key):
+        """Fresh value or ``None``, without locking or loading."""
+        entry = self._read(self._path(kind, key))
+        if entry is not None and entry[0] > time.time():
+            return self._count(kind, "hit", entry[1])
+        self._count(kind, "miss")
+        return None
+
+    def put(self, kind, key, value, ttl=None):
+        self._write(kind, self._path(kind, key), key, value, self.ttl(kind, ttl))
+
+    def entries(self):
+        """``(kind, path, header)`` for every entry on disk."""
+        for kind in sorted(os.listdir(self.root)):
+            folder = os.path.join(self.root, kind)
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                if name.endswith(".pkl"):
+                    path = os.path.join(folder, name)
+                    try:
+                        with open(path, "rb") as fh:
+                            yield kind, path, pickle.load(fh)
+                    except (OSError, EOFError, pickle.UnpicklingError):
+                        continue
+
+    def purge(self):
+        """Delete entries past their stale grace; returns how many."""
+        cutoff = time.time() - self.stale_grace
+        removed = 0
+        for _, path, header in list(self.entries()):
+            if header["expires"] < cutoff:
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    # ---------------- files ----------------
+    def _path(self, kind, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.root, kind, f"{digest}.pkl")
+
+    def _read(self, path):
+        """``(expires, value)``, or ``None`` if missing, unreadable or past its grace."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        version = (path, stat.st_mtime_ns, stat.st_size)
+        with self._memo_lock:
+            memo = self._memo.get(path)
+            if memo is not None and memo[0] == version:
+                self._memo.move_to_end(path)
+                expires, value = memo[1]
+                return (expires, value) if expires + self.stale_grace > time.time() else None
+        try:
+            with open(path, "rb") as fh:
+                header = pickle.load(fh)
+                if header["expires"] + self.stale_grace <= time.time():
+                    return None
+                value = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError, KeyError, AttributeError, ImportError):
+            # Torn by a crash mid-write on a filesystem without atomic rename, or
+            # written by an incompatible version: treat as absent and rewrite
+            return None
+        with self._memo_lock:
+            self._memo[path] = (version, (header["expires"], value))
+            self._memo.move_to_end(path)
+            while len(self._memo) > self._memo_entries:
+                self._memo.popitem(last=False)
+        return header["expires"], value
+
+    def _write(self, kind, path, key, value, ttl):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        now = time.time()
+        try:
+            with open(tmp, "wb") as fh:
+                pickle.dump({"expires": now + ttl, "created": now, "key": repr(key)}, fh,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            self.stats["bytes_written"] += os.path.getsize(tmp)
+            os.replace(tmp, path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            # Unpicklable values or a full disk only cost the sharing, never the request
+            self._count(kind, "error")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    @contextmanager
+    def _lock(self, kind, path, blocking):
+        """Yields True once this thread holds the key's lock, False if it was busy."""
+        stripe = int(os.path.basename(path)[:8], 16) % LOCK_STRIPES
+        lock_path = os.path.join(self.root, kind, "locks", f"{stripe:02d}.lock")
+        with self._thread_locks_guard:
+            thread_lock = self._thread_locks.setdefault(lock_path, threading.Lock())
+        if not thread_lock.acquire(blocking, self.wait_timeout if blocking else -1):
+            yield False
+            return
+        try:
+            if fcntl is None:
+                yield True
+                return
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+            with open(lock_path, "a") as fh:
+                deadline = time.monotonic() + self.wait_timeout
+                while True:
+                    try:
+                        fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        if not blocking:
+                            yield False
+                            return
+                        if time.monotonic() > deadline:
+                            # Holder is stuck: do the work unlocked rather than hang
+                            yield True
+                            return
+                        time.sleep(0.05)
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+        finally:
+            thread_lock.release()
+
+    def _count(self, kind, outcome, value=None):
+        self.stats[f"{kind}.{outcome}"] += 1
+        note_cache(f"shared.{kind}", outcome)
+        return value
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """Process-wide ``SharedCache`` when ``STOCKVISION_SHARED_CACHE`` is set, else None.
+
+    The variable is the shared directory (``1`` means ``<cache dir>/shared``).
+    """
+    global _default
+    root = os.environ.get("STOCKVISION_SHARED_CACHE")
+    if not root:
+        return None
+    with _default_lock:
+        if _default is None:
+            if root == "1":
+                root = os.path.join(DEFAULT_CACHE_DIR, "shared")
+            _default = SharedCache(root, parse_ttls(os.environ.get("STOCKVISION_SHARED_TTLS")))
+        return _default
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clean the shared cache.")
+    parser.add_argument("command", choices=["info", "purge"])
+    parser.add_argument("--root", default=os.environ.get("STOCKVISION_SHARED_CACHE"),
+                        help="Shared cache directory (default: $STOCKVISION_SHARED_CACHE)")
+    args = parser.parse_args(argv)
+    if not args.root:
+        parser.error("no --root given and STOCKVISION_SHARED_CACHE is not set")
+    root = os.path.join(DEFAULT_CACHE_DIR, "shared") if args.root == "1" else args.root
+    cache = SharedCache(root)
+
+    if args.command == "purge":
+        print(f"Removed {cache.purge()} expired entries from {root}")
+        return 0
+
+    now = time.time()
+    summary = {}
+    for kind, path, header in cache.entries():
+        row = summary.setdefault(kind, Counter())
+        row["entries"] += 1
+        row["expired"] += header["expires"] <= now
+        row["bytes"] += os.path.getsize(path)
+    print(f"{'kind':<12} {'entries':>8} {'expired':>8} {'MiB':>9}")
+    for kind, row in summary.items():
+        print(f"{kind:<12} {row['entries']:>8} {row['expired']:>8} {row['bytes'] / 2**20:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
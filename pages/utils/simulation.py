@@ -0,0 +1,230 @@
+"""Monte Carlo price paths, generated in bounded chunks with streaming statistics.
+
+    sim = simulate(close, steps=30, n_paths=200_000, method="bootstrap", workers=4)
+    sim.fan()           # percentile bands per step (prices)
+    sim.touch_table()   # P(touch) / P(finish beyond) for +-5% / +-10% moves
+
+Paths are cumulative log returns from the last close, either Gaussian
+(``gbm``: geometric Brownian motion with the drift and volatility of the
+historical log returns) or resampled day by day from those returns
+(``bootstrap``). They are generated ``chunk_size`` at a time and folded into
+``PathStats``, so memory is one (chunk x steps) block no matter how many paths
+are drawn:
+
+    percentiles  a per-step histogram of log returns over +-8 standard
+                 deviations (``bins`` cells plus under/overflow), read back by
+                 interpolating the cumulative counts
+    touch        running max / min per path, counted against each level
+
+Every chunk has its own Generator spawned from one ``SeedSequence``, so a
+given ``seed`` gives the same answer whether chunks run in this process or
+are split across ``workers`` processes.
+"""
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("gbm", "bootstrap")
+DEFAULT_TOUCH = (-0.10, -0.05, 0.05, 0.10)
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_CHUNK = 10_000
+DEFAULT_BINS = 2000
+_SPREAD = 8.0  # histogram half-width in standard deviations of the step's return
+
+
+@dataclass(frozen=True)
+class PathModel:
+    """What a chunk needs to generate paths; cheap to send to worker processes."""
+
+    method: str
+    steps: int
+    last_price: float
+    drift: float            # mean daily log return
+    volatility: float       # std of daily log returns
+    returns: np.ndarray     # historical daily log returns (bootstrap)
+    touch: tuple
+    bins: int
+
+    @classmethod
+    def from_prices(cls, values, steps, method="gbm", touch=DEFAULT_TOUCH, bins=DEFAULT_BINS):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {', '.join(METHODS)}")
+        values = np.asarray(values, dtype="float64")
+        values = values[np.isfinite(values) & (values > 0)]
+        if len(values) < 3:
+            raise ValueError("need at least 3 positive prices to simulate")
+        returns = np.diff(np.log(values))
+        return cls(method, int(steps), float(values[-1]), float(returns.mean()),
+                   float(returns.std(ddof=1)), returns, tuple(touch), int(bins))
+
+    def edges(self):
+        """(lower edge, bin width) of each step's histogram."""
+        horizon = np.arange(1, self.steps + 1)
+        spread = _SPREAD * max(self.volatility, 1e-6) * np.sqrt(horizon)
+        return self.drift * horizon - spread, 2 * spread / self.bins
+
+    def paths(self, rng, n):
+        """(n, steps) cumulative log returns."""
+        if self.method == "gbm":
+            steps = rng.standard_normal((n, self.steps))
+            steps *= self.volatility
+            steps += self.drift
+        else:
+            steps = self.returns[rng.integers(0, len(self.returns), (n, self.steps))]
+        return np.cumsum(steps, axis=1, out=steps)
+
+
+class PathStats:
+    """Mergeable per-step summaries of simulated paths."""
+
+    def __init__(self, model):
+        self.n_paths = 0
+        self.counts = np.zeros((model.steps, model.bins + 2), dtype="int64")
+        self.touch_counts = np.zeros((model.steps, len(model.touch)), dtype="int64")
+        self.finish_counts = np.zeros(len(model.touch), dtype="int64")
+        self.price_sums = np.zeros(model.steps)  # of price / last price, for the mean path
+
+    def update(self, model, paths):
+        n, steps = paths.shape
+        lower, width = model.edges()
+        # Cell 0 is underflow, bins + 1 overflow; one bincount covers every step
+        cells = np.floor((paths - lower) / width).astype("int64")
+        np.clip(cells + 1, 0, model.bins + 1, out=cells)
+        cells += np.arange(steps) * (model.bins + 2)
+        self.counts += np.bincount(cells.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+        if model.touch:
+            levels = np.log1p(np.asarray(model.touch))
+            running_max = np.maximum.accumulate(paths, axis=1)
+            running_min = np.minimum.accumulate(paths, axis=1)
+            for i, level in enumerate(levels):
+                if level >= 0:
+                    self.touch_counts[:, i] += np.count_nonzero(running_max >= level, axis=0)
+                    self.finish_counts[i] += np.count_nonzero(paths[:, -1] >= level)
+                else:
+                    self.touch_counts[:, i] += np.count_nonzero(running_min <= level, axis=0)
+                    self.finish_counts[i] += np.count_nonzero(paths[:, -1] <= level)
+
+        self.price_sums += np.exp(paths).sum(axis=0)
+        self.n_paths += n
+
+    def merge(self, other):
+        self.n_paths += other.n_paths
+        self.counts += other.counts
+        self.touch_counts += other.touch_counts
+        self.finish_counts += other.finish_counts
+        self.price_sums += other.price_sums
+        return self
+
+
+def _run_chunks(model, seeds, sizes):
+    """Generate and summarize a run of chunks; also the process-pool entry point."""
+    stats = PathStats(model)
+    for seed, size in zip(seeds, sizes):
+        stats.update(model, model.paths(np.random.default_rng(seed), size))
+    return stats
+
+
+# --------------------------------------------------
+# Results
+# --------------------------------------------------
+@dataclass
+class Simulation:
+    model: PathModel
+    stats: PathStats
+    elapsed: float
+    workers: int
+    chunk_size: int
+
+    @property
+    def last_price(self):
+        return self.model.last_price
+
+    @property
+    def n_paths(self):
+        return self.stats.n_paths
+
+    @property
+    def paths_per_second(self):
+        return self.n_paths / self.elapsed if self.elapsed else float("inf")
+
+    def percentiles(self, qs=DEFAULT_PERCENTILES):
+        """(len(qs), steps) price percentiles, interpolated within histogram cells."""
+        lower, width = self.model.edges()
+        cumulative = np.cumsum(self.stats.counts, axis=1)
+        out = np.empty((len(qs), self.model.steps))
+        rows = np.arange(self.model.steps)
+        for i, q in enumerate(qs):
+            target = q / 100 * self.n_paths
+            cell = np.minimum((cumulative < target).sum(axis=1), self.model.bins + 1)
+            before = np.where(cell > 0, cumulative[rows, cell - 1], 0)
+            inside = self.stats.counts[rows, cell]
+            fraction = np.divide(target - before, inside, out=np.zeros(len(rows)), where=inside > 0)
+            # Under/overflow cells collapse onto the histogram's outer edges
+            position = np.clip(cell - 1 + fraction, 0, self.model.bins)
+            out[i] = lower + position * width
+        return self.last_price * np.exp(out)
+
+    def fan(self, qs=DEFAULT_PERCENTILES, index=None):
+        frame = pd.DataFrame(self.percentiles(qs).T, columns=[f"P{q:g}" for q in qs], index=index)
+        frame["Mean"] = self.last_price * self.stats.price_sums / self.n_paths
+        return frame
+
+    def touch_probability(self):
+        """(steps, levels) probability that each level has been touched by each step."""
+        return self.stats.touch_counts / self.n_paths
+
+    def touch_table(self):
+        levels = np.asarray(self.model.touch)
+        return pd.DataFrame({
+            "Move %": levels * 100,
+            "Price": self.last_price * (1 + levels),
+            "P(touch) %": self.stats.touch_counts[-1] / self.n_paths * 100,
+            "P(finish beyond) %": self.stats.finish_counts / self.n_paths * 100,
+        })
+
+
+def simulate(
+    values,
+    steps=30,
+    n_paths=100_000,
+    method="gbm",
+    chunk_size=DEFAULT_CHUNK,
+    seed=0,
+    workers=1,
+    touch=DEFAULT_TOUCH,
+    bins=DEFAULT_BINS,
+):
+    """Simulate ``n_paths`` price paths ``steps`` bars ahead of ``values[-1]``."""
+    started = time.perf_counter()
+    model = PathModel.from_prices(values, steps, method, touch, bins)
+    n_chunks = max(1, math.ceil(n_paths / chunk_size))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    sizes = [chunk_size] * (n_chunks - 1) + [n_paths - chunk_size * (n_chunks - 1)]
+
+    workers = max(1, min(workers, n_chunks))
+    if workers == 1:
+        stats = _run_chunks(model, seeds, sizes)
+    else:
+        # One contiguous run of chunks per worker: one PathStats back from each
+        bounds = np.linspace(0, n_chunks, workers + 1).astype(int)
+        with ProcessPoolExecutor(workers) as pool:
+            parts = [
+                pool.submit(_run_chunks, model, seeds[lo:hi], sizes[lo:hi])
+                for lo, hi in zip(bounds[:-1], bounds[1:])
+            ]
+            stats = PathStats(model)
+            for part in parts:
+                stats.merge(part.result())
+
+    return Simulation(
+        model=model,
+        stats=stats,
+        elapsed=time.perf_counter() - started,
+        workers=workers,
+        chunk_size=chunk_size,
+    )
@@ -0,0 +1,278 @@
+"""Offline exchange trading calendars with a precomputed session index.
+
+Holidays for NYSE/NASDAQ and LSE follow their published rules (with
+one-off closures listed explicitly); NSE's lunar-calendar holidays are
+bundled per year from the exchange's annual circulars, so outside the
+bundled years NSE sessions are only approximate (see ``known_from`` and
+``known_until``). Each calendar keeps
+a sorted ``datetime64[D]`` array of sessions, so "next N sessions" and
+"sessions between A and B" are ``searchsorted`` lookups.
+"""
+import datetime
+import warnings
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+FIRST_YEAR = 1990
+LAST_YEAR = 2035
+
+
+# --------------------------------------------------
+# Date rules
+# --------------------------------------------------
+def easter(year):
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def nth_weekday(year, month, weekday, n):
+    """n-th ``weekday`` (Mon=0) of the month; ``n=-1`` for the last one."""
+    if n > 0:
+        first = datetime.date(year, month, 1)
+        return first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = datetime.date(year + month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)
+    return last - datetime.timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def nearest_weekday(day):
+    """US observance: Saturday -> Friday, Sunday -> Monday."""
+    if day.weekday() == 5:
+        return day - datetime.timedelta(days=1)
+    if day.weekday() == 6:
+        return day + datetime.timedelta(days=1)
+    return day
+
+
+def next_monday(day):
+    """UK substitution: a weekend holiday moves to the following Monday."""
+    return day + datetime.timedelta(days=(7 - day.weekday()) % 7) if day.weekday() >= 5 else day
+
+
+# --------------------------------------------------
+# Holiday tables
+# --------------------------------------------------
+NYSE_SPECIAL_CLOSURES = [
+    "1994-04-27",                                           # Nixon funeral
+    "2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14",  # September 11
+    "2004-06-11",                                           # Reagan funeral
+    "2007-01-02",                                           # Ford funeral
+    "2012-10-29", "2012-10-30",                             # Hurricane Sandy
+    "2018-12-05",                                           # G.H.W. Bush funeral
+    "2025-01-09",                                           # Carter funeral
+]
+
+LSE_SPECIAL_CLOSURES = [
+    "1999-12-31",  # Millennium
+    "2002-06-03",  # Golden Jubilee
+    "2011-04-29",  # Royal wedding
+    "2012-06-05",  # Diamond Jubilee
+    "2022-06-03",  # Platinum Jubilee
+    "2022-09-19",  # State funeral
+    "2023-05-08",  # Coronation
+]
+
+# Bank holidays moved off their usual Monday
+LSE_MOVED = {
+    (1995, "early_may"): "1995-05-08",
+    (2020, "early_may"): "2020-05-08",
+    (2002, "spring"): "2002-06-04",
+    (2012, "spring"): "2012-06-04",
+    (2022, "spring"): "2022-06-02",
+}
+
+# NSE trading holidays that do not fall on a fixed date (festival calendar).
+# Source: NSE annual holiday circulars; extend each December.
+NSE_FESTIVAL_HOLIDAYS = {
+    2023: ["2023-03-07", "2023-03-30", "2023-04-04", "2023-04-07", "2023-04-14",
+           "2023-06-28", "2023-09-19", "2023-10-24", "2023-11-14", "2023-11-27"],
+    2024: ["2024-01-22", "2024-03-08", "2024-03-25", "2024-03-29", "2024-04-11",
+           "2024-04-17", "2024-05-20", "2024-06-17", "2024-07-17", "2024-11-01",
+           "2024-11-15", "2024-11-20"],
+    2025: ["2025-02-26", "2025-03-14", "2025-03-31", "2025-04-10", "2025-04-14",
+           "2025-04-18", "2025-08-27", "2025-10-21", "2025-10-22", "2025-11-05"],
+    2026: ["2026-03-03", "2026-03-26", "2026-03-31", "2026-04-03", "2026-04-14",
+           "2026-05-28", "2026-06-26", "2026-09-14", "2026-10-20", "2026-11-10",
+           "2026-11-24"],
+}
+
+
+def nyse_holidays(year):
+    days = [
+        nth_weekday(year, 2, 0, 3),              # Washington's Birthday
+        easter(year) - datetime.timedelta(days=2),  # Good Friday
+        nth_weekday(year, 5, 0, -1),             # Memorial Day
+        nearest_weekday(datetime.date(year, 7, 4)),
+        nth_weekday(year, 9, 0, 1),              # Labor Day
+        nth_weekday(year, 11, 3, 4),             # Thanksgiving
+        nearest_weekday(datetime.date(year, 12, 25)),
+    ]
+    # New Year's Day on a Saturday is not observed on the prior Friday
+    new_year = datetime.date(year, 1, 1)
+    if new_year.weekday() != 5:
+        days.append(nearest_weekday(new_year))
+    if year >= 1998:
+        days.append(nth_weekday(year, 1, 0, 3))  # Martin Luther King Jr. Day
+    if year >= 2022:
+        days.append(nearest_weekday(datetime.date(year, 6, 19)))  # Juneteenth
+    return days
+
+
+def lse_holidays(year):
+    good_friday = easter(year) - datetime.timedelta(days=2)
+    moved = {kind: datetime.date.fromisoformat(day) for (y, kind), day in LSE_MOVED.items() if y == year}
+    days = [
+        next_monday(datetime.date(year, 1, 1)),
+        good_friday,
+        good_friday + datetime.timedelta(days=3),  # Easter Monday
+        moved.get("early_may", nth_weekday(year, 5, 0, 1)),
+        moved.get("spring", nth_weekday(year, 5, 0, -1)),
+        nth_weekday(year, 8, 0, -1),              # Summer bank holiday
+    ]
+    christmas = datetime.date(year, 12, 25)
+    if christmas.weekday() == 5:    # Sat: Mon 27 + Tue 28
+        days += [christmas + datetime.timedelta(days=2), christmas + datetime.timedelta(days=3)]
+    elif christmas.weekday() == 6:  # Sun: Mon 26 + Tue 27
+        days += [christmas + datetime.timedelta(days=1), christmas + datetime.timedelta(days=2)]
+    elif christmas.weekday() == 4:  # Fri: Boxing Day Sat -> Mon 28
+        days += [christmas, christmas + datetime.timedelta(days=3)]
+    else:
+        days += [christmas, christmas + datetime.timedelta(days=1)]
+    return days
+
+
+def nse_holidays(year):
+    fixed = [(1, 26), (5, 1), (8, 15), (10, 2), (12, 25)]
+    days = [datetime.date(year, m, d) for m, d in fixed]
+    days += [datetime.date.fromisoformat(d) for d in NSE_FESTIVAL_HOLIDAYS.get(year, [])]
+    return days
+
+
+HOLIDAY_RULES = {
+    "NYSE": (nyse_holidays, NYSE_SPECIAL_CLOSURES),
+    "NASDAQ": (nyse_holidays, NYSE_SPECIAL_CLOSURES),
+    "LSE": (lse_holidays, LSE_SPECIAL_CLOSURES),
+    "NSE": (nse_holidays, []),
+}
+
+EXCHANGES = tuple(HOLIDAY_RULES)
+
+# Days whose holidays are fully known; rule-based calendars cover FIRST_YEAR..LAST_YEAR
+HOLIDAYS_KNOWN = {
+    "NSE": (datetime.date(min(NSE_FESTIVAL_HOLIDAYS), 1, 1),
+            datetime.date(max(NSE_FESTIVAL_HOLIDAYS), 12, 31)),
+}
+
+# Regular session hours in exchange-local time (early closes are not modelled)
+SESSION_HOURS = {
+    "NYSE": ("America/New_York", datetime.time(9, 30), datetime.time(16, 0)),
+    "NASDAQ": ("America/New_York", datetime.time(9, 30), datetime.time(16, 0)),
+    "LSE": ("Europe/London", datetime.time(8, 0), datetime.time(16, 30)),
+    "NSE": ("Asia/Kolkata", datetime.time(9, 15), datetime.time(15, 30)),
+}
+
+
+# --------------------------------------------------
+# Calendar
+# --------------------------------------------------
+class IncompleteCalendarWarning(UserWarning):
+    """Sessions were requested outside the days whose holidays are known."""
+
+
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+def _index(days):
+    return pd.DatetimeIndex(days.astype("datetime64[ns]"))
+
+
+class TradingCalendar:
+    """Sorted session array for one exchange over FIRST_YEAR..LAST_YEAR."""
+
+    def __init__(self, name):
+        rule, special = HOLIDAY_RULES[name]
+        holidays = {d for year in range(FIRST_YEAR, LAST_YEAR + 1) for d in rule(year)}
+        holidays.update(datetime.date.fromisoformat(d) for d in special)
+
+        self.name = name
+        self.timezone, self.open_time, self.close_time = SESSION_HOURS[name]
+        self.known_from, self.known_until = HOLIDAYS_KNOWN.get(
+            name, (datetime.date(FIRST_YEAR, 1, 1), datetime.date(LAST_YEAR, 12, 31))
+        )
+        self.holidays = np.array(sorted(holidays), dtype="datetime64[D]")
+        weekdays = np.arange(
+            np.datetime64(f"{FIRST_YEAR}-01-01"), np.datetime64(f"{LAST_YEAR + 1}-01-01"),
+            dtype="datetime64[D]",
+        )
+        weekdays = weekdays[np.is_busday(weekdays)]
+        self.sessions = weekdays[~np.isin(weekdays, self.holidays)]
+
+    def is_session(self, day):
+        day = _day(day)
+        i = np.searchsorted(self.sessions, day)
+        return bool(i < len(self.sessions) and self.sessions[i] == day)
+
+    def covers(self, day):
+        """Whether ``day``'s holidays are known, i.e. whether it is exactly a session or not."""
+        return np.datetime64(self.known_from, "D") <= _day(day) <= np.datetime64(self.known_until, "D")
+
+    def _check_known(self, days):
+        if len(days) and not (self.covers(days[0]) and self.covers(days[-1])):
+            warnings.warn(
+                f"{self.name} holidays are only known from {self.known_from} to {self.known_until}; "
+                f"sessions {days[0]} to {days[-1]} may include unlisted holidays",
+                IncompleteCalendarWarning,
+                stacklevel=3,
+            )
+        return days
+
+    def next_sessions(self, after, n):
+        """The ``n`` sessions strictly after ``after``."""
+        i = np.searchsorted(self.sessions, _day(after), side="right")
+        return _index(self._check_known(self.sessions[i:i + n]))
+
+    def previous_sessions(self, until, n):
+        """The ``n`` sessions up to and including ``until``."""
+        i = np.searchsorted(self.sessions, _day(until), side="right")
+        return _index(self.sessions[max(i - n, 0):i])
+
+    def sessions_between(self, start, end):
+        """Sessions with ``start <= day <= end``."""
+        lo = np.searchsorted(self.sessions, _day(start), side="left")
+        hi = np.searchsorted(self.sessions, _day(end), side="right")
+        return _index(self._check_known(self.sessions[lo:hi]))
+
+    def session_hours(self, day):
+        """(open, close) of ``day``'s regular session as exchange-local Timestamps."""
+        day = pd.Timestamp(day).date()
+        return tuple(
+            pd.Timestamp(datetime.datetime.combine(day, t)).tz_localize(self.timezone)
+            for t in (self.open_time, self.close_time)
+        )
+
+
+@lru_cache(maxsize=None)
+def get_calendar(name="NYSE"):
+    return TradingCalendar(name)
+
+
+def calendar_for_ticker(ticker):
+    """Best-effort exchange from the Yahoo ticker suffix."""
+    suffix = ticker.rsplit(".", 1)[-1].upper() if "." in ticker else ""
+    if suffix in ("NS", "BO"):
+        return get_calendar("NSE")
+    if suffix in ("L", "IL"):
+        return get_calendar("LSE")
+    return get_calendar("NYSE")
@@ -0,0 +1,44 @@
+"""Watchlist summary computed over one wide (dates x tickers) price matrix."""
+import re
+
+import pandas as pd
+
+SUMMARY_COLUMNS = ["Ticker", "Last", "Daily Change %", "52W High", "52W Low", "MA20", "MA50"]
+
+
+def parse_tickers(text):
+    """Split free text on commas / whitespace, upper-case and de-duplicate."""
+    symbols = (t.strip().upper() for t in re.split(r"[,\s]+", text or ""))
+    return list(dict.fromkeys(t for t in symbols if t))
+
+
+def close_matrix(frames):
+    """Align every ticker's Close on a shared date index."""
+    closes = {ticker: frame["Close"] for ticker, frame in frames.items() if not frame.empty}
+    if not closes:
+        return pd.DataFrame()
+    return pd.DataFrame(closes).sort_index()
+
+
+def watchlist_summary(close):
+    """One row per ticker: last close, daily change, 52-week range and MA20/MA50."""
+    if close.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    # Tickers on different exchanges have different holidays
+    filled = close.ffill()
+    last = filled.iloc[-1]
+    prev = filled.iloc[-2] if len(filled) > 1 else last * float("nan")
+
+    year = close.loc[close.index >= close.index[-1] - pd.DateOffset(weeks=52)]
+
+    summary = pd.DataFrame({
+        "Last": last,
+        "Daily Change %": (last / prev - 1) * 100,
+        "52W High": year.max(),
+        "52W Low": year.min(),
+        "MA20": filled.rolling(20).mean().iloc[-1],
+        "MA50": filled.rolling(50).mean().iloc[-1],
+    })
+    summary.index.name = "Ticker"
+    return summary.reset_index()[SUMMARY_COLUMNS]